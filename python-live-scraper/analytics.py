@@ -0,0 +1,611 @@
+#!/usr/bin/env python3
+"""
+Columnar Analytics Loader
+
+data/db-export-YYYYMMDD/*.csv 스냅샷(또는 Supabase에서 페이지 단위로 받은 최신 데이터)을
+타입이 정해진 컬럼 배열로 읽어 리포트를 실행합니다.
+
+- 숫자 컬럼은 array.array(정수 'q' / 실수 'd'), 불리언은 bytes, 문자열은 list
+- 변환 결과는 .state/analytics/<스냅샷 날짜>/<테이블>에 캐시
+  → 같은 스냅샷을 다시 분석할 때 CSV를 파싱하지 않음
+- pyarrow가 있으면 캐시를 Parquet으로 저장하고 to_arrow()로 pyarrow.compute 사용 가능
+- 리포트는 행 단위 dict가 아니라 컬럼 단위 연산(필터 마스크, 정렬 인덱스, 해시 조인)으로 동작
+  → 행 선택은 인덱스 배열로 타입 배열을 그대로 복사 (연속 구간은 슬라이스, numpy가 있으면 팬시 인덱싱)
+
+Usage:
+    # 기본 스냅샷(가장 최근 data/db-export-*)으로 전체 리포트
+    python analytics.py
+
+    # 특정 스냅샷 / 리포트
+    python analytics.py --export ../data/db-export-20260123 --report donations
+
+    # Supabase에서 최신 데이터를 받아 오늘 날짜 스냅샷으로 캐시
+    python analytics.py --supabase
+"""
+import argparse
+import csv
+import gzip
+import pickle
+from array import array
+from itertools import compress
+from collections import defaultdict
+from datetime import date
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Sequence
+
+from config import STATE_DIR
+
+# pyarrow (선택)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# numpy (선택) - 있으면 행 선택/그룹 집계를 numpy 배열 연산으로 처리
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+EXPORT_ROOT = Path(__file__).resolve().parent.parent / "data"
+CACHE_DIR = STATE_DIR / "analytics"
+CACHE_FORMAT = 1
+
+# 알려진 테이블의 컬럼 타입 (그 외 컬럼은 값으로 추론)
+EXPORT_SCHEMAS: dict[str, dict[str, str]] = {
+    "db_live_status": {
+        "id": "int", "bj_id": "str", "is_live": "bool", "viewer_count": "int",
+        "title": "str", "last_checked": "str",
+    },
+    "db_organization": {
+        "id": "int", "name": "str", "unit": "str", "role": "str", "parent_id": "int",
+        "is_active": "bool", "afreeca_id": "str", "profile_image_url": "str",
+    },
+    "db_total_donation_rankings": {
+        "rank": "int", "donor_name": "str", "total_amount": "int",
+        "is_permanent_vip": "bool", "updated_at": "str",
+    },
+    "db_episodes": {
+        "id": "int", "season_id": "int", "episode_number": "int", "title": "str",
+        "broadcast_date": "str", "is_rank_battle": "bool", "is_finalized": "bool", "description": "str",
+    },
+    "db_seasons": {
+        "id": "int", "name": "str", "start_date": "str", "end_date": "str",
+        "is_active": "bool", "created_at": "str",
+    },
+    "db_summary": {"table_name": "str", "record_count": "int"},
+}
+
+# Supabase 테이블 -> (스냅샷 테이블 이름, 페이지 정렬 컬럼)
+SUPABASE_TABLES = {
+    "organization": ("db_organization", "id"),
+    "live_status": ("db_live_status", "id"),
+    "total_donation_rankings": ("db_total_donation_rankings", "rank"),
+    "episodes": ("db_episodes", "id"),
+    "seasons": ("db_seasons", "id"),
+}
+
+
+# ----------------------------------------------------------------------
+# 컬럼 변환
+# ----------------------------------------------------------------------
+def _parse_bool(value: str) -> Optional[bool]:
+    value = value.strip().lower()
+    if value in ("true", "t", "1"):
+        return True
+    if value in ("false", "f", "0"):
+        return False
+    return None
+
+
+def infer_type(values: Sequence) -> str:
+    """스키마에 없는 컬럼의 타입 추론 (CSV 문자열 또는 API 응답 값)"""
+    present = [v for v in values if v is not None and v != ""]
+    if not present:
+        return "str"
+    if not all(isinstance(v, str) for v in present):
+        if all(isinstance(v, bool) for v in present):
+            return "bool"
+        if all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+            return "int"
+        if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+            return "float"
+        return "str"
+    for kind, parse in (("int", int), ("float", float)):
+        try:
+            for v in present:
+                parse(v)
+            return kind
+        except ValueError:
+            continue
+    if all(_parse_bool(v) is not None for v in present):
+        return "bool"
+    return "str"
+
+
+def build_column(kind: str, values: Sequence):
+    """
+    값 목록 -> 타입 컬럼
+
+    NULL이 없는 숫자 컬럼은 array, NULL이 있으면 Optional 값의 list
+    """
+    if kind == "str":
+        return ["" if v is None else str(v) for v in values]
+
+    parse = {"int": int, "float": float, "bool": _parse_bool}[kind]
+    parsed = [None if v is None or v == "" else (parse(v) if isinstance(v, str) else v) for v in values]
+    if any(v is None for v in parsed):
+        return parsed
+    if kind == "bool":
+        return bytes(parsed)
+    return array("q" if kind == "int" else "d", parsed)
+
+
+class ColumnTable:
+    """
+    컬럼 단위로 저장된 테이블
+
+    연산은 컬럼 전체를 한 번에 처리하고(마스크, 인덱스),
+    결과는 새 ColumnTable로 반환합니다.
+    """
+
+    def __init__(self, name: str, columns: dict[str, Sequence], types: Optional[dict[str, str]] = None):
+        self.name = name
+        self.columns = columns
+        self.types = types or {}
+        lengths = {len(col) for col in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"{name}: columns have different lengths {sorted(lengths)}")
+        self.length = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_records(
+        cls,
+        name: str,
+        header: list[str],
+        records: Iterable[Sequence],
+        schema: Optional[dict[str, str]] = None,
+    ) -> "ColumnTable":
+        """행 목록(CSV 행 / API 응답) -> 컬럼 테이블"""
+        raw: list[list] = [[] for _ in header]
+        for record in records:
+            for i, value in enumerate(record):
+                raw[i].append(value)
+
+        schema = schema or {}
+        types = {col: schema.get(col) or infer_type(raw[i]) for i, col in enumerate(header)}
+        columns = {col: build_column(types[col], raw[i]) for i, col in enumerate(header)}
+        return cls(name, columns, types)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, column: str) -> Sequence:
+        return self.columns[column]
+
+    @property
+    def column_names(self) -> list[str]:
+        return list(self.columns)
+
+    def take(self, indices: Sequence[int]) -> "ColumnTable":
+        """
+        인덱스 순서대로 행 선택
+
+        타입 배열(array / bytes)은 값 변환 없이 같은 타입으로 복사합니다.
+        """
+        if isinstance(indices, range) and indices.step == 1:
+            # head()처럼 연속 구간이면 슬라이스 (array/bytes는 메모리 복사)
+            columns = {col: values[indices.start:indices.stop] for col, values in self.columns.items()}
+        else:
+            index = np.asarray(indices, dtype=np.intp) if NUMPY_AVAILABLE else indices
+            columns = {col: take_column(values, index) for col, values in self.columns.items()}
+        return ColumnTable(self.name, columns, self.types)
+
+    def filter(self, mask: Sequence[bool]) -> "ColumnTable":
+        if NUMPY_AVAILABLE:
+            return self.take(np.flatnonzero(np.asarray(mask, dtype=bool)))
+        return self.take(list(compress(range(self.length), mask)))
+
+    def where(self, column: str, predicate: Callable) -> "ColumnTable":
+        return self.filter([predicate(v) for v in self.columns[column]])
+
+    def sort_indices(self, column: str, reverse: bool = False) -> list[int]:
+        """정렬 인덱스 (NULL은 항상 뒤)"""
+        values = self.columns[column]
+        if not isinstance(values, list):
+            # 타입 배열에는 NULL이 없음
+            return sorted(range(self.length), key=values.__getitem__, reverse=reverse)
+        present = [i for i in range(self.length) if values[i] is not None]
+        missing = [i for i in range(self.length) if values[i] is None]
+        return sorted(present, key=values.__getitem__, reverse=reverse) + missing
+
+    def sort_by(self, column: str, reverse: bool = False) -> "ColumnTable":
+        return self.take(self.sort_indices(column, reverse))
+
+    def head(self, n: int) -> "ColumnTable":
+        return self.take(range(min(n, self.length)))
+
+    def group_by(self, keys: list[str], aggregates: dict[str, tuple[str, str]]) -> "ColumnTable":
+        """
+        그룹별 집계
+
+        행마다 그룹 번호를 매긴 뒤 컬럼별로 집계합니다
+        (numpy가 있으면 NULL 없는 타입 배열은 bincount / ufunc.at).
+
+        Args:
+            aggregates: {결과 컬럼: (원본 컬럼, "count" | "sum" | "max")}
+        """
+        group_ids: dict[tuple, int] = {}
+        codes = array("q", [group_ids.setdefault(key, len(group_ids))
+                            for key in zip(*(self.columns[k] for k in keys))])
+        group_count = len(group_ids)
+        first_rows = [0] * group_count
+        for i in range(len(codes) - 1, -1, -1):
+            first_rows[codes[i]] = i
+        grouped = self.take(first_rows)
+
+        columns = {k: grouped.columns[k] for k in keys}
+        types = {k: self.types.get(k, "str") for k in keys}
+        members: Optional[list[list[int]]] = None
+        for out, (source, func) in aggregates.items():
+            if func not in ("count", "sum", "max"):
+                raise ValueError(f"Unknown aggregate: {func}")
+            source_type = self.types.get(source, "float")
+            kind = "int" if func == "count" or (func == "sum" and source_type == "bool") else source_type
+            column = self.columns[source]
+
+            if NUMPY_AVAILABLE and not isinstance(column, list) and group_count:
+                values = _aggregate_numpy(column, codes, group_count, func)
+            else:
+                if members is None:
+                    members = [[] for _ in range(group_count)]
+                    for i, code in enumerate(codes):
+                        members[code].append(i)
+                values = []
+                for rows in members:
+                    present = [v for v in map(column.__getitem__, rows) if v is not None]
+                    if func == "count":
+                        values.append(len(present))
+                    elif func == "sum":
+                        values.append(sum(present))
+                    else:
+                        values.append(max(present) if present else None)
+
+            columns[out] = build_column(kind, values)
+            types[out] = kind
+        return ColumnTable(self.name, columns, types)
+
+    def join(self, other: "ColumnTable", left_on: str, right_on: str, how: str = "inner") -> "ColumnTable":
+        """
+        해시 조인 (오른쪽 테이블로 인덱스를 만들고 왼쪽 컬럼을 한 번 훑음)
+
+        겹치는 오른쪽 컬럼 이름에는 "<오른쪽 테이블>." 접두사가 붙습니다.
+        """
+        index: dict = defaultdict(list)
+        for j, key in enumerate(other.columns[right_on]):
+            if key is not None:
+                index[key].append(j)
+
+        left_rows, right_rows = [], []
+        for i, key in enumerate(self.columns[left_on]):
+            matches = index.get(key)
+            if matches:
+                for j in matches:
+                    left_rows.append(i)
+                    right_rows.append(j)
+            elif how == "left":
+                left_rows.append(i)
+                right_rows.append(None)
+
+        columns = dict(self.take(left_rows).columns)
+        types = {col: self.types.get(col, "str") for col in columns}
+        # 매칭 없는 행이 없으면 오른쪽도 타입 배열 그대로 복사
+        right = other.take(right_rows) if None not in right_rows else None
+        for col, values in other.columns.items():
+            if col == right_on:
+                continue
+            out = col if col not in columns else f"{other.name}.{col}"
+            types[out] = other.types.get(col, "str")
+            if right is not None:
+                columns[out] = right.columns[col]
+            else:
+                columns[out] = build_column(types[out], [None if j is None else values[j] for j in right_rows])
+        return ColumnTable(f"{self.name}+{other.name}", columns, types)
+
+    def rows(self) -> Iterable[dict]:
+        """출력용 행 반복"""
+        names = self.column_names
+        for values in zip(*(self.columns[n] for n in names)):
+            yield dict(zip(names, values))
+
+    def to_arrow(self):
+        """pyarrow.Table 변환 (pyarrow.compute 사용 시)"""
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is not installed")
+        return pa.table({col: list(values) for col, values in self.columns.items()})
+
+
+def take_column(values: Sequence, indices: Sequence[int]):
+    """컬럼에서 인덱스 순서대로 값 선택 (array/bytes는 같은 타입 배열로)"""
+    if NUMPY_AVAILABLE and isinstance(indices, np.ndarray):
+        if isinstance(values, array):
+            return array(values.typecode, np.frombuffer(values, dtype=values.typecode)[indices].tobytes())
+        if isinstance(values, bytes):
+            return np.frombuffer(values, dtype=np.uint8)[indices].tobytes()
+        return [values[i] for i in indices.tolist()]
+    if isinstance(values, array):
+        return array(values.typecode, map(values.__getitem__, indices))
+    if isinstance(values, bytes):
+        return bytes(map(values.__getitem__, indices))
+    return list(map(values.__getitem__, indices))
+
+
+def _aggregate_numpy(column, codes: array, group_count: int, func: str) -> list:
+    """NULL 없는 타입 배열(array/bytes)의 그룹별 count / sum / max"""
+    group_codes = np.frombuffer(codes, dtype=np.int64)
+    if func == "count":
+        return np.bincount(group_codes, minlength=group_count).tolist()
+
+    data = np.frombuffer(column, dtype=column.typecode if isinstance(column, array) else np.uint8)
+    floating = data.dtype.kind == "f"
+    if func == "sum":
+        out = np.zeros(group_count, dtype=np.float64 if floating else np.int64)
+        np.add.at(out, group_codes, data)
+    else:
+        out = np.full(group_count, -np.inf if floating else np.iinfo(np.int64).min,
+                      dtype=np.float64 if floating else np.int64)
+        np.maximum.at(out, group_codes, data)
+        if data.dtype == np.uint8:
+            return [bool(v) for v in out.tolist()]
+    return out.tolist()
+
+
+# ----------------------------------------------------------------------
+# 스냅샷 + 캐시
+# ----------------------------------------------------------------------
+class Snapshot:
+    """
+    날짜별 스냅샷 (CSV 디렉토리 또는 Supabase에서 받은 데이터)
+
+    테이블은 처음 요청될 때 캐시에서 읽고, 없으면 CSV를 파싱해 캐시에 저장합니다.
+    """
+
+    def __init__(self, key: str, source_dir: Optional[Path] = None, cache_dir: Path = CACHE_DIR):
+        self.key = key
+        self.source_dir = Path(source_dir) if source_dir else None
+        self.cache_dir = Path(cache_dir) / key
+        self.loaded: dict[str, ColumnTable] = {}
+        self.stats = {"cache_hits": 0, "parsed": 0}
+
+    @classmethod
+    def from_export(cls, export_dir: Path, cache_dir: Path = CACHE_DIR) -> "Snapshot":
+        """data/db-export-YYYYMMDD -> 키 "export-YYYYMMDD" 스냅샷"""
+        export_dir = Path(export_dir)
+        return cls(export_dir.name.replace("db-", "", 1), export_dir, cache_dir)
+
+    def _cache_path(self, table: str) -> Path:
+        return self.cache_dir / f"{table}.{'parquet' if PYARROW_AVAILABLE else 'pickle'}"
+
+    def _source_path(self, table: str) -> Path:
+        """원본 CSV 경로 (exporter.py가 만든 .csv.gz도 허용)"""
+        path = self.source_dir / f"{table}.csv"
+        compressed = path.with_name(path.name + ".gz")
+        return compressed if not path.exists() and compressed.exists() else path
+
+    def _source_stamp(self, table: str) -> Optional[list]:
+        """원본 CSV가 바뀌었는지 확인하는 값 (크기, 수정 시각)"""
+        if self.source_dir is None:
+            return None
+        stat = self._source_path(table).stat()
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _read_cache(self, table: str) -> Optional[ColumnTable]:
+        path = self._cache_path(table)
+        if not path.exists():
+            return None
+        try:
+            if PYARROW_AVAILABLE:
+                arrow = pq.read_table(path)
+                meta = pickle.loads(arrow.schema.metadata[b"rg_meta"])
+                payload = {
+                    "format": meta["format"],
+                    "source": meta["source"],
+                    "types": meta["types"],
+                    "columns": {col: build_column(meta["types"][col], arrow.column(col).to_pylist())
+                                for col in arrow.column_names},
+                }
+            else:
+                with open(path, "rb") as f:
+                    payload = pickle.load(f)
+        except Exception as e:
+            print(f"[ANALYTICS] Ignoring unreadable cache {path}: {e}")
+            return None
+
+        if payload["format"] != CACHE_FORMAT or payload["source"] != self._source_stamp(table):
+            return None
+        return ColumnTable(table, payload["columns"], payload["types"])
+
+    def _write_cache(self, table: ColumnTable) -> None:
+        path = self._cache_path(table.name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        source = self._source_stamp(table.name)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        if PYARROW_AVAILABLE:
+            arrow = table.to_arrow()
+            meta = pickle.dumps({"format": CACHE_FORMAT, "source": source, "types": table.types})
+            pq.write_table(arrow.replace_schema_metadata({b"rg_meta": meta}), tmp_path)
+        else:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(
+                    {"format": CACHE_FORMAT, "source": source, "types": table.types, "columns": table.columns},
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+        tmp_path.replace(path)
+
+    def put(self, table: ColumnTable) -> None:
+        """외부에서 만든 테이블(Supabase 등)을 스냅샷에 추가하고 캐시"""
+        self.loaded[table.name] = table
+        self._write_cache(table)
+
+    def table(self, name: str) -> ColumnTable:
+        if name in self.loaded:
+            return self.loaded[name]
+
+        table = self._read_cache(name)
+        if table is not None:
+            self.stats["cache_hits"] += 1
+        else:
+            if self.source_dir is None:
+                raise KeyError(f"{name} is not in snapshot {self.key}")
+            table = read_csv_table(self._source_path(name))
+            self.stats["parsed"] += 1
+            self._write_cache(table)
+
+        self.loaded[name] = table
+        return table
+
+
+def read_csv_table(path: Path) -> ColumnTable:
+    """CSV(.csv 또는 .csv.gz) 파일 -> ColumnTable (알려진 테이블은 EXPORT_SCHEMAS 타입 사용)"""
+    name = path.name.split(".", 1)[0]
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        return ColumnTable.from_records(name, header, reader, EXPORT_SCHEMAS.get(name))
+
+
+def latest_export(root: Path = EXPORT_ROOT) -> Optional[Path]:
+    exports = sorted(p for p in root.glob("db-export-*") if p.is_dir())
+    return exports[-1] if exports else None
+
+
+def fetch_supabase_snapshot(client, page_size: int = 1000, cache_dir: Path = CACHE_DIR) -> Snapshot:
+    """
+    Supabase 테이블을 페이지 단위로 받아 오늘 날짜 스냅샷으로 캐시
+
+    페이지마다 바로 컬럼 버퍼에 쌓으므로 전체 JSON 응답을 한꺼번에 들고 있지 않습니다.
+    """
+    snapshot = Snapshot(f"supabase-{date.today():%Y%m%d}", cache_dir=cache_dir)
+    for source, (name, order_column) in SUPABASE_TABLES.items():
+        schema = EXPORT_SCHEMAS.get(name, {})
+        header: Optional[list[str]] = None
+        records: list[list] = []
+        start = 0
+        while True:
+            response = (
+                client.table(source)
+                .select(",".join(schema) if schema else "*")
+                .order(order_column)
+                .range(start, start + page_size - 1)
+                .execute()
+            )
+            page = response.data or []
+            if page and header is None:
+                header = list(schema) if schema else list(page[0])
+            records.extend([row.get(col) for col in header] for row in page)
+            if len(page) < page_size:
+                break
+            start += page_size
+
+        table = ColumnTable.from_records(name, header or list(schema), records, schema)
+        snapshot.put(table)
+        print(f"[ANALYTICS] {source}: {len(table)} rows")
+    return snapshot
+
+
+# ----------------------------------------------------------------------
+# 리포트
+# ----------------------------------------------------------------------
+def report_donations(snapshot: Snapshot, top: int = 10) -> dict:
+    """후원 랭킹 집중도: 상위 N명 비중, 영구 VIP 비중"""
+    rankings = snapshot.table("db_total_donation_rankings")
+    amounts = rankings["total_amount"]
+    total = sum(a for a in amounts if a is not None)
+    ranked = rankings.sort_by("total_amount", reverse=True)
+    top_amounts = ranked.head(top)["total_amount"]
+    vip_mask = [bool(v) for v in rankings["is_permanent_vip"]]
+
+    return {
+        "donors": len(rankings),
+        "total_amount": total,
+        "top": [(r["rank"], r["donor_name"], r["total_amount"]) for r in ranked.head(top).rows()],
+        "top_share": sum(top_amounts) / total if total else 0.0,
+        "permanent_vip_amount": sum(a for a, vip in zip(amounts, vip_mask) if vip and a),
+    }
+
+
+def report_organization(snapshot: Snapshot) -> dict:
+    """유닛/직급별 활성 멤버 수"""
+    org = snapshot.table("db_organization").where("is_active", lambda v: bool(v))
+    by_unit_role = org.group_by(["unit", "role"], {"members": ("id", "count")}).sort_by("members", reverse=True)
+    return {
+        "active_members": len(org),
+        "by_unit_role": [(r["unit"], r["role"], r["members"]) for r in by_unit_role.rows()],
+    }
+
+
+def report_episodes(snapshot: Snapshot) -> dict:
+    """시즌별 회차 수 / 직급전 수 (episodes ⋈ seasons)"""
+    episodes = snapshot.table("db_episodes")
+    seasons = snapshot.table("db_seasons")
+    joined = episodes.join(seasons, "season_id", "id", how="left")
+    per_season = joined.group_by(
+        ["season_id", "name"],
+        {"episodes": ("episode_number", "count"), "rank_battles": ("is_rank_battle", "sum")},
+    )
+    return {
+        "seasons": [(r["season_id"], r["name"], r["episodes"], r["rank_battles"]) for r in per_season.rows()],
+    }
+
+
+REPORTS = {
+    "donations": report_donations,
+    "organization": report_organization,
+    "episodes": report_episodes,
+}
+
+
+def print_report(name: str, result: dict) -> None:
+    print(f"\n=== {name} ===")
+    for key, value in result.items():
+        if isinstance(value, list):
+            print(f"  {key}:")
+            for item in value:
+                print(f"    {item}")
+        elif isinstance(value, float):
+            print(f"  {key}: {value:.1%}")
+        else:
+            print(f"  {key}: {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar analytics over db-export snapshots")
+    parser.add_argument("--export", type=Path, help="Export directory (default: latest data/db-export-*)")
+    parser.add_argument("--supabase", action="store_true", help="Stream fresh tables from Supabase instead")
+    parser.add_argument("--report", choices=["all", *REPORTS], default="all")
+    args = parser.parse_args()
+
+    if args.supabase:
+        from db import get_supabase_client
+        snapshot = fetch_supabase_snapshot(get_supabase_client())
+    else:
+        export_dir = args.export or latest_export()
+        if export_dir is None:
+            raise SystemExit(f"No db-export-* directory under {EXPORT_ROOT}")
+        snapshot = Snapshot.from_export(export_dir)
+
+    print(f"Snapshot: {snapshot.key} (cache: {'parquet' if PYARROW_AVAILABLE else 'pickle'})")
+    names = list(REPORTS) if args.report == "all" else [args.report]
+    for name in names:
+        print_report(name, REPORTS[name](snapshot))
+
+    print(f"\nTables parsed: {snapshot.stats['parsed']}, from cache: {snapshot.stats['cache_hits']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Startup Time Benchmark
+
+`python -X importtime`로 명령별 import 비용을 측정하고, 예산을 넘거나
+불필요한 무거운 모듈(supabase, schedule 등)이 로드되면 실패(exit 1)합니다.
+
+Usage:
+    # 기본 예산으로 측정
+    python bench_startup.py
+
+    # 반복 횟수 / 예산 배율 조정, 느린 모듈 상위 N개 출력
+    python bench_startup.py --runs 7 --budget-scale 1.5 --top 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+
+@dataclass
+class Scenario:
+    """측정 대상 명령"""
+    name: str
+    code: str
+    budget_ms: float
+    forbidden: tuple[str, ...] = ()
+
+
+# 인터프리터 기본 import(site 등)를 뺀 시간 기준
+# 예산은 개발 머신 측정값의 약 2배 (CI 편차 고려)
+BASELINE = "pass"
+SCENARIOS = [
+    # --help / 인자 파싱: config만 로드
+    Scenario("cli", "import main", 15, ("supabase", "schedule", "httpx")),
+    # --list / --test: PandaTV API 클라이언트만 로드
+    Scenario("list", "import main, scraper", 350, ("supabase", "schedule")),
+    # 동기화 1회: DB + 플랫폼 엔진 (supabase는 클라이언트 생성 시점에 로드)
+    Scenario("sync", "import main, db, platforms, hysteresis", 400, ("supabase", "schedule")),
+]
+
+
+def parse_importtime(stderr: str) -> tuple[float, dict[str, float]]:
+    """
+    -X importtime 출력 파싱
+
+    Returns:
+        (최상위 import 누적 시간 합계 ms, {모듈: self 시간 ms})
+    """
+    total_us = 0
+    self_times: dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, raw_name = line.split(":", 1)[1].split("|", 2)
+        module = raw_name.strip()
+        self_times[module] = int(self_us) / 1000
+        # 들여쓰기가 한 칸이면 최상위 import (중첩 import는 두 칸씩 추가)
+        if not raw_name.startswith("  "):
+            total_us += int(cumulative_us)
+    return total_us / 1000, self_times
+
+
+def measure(code: str) -> tuple[float, dict[str, float]]:
+    """코드 1회 실행 후 import 시간 파싱"""
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=SCRIPT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"`{code}` failed: {proc.stderr.strip().splitlines()[-1]}")
+    return parse_importtime(proc.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup import-time benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per scenario (median is used)")
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="Multiply all budgets")
+    parser.add_argument("--top", type=int, default=5, help="Show N slowest modules per scenario")
+    args = parser.parse_args()
+
+    runs = max(1, args.runs)
+    baseline_runs = [measure(BASELINE) for _ in range(runs)]
+    baseline = statistics.median(run[0] for run in baseline_runs)
+    baseline_modules = set(baseline_runs[-1][1])
+    print(f"Interpreter baseline: {baseline:.1f} ms (excluded)\n")
+
+    failed = False
+    for scenario in SCENARIOS:
+        # 첫 실행은 .pyc 생성용으로 버림
+        measure(scenario.code)
+        results = [measure(scenario.code) for _ in range(runs)]
+        total = max(0.0, statistics.median(run[0] for run in results) - baseline)
+        modules = {
+            name: ms for name, ms in results[-1][1].items() if name not in baseline_modules
+        }
+        budget = scenario.budget_ms * args.budget_scale
+
+        loaded = sorted(
+            name for name in scenario.forbidden
+            if any(m == name or m.startswith(name + ".") for m in modules)
+        )
+        ok = total <= budget and not loaded
+        failed |= not ok
+
+        print(f"[{'OK' if ok else 'FAIL'}] {scenario.name:5} {total:7.1f} ms (budget {budget:.0f} ms)  `{scenario.code}`")
+        if loaded:
+            print(f"       unexpected imports: {', '.join(loaded)}")
+        slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        for name, ms in slowest:
+            print(f"       {ms:7.1f} ms  {name}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+Live Diff Broadcast
+
+지금은 틱마다 organization.is_live / live_status 행 변경이 연결된 클라이언트마다
+행 단위 realtime 이벤트(멤버당 2개 이상)로 퍼집니다. 여기서는 스냅샷(snapshot.py)이
+바뀐 멤버만 모아 한 틱에 메시지 하나를 보냅니다.
+
+    {"v": 1, "epoch": "9f2c01ab", "seq": 42, "ts": "...", "live_count": 3,
+     "changed": [<GET /live/<id>와 같은 멤버 payload>, ...], "removed": [17]}
+
+- seq는 스냅샷 version (내용이 바뀔 때만 1 증가, 바뀐 게 없는 틱은 메시지 없음)
+- 클라이언트는 seq가 건너뛰거나 epoch가 바뀌면(워커 재시작) GET /live로 다시 받고
+  응답의 X-Snapshot-Version(<epoch>:<seq>) 이후 메시지만 적용합니다.
+
+전송 경로 (둘 다 틱 스레드를 막지 않음)
+    SSE       GET /live/events (워커 HTTP 서버), Last-Event-ID로 놓친 메시지 재전송
+    Supabase  Realtime broadcast REST API (BROADCAST_REALTIME_TOPIC 설정 시)
+"""
+import json
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+from config import (
+    SUPABASE_URL,
+    SUPABASE_SERVICE_ROLE_KEY,
+    BROADCAST_REALTIME_TOPIC,
+    BROADCAST_REPLAY_SIZE,
+    BROADCAST_SSE_MAX_CLIENTS,
+    LIVE_API_CORS_ORIGIN,
+    DEBUG,
+)
+from server import Request, Response, WorkerHTTPServer
+from snapshot import LiveSnapshot, ALL_VIEW
+
+MESSAGE_VERSION = 1
+DIFF_EVENT = "diff"
+SSE_KEEPALIVE_SECONDS = 15
+SSE_CLIENT_BUFFER = 32  # 이보다 밀린 클라이언트는 reset 후 끊음
+REALTIME_QUEUE_MAX = 100
+REALTIME_RETRIES = 3
+
+
+def parse_version(value: Optional[str]) -> Optional[tuple[str, int]]:
+    """"<epoch>:<seq>" (Last-Event-ID, X-Snapshot-Version) -> (epoch, seq)"""
+    if not value or ":" not in value:
+        return None
+    epoch, _, seq = value.strip().partition(":")
+    try:
+        return epoch, int(seq)
+    except ValueError:
+        return None
+
+
+class _SSEClient:
+    def __init__(self):
+        self.queue: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=SSE_CLIENT_BUFFER)
+        self.dropped = False
+
+
+class SSEHub:
+    """
+    GET /live/events 구독자 관리
+
+    구독자마다 작은 큐를 두고 publish는 put_nowait만 하므로 느린 클라이언트가
+    틱을 막지 않습니다. 최근 BROADCAST_REPLAY_SIZE개 메시지를 보관해 재접속한
+    클라이언트(Last-Event-ID 또는 ?since=)에 놓친 메시지를 이어서 보냅니다.
+    """
+
+    def __init__(self, epoch: str, replay_size: int = BROADCAST_REPLAY_SIZE, max_clients: int = BROADCAST_SSE_MAX_CLIENTS):
+        self.epoch = epoch
+        self.max_clients = max_clients
+        self.recent: deque[tuple[int, bytes]] = deque(maxlen=replay_size)
+        self.clients: set[_SSEClient] = set()
+        self.seq = 0
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def _event(self, event: str, seq: int, data: str) -> bytes:
+        return f"id: {self.epoch}:{seq}\nevent: {event}\ndata: {data}\n\n".encode("utf-8")
+
+    def publish(self, seq: int, data: str) -> None:
+        chunk = self._event(DIFF_EVENT, seq, data)
+        with self._lock:
+            self.seq = seq
+            self.recent.append((seq, chunk))
+            for client in list(self.clients):
+                try:
+                    client.queue.put_nowait(chunk)
+                except queue.Full:
+                    client.dropped = True
+                    self.clients.discard(client)
+
+    def _reset(self, seq: int) -> bytes:
+        """클라이언트에 GET /live로 다시 받으라고 알림"""
+        return self._event("reset", seq, json.dumps({"epoch": self.epoch, "seq": seq}))
+
+    def subscribe(self, since: Optional[tuple[str, int]], current: int) -> Optional[tuple[_SSEClient, list[bytes]]]:
+        """
+        구독 등록 + 재전송할 메시지 (같은 잠금 안에서 잡아 사이의 메시지를 놓치지 않음)
+
+        Returns:
+            최대 구독자 수를 넘으면 None
+        """
+        with self._lock:
+            if self._closed or len(self.clients) >= self.max_clients:
+                return None
+            current = max(current, self.seq)
+            client = _SSEClient()
+            self.clients.add(client)
+
+            if since is None:
+                return client, []
+            epoch, seq = since
+            if epoch != self.epoch or seq > current:
+                return client, [self._reset(current)]
+            missed = [chunk for s, chunk in self.recent if s > seq]
+            oldest = self.recent[0][0] if self.recent else current + 1
+            if seq < current and oldest > seq + 1:
+                return client, [self._reset(current)]  # 보관 범위 밖
+            return client, missed
+
+    def unsubscribe(self, client: _SSEClient) -> None:
+        with self._lock:
+            self.clients.discard(client)
+
+    def stream(self, client: _SSEClient, backlog: list[bytes]) -> Iterator[bytes]:
+        try:
+            yield b"retry: 3000\n\n"
+            yield from backlog
+            while not self._closed:
+                try:
+                    chunk = client.queue.get(timeout=SSE_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield b": keepalive\n\n"
+                    continue
+                if chunk is None:
+                    return
+                yield chunk
+                if client.dropped and client.queue.empty():
+                    yield self._reset(self.seq)
+                    return
+        finally:
+            self.unsubscribe(client)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            for client in self.clients:
+                try:
+                    client.queue.put_nowait(None)
+                except queue.Full:
+                    pass
+            self.clients.clear()
+
+
+class RealtimePublisher:
+    """
+    Supabase Realtime broadcast (REST) 전송 스레드
+
+    쌓인 메시지는 요청 한 번에 묶어 보내고, 실패하면 몇 번 재시도한 뒤 버립니다
+    (클라이언트는 seq 공백으로 알아채고 다시 받음).
+    """
+
+    def __init__(self, topic: str = BROADCAST_REALTIME_TOPIC):
+        if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
+            raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set")
+        self.topic = topic
+        self.url = f"{SUPABASE_URL.rstrip('/')}/realtime/v1/api/broadcast"
+        self.messages: "queue.Queue[Optional[dict]]" = queue.Queue(maxsize=REALTIME_QUEUE_MAX)
+        self.sent = 0
+        self.dropped = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, message: dict) -> None:
+        try:
+            self.messages.put_nowait(message)
+        except queue.Full:
+            self.dropped += 1
+
+    def _batch(self) -> tuple[list[dict], bool]:
+        first = self.messages.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        while True:
+            try:
+                message = self.messages.get_nowait()
+            except queue.Empty:
+                return batch, False
+            if message is None:
+                return batch, True
+            batch.append(message)
+
+    def _run(self) -> None:
+        import httpx
+
+        headers = {
+            "apikey": SUPABASE_SERVICE_ROLE_KEY,
+            "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}",
+        }
+        with httpx.Client(timeout=10.0, headers=headers) as client:
+            stopping = False
+            while not stopping:
+                batch, stopping = self._batch()
+                if not batch:
+                    continue
+                body = {"messages": [
+                    {"topic": self.topic, "event": DIFF_EVENT, "payload": message} for message in batch
+                ]}
+                for attempt in range(REALTIME_RETRIES):
+                    try:
+                        client.post(self.url, json=body).raise_for_status()
+                        self.sent += len(batch)
+                        break
+                    except httpx.HTTPError as e:
+                        print(f"[BROADCAST] Realtime send failed (attempt {attempt + 1}): {e}")
+                        time.sleep(2 ** attempt)
+                else:
+                    self.dropped += len(batch)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="realtime-broadcast", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        try:
+            self.messages.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+
+class DiffBroadcaster:
+    """
+    스냅샷 리스너: 바뀐 멤버를 diff 메시지 하나로 만들어 각 경로에 전달
+
+    Example:
+        broadcaster = DiffBroadcaster(snapshot, hub=SSEHub(snapshot.epoch))
+        register_broadcast_routes(server, snapshot, broadcaster.hub)
+    """
+
+    def __init__(self, snapshot: LiveSnapshot, hub: Optional[SSEHub] = None, realtime: Optional[RealtimePublisher] = None):
+        self.snapshot = snapshot
+        self.hub = hub
+        self.realtime = realtime
+        snapshot.listeners.append(self.publish)
+
+    def publish(self, seq: int, changed: list[dict], removed: list[int], live_count: int) -> dict:
+        message = {
+            "v": MESSAGE_VERSION,
+            "epoch": self.snapshot.epoch,
+            "seq": seq,
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "live_count": live_count,
+            "changed": changed,
+            "removed": removed,
+        }
+        if self.hub is not None:
+            self.hub.publish(seq, json.dumps(message, ensure_ascii=False, separators=(",", ":")))
+        if self.realtime is not None:
+            self.realtime.submit(message)
+        if DEBUG:
+            print(f"[BROADCAST] seq {seq}: {len(changed)} changed, {len(removed)} removed")
+        return message
+
+    def start(self) -> None:
+        if self.realtime is not None:
+            self.realtime.start()
+
+    def close(self) -> None:
+        if self.hub is not None:
+            self.hub.close()
+        if self.realtime is not None:
+            self.realtime.stop()
+
+
+def register_broadcast_routes(server: WorkerHTTPServer, snapshot: LiveSnapshot, hub: SSEHub) -> None:
+    """GET /live/events: diff 메시지 SSE 스트림"""
+
+    def events(request: Request) -> Response:
+        headers = {
+            "Content-Type": "text/event-stream; charset=utf-8",
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        }
+        if LIVE_API_CORS_ORIGIN:
+            headers["Access-Control-Allow-Origin"] = LIVE_API_CORS_ORIGIN
+        if request.method == "HEAD":
+            return Response(headers=headers)
+
+        since = parse_version(request.header("last-event-id") or (request.query.get("since") or [None])[0])
+        views = snapshot.views
+        subscribed = hub.subscribe(since, views[ALL_VIEW].version if views else 0)
+        if subscribed is None:
+            return Response.json({"error": "Too many subscribers"}, status=503, headers={"Retry-After": "30"})
+
+        client, backlog = subscribed
+        return Response(headers=headers, stream=hub.stream(client, backlog))
+
+    server.route("GET", r"/live/events", events)
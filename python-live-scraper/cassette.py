@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+PandaTV Traffic Cassettes (Record / Replay)
+
+운영 틱의 /v1/live 원본 응답을 gzip JSONL 카세트로 기록하고,
+실제 API 없이 그대로 다시 재생합니다.
+
+기록 (CASSETTE_RECORD_DIR 설정 시 PandaTV 어댑터가 자동으로 기록):
+    .state/cassettes/live-YYYYMMDD.jsonl.gz
+    한 줄 = 페이지 응답 1개 {"t": 시각, "offset": 0, "status": 200, "body": "..."}
+    offset 0 요청이 새 틱의 시작
+
+재생 (check_multiple_users → batch_update_live_status 경로를 빠른 시간으로 실행):
+    # 하룻밤 트래픽을 60배속으로 (DB는 메모리 집계만)
+    python cassette.py replay .state/cassettes/live-20260123.jsonl.gz --speed 60
+
+    # 대기 없이 최대 속도로, 히스테리시스 포함
+    python cassette.py replay .state/cassettes/ --speed 0 --hysteresis
+
+    # 카세트 요약
+    python cassette.py info .state/cassettes/
+"""
+import argparse
+import gzip
+import json
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from config import CASSETTE_RECORD_DIR, DEBUG
+
+LIVE_PATH = urlparse("https://api.pandalive.co.kr/v1/live").path
+
+
+@dataclass
+class RecordedPage:
+    """기록된 /v1/live 페이지 응답 1개"""
+    t: float
+    offset: int
+    status: int
+    body: str
+
+
+class CassetteWriter:
+    """
+    페이지 응답을 날짜별 카세트 파일에 추가
+
+    줄마다 gzip 멤버 하나로 닫아서, 프로세스가 중간에 죽어도
+    이미 쓴 줄은 그대로 읽을 수 있습니다.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+
+    def path_for(self, t: float) -> Path:
+        return self.directory / f"live-{datetime.fromtimestamp(t):%Y%m%d}.jsonl.gz"
+
+    def write(self, page: RecordedPage) -> None:
+        line = json.dumps(page.__dict__, ensure_ascii=False) + "\n"
+        data = gzip.compress(line.encode("utf-8"), compresslevel=6)
+        with self._lock:
+            path = self.path_for(page.t)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "ab") as f:
+                f.write(data)
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """실제 요청을 보내고 /v1/live 응답을 카세트에 기록하는 httpx 트랜스포트"""
+
+    def __init__(self, inner: httpx.BaseTransport, writer: CassetteWriter):
+        self.inner = inner
+        self.writer = writer
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response = self.inner.handle_request(request)
+        if request.url.path != LIVE_PATH:
+            return response
+
+        response.read()
+        try:
+            self.writer.write(RecordedPage(
+                t=time.time(),
+                offset=int(request.url.params.get("offset", 0)),
+                status=response.status_code,
+                body=response.text,
+            ))
+        except OSError as e:
+            # 기록 실패가 운영 틱을 막지 않도록
+            print(f"[CASSETTE] Failed to record page: {e}")
+        return response
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+def recording_transport(limits: httpx.Limits) -> Optional[httpx.BaseTransport]:
+    """CASSETTE_RECORD_DIR가 설정되어 있으면 기록용 트랜스포트 (아니면 None)"""
+    if not CASSETTE_RECORD_DIR:
+        return None
+    print(f"[CASSETTE] Recording /v1/live responses to {CASSETTE_RECORD_DIR}")
+    return RecordingTransport(httpx.HTTPTransport(limits=limits), CassetteWriter(Path(CASSETTE_RECORD_DIR)))
+
+
+def cassette_files(paths: Iterable[Path]) -> list[Path]:
+    """파일/디렉토리 인자 -> 카세트 파일 목록 (이름 = 날짜 순)"""
+    files = []
+    for path in paths:
+        path = Path(path)
+        files.extend(sorted(path.glob("live-*.jsonl.gz")) if path.is_dir() else [path])
+    return files
+
+
+def read_pages(files: Iterable[Path]) -> Iterator[RecordedPage]:
+    for path in files:
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield RecordedPage(**json.loads(line))
+        except (EOFError, gzip.BadGzipFile) as e:
+            # 기록 중 잘린 마지막 멤버는 무시
+            print(f"[CASSETTE] {path.name}: truncated ({e}), using pages read so far")
+
+
+def read_ticks(files: Iterable[Path]) -> Iterator[list[RecordedPage]]:
+    """페이지를 틱 단위로 묶음 (offset 0에서 새 틱 시작)"""
+    tick: list[RecordedPage] = []
+    for page in read_pages(files):
+        if page.offset == 0 and tick:
+            yield tick
+            tick = []
+        tick.append(page)
+    if tick:
+        yield tick
+
+
+class ReplayTransport(httpx.BaseTransport):
+    """
+    현재 틱의 기록된 페이지로 /v1/live 요청에 응답하는 httpx 트랜스포트
+
+    재생 드라이버가 load_tick()으로 틱을 넘깁니다. 같은 offset을 여러 번 기록했다면
+    (재시도) 요청 순서대로 돌려주고, 기록에 없는 페이지는 503으로 응답합니다.
+    """
+
+    def __init__(self):
+        self._pages: dict[int, list[RecordedPage]] = {}
+        self.requests = 0
+
+    def load_tick(self, pages: list[RecordedPage]) -> None:
+        self._pages = {}
+        for page in pages:
+            self._pages.setdefault(page.offset, []).append(page)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        offset = int(request.url.params.get("offset", 0))
+        recorded = self._pages.get(offset)
+        if not recorded:
+            return httpx.Response(503, text="not recorded", request=request)
+        page = recorded.pop(0) if len(recorded) > 1 else recorded[0]
+        return httpx.Response(
+            page.status,
+            content=page.body.encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            request=request,
+        )
+
+
+class MemoryDatabase:
+    """
+    재생용 DB 대역 - write_live_status_rows가 쓰는 호출만 받아 행 수를 집계
+
+    (live_status upsert / 라이브 플랫폼 select, organization update().in_())
+    """
+
+    def __init__(self):
+        self.writes: dict[str, int] = {}
+        self.calls = 0
+        # (member_id, platform) -> is_live - organization.is_live 재계산 조회용
+        self.live_status: dict[tuple[int, str], bool] = {}
+
+    def table(self, name: str) -> "_MemoryQuery":
+        return _MemoryQuery(self, name)
+
+
+class _MemoryQuery:
+    def __init__(self, db: MemoryDatabase, name: str):
+        self.db = db
+        self.name = name
+        self.count = 0
+        self.rows: list[dict] = []
+        self.selecting = False
+        self.filters: dict[str, object] = {}
+        self.data: list[dict] = []
+
+    def upsert(self, rows: list[dict], **kwargs) -> "_MemoryQuery":
+        self.count = len(rows)
+        self.rows = rows
+        return self
+
+    def select(self, columns: str) -> "_MemoryQuery":
+        self.selecting = True
+        return self
+
+    def update(self, values: dict) -> "_MemoryQuery":
+        return self
+
+    def in_(self, column: str, values: list) -> "_MemoryQuery":
+        self.count = len(values)
+        self.filters[column] = set(values)
+        return self
+
+    def eq(self, column: str, value) -> "_MemoryQuery":
+        self.filters[column] = value
+        return self
+
+    def execute(self):
+        self.db.calls += 1
+        if self.selecting:
+            member_ids = self.filters.get("member_id", set())
+            self.data = [
+                {"member_id": member_id, "platform": platform, "is_live": is_live}
+                for (member_id, platform), is_live in self.db.live_status.items()
+                if member_id in member_ids and ("is_live" not in self.filters or is_live == self.filters["is_live"])
+            ]
+            return self
+
+        for row in self.rows:
+            self.db.live_status[(row["member_id"], row["platform"])] = row["is_live"]
+        self.db.writes[self.name] = self.db.writes.get(self.name, 0) + self.count
+        return self
+
+
+def members_from_cassette(files: list[Path], limit: int) -> list[dict]:
+    """
+    카세트에 라이브로 나온 userId 중 처음 본 순서로 limit명을 멤버로 사용
+
+    실제 멤버 목록 없이도 오프라인↔라이브 전이가 있는 부하를 만들 수 있습니다.
+    """
+    seen: dict[str, None] = {}
+    for page in read_pages(files):
+        if page.status != 200:
+            continue
+        try:
+            streams = json.loads(page.body).get("list", [])
+        except ValueError:
+            continue
+        for stream in streams:
+            seen.setdefault(stream.get("userId"), None)
+            if len(seen) >= limit:
+                break
+        if len(seen) >= limit:
+            break
+    return [
+        {"id": i, "platform": "pandatv", "user_id": user_id, "is_live": False}
+        for i, user_id in enumerate(seen, start=1)
+        if user_id
+    ]
+
+
+def replay(
+    files: list[Path],
+    members: list[dict],
+    speed: float = 60.0,
+    hysteresis: bool = False,
+    client=None,
+) -> dict:
+    """
+    카세트 틱을 순서대로 check_multiple_users → batch_update_live_status로 재생
+
+    Args:
+        speed: 기록 시간 대비 배속 (0이면 대기 없이)
+        hysteresis: LiveStateMachine을 거쳐 쓰기 (--schedule 모드와 동일)
+        client: 쓰기 대상 (없으면 MemoryDatabase)
+    """
+    from db import batch_update_live_status
+    from hysteresis import LiveStateMachine
+    from ratelimit import disable as disable_rate_limit
+    from scraper import check_multiple_users, pandatv_breaker
+
+    # 재생은 실제 API를 부르지 않으므로 공유 속도 제한 / 백오프를 쓰지 않음
+    disable_rate_limit("pandatv_live")
+    # 회로 차단기 대기 시간도 배속에 맞춤 (기록 중 실패 구간이 재생 전체를 막지 않도록)
+    pandatv_breaker.reset_timeout = pandatv_breaker.reset_timeout / speed if speed > 0 else 0.0
+
+    transport = ReplayTransport()
+    http = httpx.Client(transport=transport)
+    db = client if client is not None else MemoryDatabase()
+    state_machine = LiveStateMachine() if hysteresis else None
+    if state_machine is not None:
+        # 재생 멤버는 플랫폼 계정이 하나뿐이라 멤버의 is_live가 곧 계정의 마지막 상태
+        state_machine.seed(members, {(m["id"], m.get("platform", "pandatv")): bool(m.get("is_live")) for m in members})
+
+    user_ids = [m["user_id"] for m in members]
+    stats = {"ticks": 0, "rows": 0, "live_max": 0, "incomplete": 0, "transitions": 0, "tick_ms": []}
+    # user_id -> 확정된 라이브 여부 (전이 횟수 계산용)
+    confirmed = {m["user_id"]: bool(m.get("is_live")) for m in members}
+    started = time.perf_counter()
+    recorded_start: Optional[float] = None
+
+    try:
+        for pages in read_ticks(files):
+            # 기록된 틱 간격을 배속으로 줄여 대기
+            if speed > 0:
+                if recorded_start is None:
+                    recorded_start = pages[0].t
+                due = (pages[0].t - recorded_start) / speed
+                delay = due - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+
+            tick_started = time.perf_counter()
+            transport.load_tick(pages)
+            statuses = check_multiple_users(user_ids, client=http)
+            if state_machine is not None:
+                statuses = state_machine.apply(statuses, members)
+            result = batch_update_live_status(db, members, statuses)
+            if state_machine is not None and result["failed"]:
+                state_machine.invalidate(result["failed"])
+            stats["tick_ms"].append((time.perf_counter() - tick_started) * 1000)
+
+            # 보류(HELD) / 오류 상태는 is_live=False라도 확정 상태가 바뀐 것이 아님
+            for status in statuses:
+                if state_machine is not None:
+                    state = state_machine.states.get((status.platform, status.user_id))
+                    if state is None:
+                        continue
+                    is_live = state.is_live
+                elif status.error:
+                    continue
+                else:
+                    is_live = status.is_live
+                if confirmed.get(status.user_id, False) != is_live:
+                    stats["transitions"] += 1
+                confirmed[status.user_id] = is_live
+            stats["ticks"] += 1
+            stats["rows"] += result["updated"]
+            stats["live_max"] = max(stats["live_max"], result["live"])
+            stats["incomplete"] += result["incomplete"]
+            if DEBUG:
+                print(f"[REPLAY] tick {stats['ticks']}: {result['live']} live, {result['updated']} row(s)")
+    finally:
+        http.close()
+
+    stats["elapsed"] = time.perf_counter() - started
+    stats["requests"] = transport.requests
+    if isinstance(db, MemoryDatabase):
+        stats["db_calls"] = db.calls
+        stats["db_writes"] = db.writes
+    return stats
+
+
+def print_info(files: list[Path]) -> None:
+    ticks = pages = failed = 0
+    first = last = None
+    for tick in read_ticks(files):
+        ticks += 1
+        pages += len(tick)
+        failed += sum(1 for page in tick if page.status != 200)
+        first = first or tick[0].t
+        last = tick[-1].t
+    print(f"Files: {len(files)}")
+    print(f"Ticks: {ticks}, pages: {pages}, non-200 pages: {failed}")
+    if first is not None:
+        print(f"Recorded: {datetime.fromtimestamp(first):%Y-%m-%d %H:%M:%S} ~ {datetime.fromtimestamp(last):%H:%M:%S} "
+              f"({(last - first) / 3600:.1f}h)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record/replay PandaTV /v1/live traffic")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    info = sub.add_parser("info", help="Summarize cassettes")
+    info.add_argument("paths", nargs="+", type=Path)
+
+    play = sub.add_parser("replay", help="Replay cassettes through the sync path")
+    play.add_argument("paths", nargs="+", type=Path, help="Cassette files or directories")
+    play.add_argument("--speed", type=float, default=60.0, help="Time acceleration (0 = no waiting)")
+    play.add_argument("--members", type=int, default=200, help="Members taken from the cassette")
+    play.add_argument("--db-members", action="store_true", help="Use real members from Supabase instead")
+    play.add_argument("--write-db", action="store_true",
+                      help="Write to Supabase instead of memory (requires --db-members)")
+    play.add_argument("--hysteresis", action="store_true", help="Apply LiveStateMachine like --schedule")
+    args = parser.parse_args()
+    if args.command == "replay" and args.write_db and not args.db_members:
+        # 카세트에서 만든 멤버(id 1..N)는 실제 멤버가 아니므로 실제 테이블에 쓰면 안 됨
+        play.error("--write-db requires --db-members")
+
+    files = cassette_files(args.paths)
+    if not files:
+        raise SystemExit("No cassette files found")
+
+    if args.command == "info":
+        print_info(files)
+        return
+
+    client = None
+    if args.db_members:
+        from db import get_supabase_client, get_pandatv_members
+        supabase = get_supabase_client()
+        client = supabase if args.write_db else None
+        members = get_pandatv_members(supabase)
+    else:
+        members = members_from_cassette(files, args.members)
+
+    print(f"Replaying {len(files)} cassette(s) for {len(members)} member(s) at "
+          f"{'max speed' if args.speed <= 0 else f'{args.speed:g}x'}")
+    stats = replay(files, members, speed=args.speed, hysteresis=args.hysteresis, client=client)
+
+    tick_ms = sorted(stats["tick_ms"]) or [0.0]
+    print(f"\nTicks: {stats['ticks']} in {stats['elapsed']:.1f}s ({stats['requests']} replayed request(s))")
+    print(f"  Tick time: avg {sum(tick_ms) / len(tick_ms):.1f}ms, p95 {tick_ms[int(len(tick_ms) * 0.95)]:.1f}ms")
+    print(f"  Rows written: {stats['rows']}, live transitions: {stats['transitions']}, "
+          f"max live: {stats['live_max']}, incomplete ticks: {stats['incomplete']}")
+    if "db_writes" in stats:
+        print(f"  DB calls: {stats['db_calls']} {stats['db_writes']}")
+
+
+if __name__ == "__main__":
+    main()
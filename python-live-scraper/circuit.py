@@ -0,0 +1,72 @@
+"""
+Circuit Breaker
+
+업스트림 API가 연속으로 실패하면 일정 시간 호출을 멈춰(open)
+타임아웃을 기다리는 틱과 재시도 폭주를 막습니다.
+
+    closed    -> 정상 호출, 연속 실패가 failure_threshold에 도달하면 open
+    open      -> 호출 차단, reset_timeout이 지나면 half_open
+    half_open -> 시험 호출 1회 허용 (결과가 나올 때까지 다른 호출은 차단),
+                 성공하면 closed / 실패하면 다시 open
+"""
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        # half_open 시험 호출 진행 중 여부 (결과 없이 reset_timeout이 지나면 버려진 시험으로 간주)
+        self.trial_in_flight = False
+        self.trial_started_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        호출 가능 여부
+
+        open 상태에서 reset_timeout이 지나면 half_open으로 전환하고 호출자 한 명에게만
+        시험 호출을 허용합니다. 시험 결과(record_success/record_failure)가 나올 때까지
+        다른 호출자는 False를 받습니다.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if now - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = HALF_OPEN
+                print(f"[CIRCUIT] {self.name}: half-open, trying one request")
+            elif self.trial_in_flight and now - self.trial_started_at < self.reset_timeout:
+                return False
+            self.trial_in_flight = True
+            self.trial_started_at = now
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != CLOSED:
+                print(f"[CIRCUIT] {self.name}: closed")
+            self.state = CLOSED
+            self.failures = 0
+            self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.trial_in_flight = False
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    print(f"[CIRCUIT] {self.name}: open for {self.reset_timeout:g}s after {self.failures} failure(s)")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
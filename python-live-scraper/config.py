@@ -2,9 +2,28 @@
 Configuration settings for PandaTV Live Status Checker
 """
 import os
-from dotenv import load_dotenv
+from pathlib import Path
 
-load_dotenv()
+
+def _load_env_file() -> None:
+    """
+    .env 파일이 있을 때만 python-dotenv로 로드
+
+    Railway 등 환경변수가 주입되는 배포 환경에서는 .env가 없으므로
+    dotenv import 비용 없이 바로 시작합니다.
+    """
+    candidates = (Path.cwd() / ".env", Path(__file__).resolve().parent / ".env")
+    if not any(path.is_file() for path in candidates):
+        return
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+_load_env_file()
+
+# 런타임 상태 파일 (쓰기 저널, 캐시 등) 저장 위치
+STATE_DIR = Path(os.getenv("STATE_DIR", str(Path(__file__).resolve().parent / ".state")))
 
 # Supabase
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -13,6 +32,119 @@ SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 # Checker settings
 SCRAPE_INTERVAL_SECONDS = int(os.getenv("SCRAPE_INTERVAL_SECONDS", "120"))
 
+# PandaTV 회로 차단기: 연속 N회 실패 시 reset 시간 동안 호출 중단
+PANDATV_BREAKER_FAILURES = int(os.getenv("PANDATV_BREAKER_FAILURES", "3"))
+PANDATV_BREAKER_RESET_SECONDS = float(os.getenv("PANDATV_BREAKER_RESET_SECONDS", "300"))
+
+# 요청 속도 제한 (ratelimit.py) - 엔드포인트=초당 요청 수:버스트
+# 같은 STATE_DIR을 쓰는 워커, --list/--test, 크롤러가 예산을 함께 사용
+RATE_LIMITS = os.getenv(
+    "RATE_LIMITS",
+    "pandatv_live=2:5,pandatv_channel=1:2,chzzk=10:10,youtube=5:5",
+)
+RATE_LIMIT_MAX_BACKOFF_SECONDS = float(os.getenv("RATE_LIMIT_MAX_BACKOFF_SECONDS", "120"))
+
+# PandaTV /v1/live 응답 카세트 기록 위치 (비어 있으면 기록 안 함, 재생은 cassette.py)
+CASSETTE_RECORD_DIR = os.getenv("CASSETTE_RECORD_DIR", "")
+
+# 상태 전이 히스테리시스 (--schedule / --push 모드)
+# 라이브 -> 오프라인은 N회 연속 오프라인 + 유예 시간이 지나야 반영
+OFFLINE_CONFIRMATIONS = int(os.getenv("OFFLINE_CONFIRMATIONS", "2"))
+OFFLINE_GRACE_SECONDS = float(os.getenv("OFFLINE_GRACE_SECONDS", "0"))
+# 값이 그대로인 멤버는 쓰지 않되, 이 주기마다 한 번은 last_checked 갱신
+UNCHANGED_HEARTBEAT_SECONDS = float(os.getenv("UNCHANGED_HEARTBEAT_SECONDS", "600"))
+
+# 멀티 플랫폼 (자격 증명이 없는 플랫폼은 비활성화)
+TWITCH_CLIENT_ID = os.getenv("TWITCH_CLIENT_ID", "")
+TWITCH_CLIENT_SECRET = os.getenv("TWITCH_CLIENT_SECRET", "")
+YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY", "")
+PLATFORM_TICK_TIMEOUT_SECONDS = float(os.getenv("PLATFORM_TICK_TIMEOUT_SECONDS", "30"))
+
+# 썸네일 프록시 캐시 (선택, --schedule / --push 모드)
+THUMBNAIL_PROXY_ENABLED = os.getenv("THUMBNAIL_PROXY_ENABLED", "false").lower() == "true"
+THUMBNAIL_DIR = Path(os.getenv("THUMBNAIL_DIR", str(STATE_DIR / "thumbnails")))
+# 로컬 캐시를 서빙하는 공개 URL (워커 HTTP 서버의 /thumbnails, 예: https://worker.example.com/thumbnails)
+# 버킷 없이 쓰려면 필수 - 비어 있거나 localhost면 프록시를 끄고 플랫폼 썸네일 URL 사용
+THUMBNAIL_PUBLIC_BASE_URL = os.getenv("THUMBNAIL_PUBLIC_BASE_URL", "")
+# 설정 시 Supabase Storage 버킷에 업로드하고 공개 URL 사용
+THUMBNAIL_BUCKET = os.getenv("THUMBNAIL_BUCKET", "")
+# 대표 URL은 가장 큰 폭 → 비어 있거나 양수 폭이 없으면 기본값 사용
+THUMBNAIL_WIDTHS = tuple(
+    int(w) for w in os.getenv("THUMBNAIL_WIDTHS", "320,640").split(",") if w.strip() and int(w) > 0
+) or (320, 640)
+THUMBNAIL_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", "80"))
+THUMBNAIL_CONCURRENCY = int(os.getenv("THUMBNAIL_CONCURRENCY", "4"))
+THUMBNAIL_CACHE_MAX_MB = int(os.getenv("THUMBNAIL_CACHE_MAX_MB", "200"))
+
+# 후원 랭킹 증분 갱신 (python main.py --rankings, 또는 --schedule 중 주기 실행)
+RANKINGS_INTERVAL_SECONDS = int(os.getenv("RANKINGS_INTERVAL_SECONDS", "0"))  # 0이면 스케줄 비활성화
+RANKINGS_TOP_K = int(os.getenv("RANKINGS_TOP_K", "50"))
+RANKINGS_PAGE_SIZE = int(os.getenv("RANKINGS_PAGE_SIZE", "1000"))
+# 쓸 테이블: total(total_donation_rankings), season(season_donation_rankings)
+RANKINGS_TABLES = tuple(t.strip() for t in os.getenv("RANKINGS_TABLES", "season,total").split(",") if t.strip())
+RANKINGS_STATE_PATH = Path(os.getenv("RANKINGS_STATE_PATH", str(STATE_DIR / "rankings.pickle")))
+
+# 후원 내역 일괄 가져오기 (import_donations.py)
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+# 내보내기 파일의 시각에 시간대가 없을 때 기준 (PandaTV는 한국 시간)
+IMPORT_TIMEZONE = os.getenv("IMPORT_TIMEZONE", "Asia/Seoul")
+
+# 테이블 내보내기 (exporter.py)
+EXPORT_CONCURRENCY = int(os.getenv("EXPORT_CONCURRENCY", "4"))
+EXPORT_PAGE_SIZE = int(os.getenv("EXPORT_PAGE_SIZE", "1000"))
+
+# Worker HTTP server (push 모드 웹훅 수신)
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("PORT", "8080"))
+
+# 라이브 상태 읽기 API (snapshot.py, --schedule / --push 워커의 HTTP 서버)
+LIVE_API_ENABLED = os.getenv("LIVE_API_ENABLED", "true").lower() == "true"
+LIVE_API_MAX_AGE_SECONDS = int(os.getenv("LIVE_API_MAX_AGE_SECONDS", "15"))
+LIVE_API_CORS_ORIGIN = os.getenv("LIVE_API_CORS_ORIGIN", "")  # 비어 있으면 CORS 헤더 없음
+
+# 틱 단위 diff 브로드캐스트 (broadcast.py)
+BROADCAST_SSE_ENABLED = os.getenv("BROADCAST_SSE_ENABLED", "true").lower() == "true"  # GET /live/events
+BROADCAST_REALTIME_TOPIC = os.getenv("BROADCAST_REALTIME_TOPIC", "")  # 비어 있으면 Supabase Realtime 전송 안 함
+BROADCAST_REPLAY_SIZE = int(os.getenv("BROADCAST_REPLAY_SIZE", "100"))
+BROADCAST_SSE_MAX_CLIENTS = int(os.getenv("BROADCAST_SSE_MAX_CLIENTS", "200"))
+
+# 방송 시작 알림 (notify.py) - 대상이 없으면 비활성화
+NOTIFY_WEBHOOK_URLS = os.getenv("NOTIFY_WEBHOOK_URLS", "")  # "이름=URL,이름=URL"
+NOTIFY_WEBHOOK_SECRET = os.getenv("NOTIFY_WEBHOOK_SECRET", "")  # 있으면 X-Signature: sha256=<HMAC>
+NOTIFY_OUTBOX_PATH = Path(os.getenv("NOTIFY_OUTBOX_PATH", str(STATE_DIR / "notify_outbox.sqlite3")))
+NOTIFY_BATCH_SIZE = int(os.getenv("NOTIFY_BATCH_SIZE", "50"))
+NOTIFY_BATCH_WINDOW_MS = int(os.getenv("NOTIFY_BATCH_WINDOW_MS", "100"))
+NOTIFY_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "8"))
+NOTIFY_SESSION_GAP_SECONDS = int(os.getenv("NOTIFY_SESSION_GAP_SECONDS", "600"))  # 이 안에 다시 켜면 같은 방송
+NOTIFY_MAX_AGE_SECONDS = int(os.getenv("NOTIFY_MAX_AGE_SECONDS", "3600"))  # 이보다 늦어진 알림은 보내지 않음
+
+# 조직 전체 라이브 집계 (rollups.py) - 바뀐 틱에만 한 행 upsert
+ROLLUP_ENABLED = os.getenv("ROLLUP_ENABLED", "true").lower() == "true"
+ROLLUP_TABLE = os.getenv("ROLLUP_TABLE", "live_summary")  # 비우면 DB에 쓰지 않음
+ROLLUP_ARTIFACT_PATH = os.getenv("ROLLUP_ARTIFACT_PATH", "")  # 예: data/live-summary.json
+
+# Push 모드: 이벤트는 웹훅으로 받고, 폴링은 느린 정합성 검사로만 실행
+PUSH_WEBHOOK_SECRET = os.getenv("PUSH_WEBHOOK_SECRET", "")
+RECONCILE_INTERVAL_SECONDS = int(os.getenv("RECONCILE_INTERVAL_SECONDS", "900"))
+
+# Write-behind 쓰기 큐 (--schedule / --push 모드)
+WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND_ENABLED", "true").lower() == "true"
+WRITE_FLUSH_INTERVAL_SECONDS = float(os.getenv("WRITE_FLUSH_INTERVAL_SECONDS", "5"))
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", "50"))
+WRITE_QUEUE_MAX = int(os.getenv("WRITE_QUEUE_MAX", "1000"))
+WRITE_RETRY_MAX_DELAY = float(os.getenv("WRITE_RETRY_MAX_DELAY", "300"))
+WRITE_JOURNAL_PATH = Path(os.getenv(
+    "WRITE_JOURNAL_PATH",
+    str(STATE_DIR / "write_journal.jsonl"),
+))
+
+# 워커 메모리 관찰 (memwatch.py, --schedule / --push)
+MEMORY_WATCH_ENABLED = os.getenv("MEMORY_WATCH_ENABLED", "true").lower() == "true"
+MEMORY_TRACE_EVERY_TICKS = int(os.getenv("MEMORY_TRACE_EVERY_TICKS", "0"))  # 0이면 tracemalloc 끔
+MEMORY_TRACE_TOP = int(os.getenv("MEMORY_TRACE_TOP", "10"))
+MEMORY_TRACE_FRAMES = int(os.getenv("MEMORY_TRACE_FRAMES", "1"))
+MEMORY_CEILING_MB = float(os.getenv("MEMORY_CEILING_MB", "0"))  # 0이면 상한 없음
+
 # Debug
 DEBUG = os.getenv("DEBUG", "false").lower() == "true"
 
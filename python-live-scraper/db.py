@@ -1,150 +1,253 @@
 """
 Supabase Database Operations
 """
+import threading
 from datetime import datetime, timezone
-from typing import Optional
-from supabase import create_client, Client
+from typing import Optional, TYPE_CHECKING
 
 from config import SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY, DEBUG
-from scraper import LiveStatus
+from scraper import LiveStatus, UNCONFIRMED_ERROR, HELD_ERROR, UNCHANGED_ERROR
 
+if TYPE_CHECKING:
+    from supabase import Client
+    from writer import WriteBehindQueue
 
-def get_supabase_client() -> Client:
+
+def get_supabase_client() -> "Client":
     """Supabase 클라이언트 생성"""
     if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
         raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set")
 
+    # supabase는 로드가 무거워 DB를 실제로 쓰는 시점에 import
+    from supabase import create_client
+
     return create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
 
 
-def get_pandatv_members(client: Client) -> list[dict]:
+# live_status.platform CHECK 제약과 동일
+SUPPORTED_PLATFORMS = ("pandatv", "chzzk", "twitch", "youtube")
+
+
+def get_platform_members(client: "Client", platforms: tuple[str, ...] = SUPPORTED_PLATFORMS) -> list[dict]:
     """
-    PandaTV ID가 있는 활성 멤버 조회
+    플랫폼 계정이 연결된 활성 멤버 조회
 
-    social_links.pandatv에 ID만 저장되어 있음 (예: "hj042300")
+    social_links.<platform>에 ID 또는 채널 URL이 저장되어 있음
+    (예: {"pandatv": "hj042300", "youtube": "https://youtube.com/@..."})
+    멤버가 여러 플랫폼을 쓰면 플랫폼마다 한 항목씩 반환합니다.
 
     Returns:
-        [{"id": 1, "user_id": "hj042300", "is_live": false}, ...]
+        [{"id": 1, "platform": "pandatv", "user_id": "hj042300", "is_live": false,
+          "name": "...", "unit": "excel"}, ...]
     """
     response = client.table("organization").select(
-        "id, social_links, is_live"
+        "id, name, unit, social_links, is_live"
     ).eq("is_active", True).execute()
 
     members = []
     for row in response.data:
         social_links = row.get("social_links") or {}
-        pandatv_id = social_links.get("pandatv")
 
-        if pandatv_id:
-            members.append({
-                "id": row["id"],
-                "user_id": pandatv_id,  # ID 직접 사용
-                "is_live": row.get("is_live", False)
-            })
+        for platform in platforms:
+            account = social_links.get(platform)
+            if account:
+                members.append({
+                    "id": row["id"],
+                    "platform": platform,
+                    "user_id": account,
+                    "is_live": row.get("is_live", False),
+                    "name": row.get("name"),
+                    "unit": row.get("unit"),
+                })
 
     return members
 
 
-def update_live_status(
-    client: Client,
-    member_id: int,
-    user_id: str,
-    status: LiveStatus
-) -> None:
+def get_live_status_map(client: "Client", member_ids: list[int]) -> dict[tuple[int, str], bool]:
     """
-    라이브 상태 업데이트
+    멤버들의 플랫폼별 마지막 라이브 상태 (live_status)
 
-    - live_status 테이블 upsert
-    - organization.is_live 업데이트
+    Returns:
+        {(member_id, platform): is_live} - 행이 없는 계정은 포함되지 않음
     """
-    now = datetime.now(timezone.utc).isoformat()
+    if not member_ids:
+        return {}
+    response = client.table("live_status").select(
+        "member_id, platform, is_live"
+    ).in_("member_id", sorted(set(member_ids))).execute()
+    return {(row["member_id"], row["platform"]): bool(row["is_live"]) for row in response.data}
+
 
-    # live_status 테이블 업데이트 (존재 확인 후 insert/update)
-    live_status_data = {
+def get_pandatv_members(client: "Client") -> list[dict]:
+    """
+    PandaTV ID가 있는 활성 멤버 조회
+
+    social_links.pandatv에 ID만 저장되어 있음 (예: "hj042300")
+
+    Returns:
+        [{"id": 1, "platform": "pandatv", "user_id": "hj042300", "is_live": false}, ...]
+    """
+    return get_platform_members(client, ("pandatv",))
+
+
+def build_live_status_row(member_id: int, user_id: str, status: LiveStatus, checked_at: str) -> dict:
+    """live_status 테이블에 쓸 행 생성"""
+    return {
         "member_id": member_id,
-        "platform": "pandatv",
-        "stream_url": f"https://www.pandalive.co.kr/play/{user_id}",
+        "platform": status.platform,
+        "stream_url": status.stream_url or f"https://www.pandalive.co.kr/play/{user_id}",
         "thumbnail_url": status.thumbnail_url,
         "is_live": status.is_live,
         "viewer_count": status.viewer_count or 0,
-        "last_checked": now,
+        "last_checked": checked_at,
     }
 
-    try:
-        # 먼저 기존 레코드 확인
-        existing = client.table("live_status").select("id").eq(
-            "member_id", member_id
-        ).eq("platform", "pandatv").execute()
-
-        if existing.data:
-            # 존재하면 업데이트
-            client.table("live_status").update({
-                "stream_url": live_status_data["stream_url"],
-                "thumbnail_url": live_status_data["thumbnail_url"],
-                "is_live": live_status_data["is_live"],
-                "viewer_count": live_status_data["viewer_count"],
-                "last_checked": live_status_data["last_checked"],
-            }).eq("member_id", member_id).eq("platform", "pandatv").execute()
-        else:
-            # 없으면 삽입
-            client.table("live_status").insert(live_status_data).execute()
-
-        if DEBUG:
-            print(f"[DB] Updated live_status for member {member_id}")
-    except Exception as e:
-        print(f"[DB] Error updating live_status: {e}")
 
-    # organization.is_live 업데이트
-    try:
-        client.table("organization").update({
-            "is_live": status.is_live
-        }).eq("id", member_id).execute()
+# 틱 스레드와 푸시 수신 스레드가 직접 쓸 때(write-behind 꺼짐) upsert와 is_live 재계산이 엇갈리지 않도록
+_write_lock = threading.Lock()
 
-        if DEBUG:
-            print(f"[DB] Updated organization.is_live for member {member_id} to {status.is_live}")
-    except Exception as e:
-        print(f"[DB] Error updating organization: {e}")
+
+def write_live_status_rows(client: "Client", rows: list[dict]) -> None:
+    """
+    live_status 행 일괄 쓰기
+
+    - live_status: (member_id, platform) unique constraint 기준 upsert 1회
+    - organization.is_live: 행이 쓰인 멤버의 live_status 전체(모든 플랫폼의 마지막 상태)를
+      조회 1회로 다시 계산한 뒤 라이브/오프라인 각각 update 1회
+      (멤버의 플랫폼 중 하나라도 라이브면 라이브)
+
+    배치에 멤버의 일부 플랫폼만 들어와도 (미확인 플랫폼, 쓰기 큐 배치 경계, 푸시 이벤트)
+    다른 플랫폼의 라이브 상태를 덮어쓰지 않습니다.
+
+    실패 시 예외를 그대로 올려 호출자(쓰기 큐)가 재시도하도록 합니다.
+    """
+    if not rows:
+        return
+
+    member_ids = sorted({row["member_id"] for row in rows})
+
+    with _write_lock:
+        client.table("live_status").upsert(
+            rows, on_conflict="member_id,platform"
+        ).execute()
+
+        response = client.table("live_status").select("member_id").in_(
+            "member_id", member_ids
+        ).eq("is_live", True).execute()
+        live_members = {row["member_id"] for row in response.data}
+
+        for is_live in (True, False):
+            ids = [m for m in member_ids if (m in live_members) == is_live]
+            if ids:
+                client.table("organization").update({
+                    "is_live": is_live
+                }).in_("id", ids).execute()
+
+    if DEBUG:
+        print(f"[DB] Wrote {len(rows)} live_status row(s)")
+
+
+def update_live_status(
+    client: "Client",
+    member_id: int,
+    user_id: str,
+    status: LiveStatus
+) -> None:
+    """
+    라이브 상태 업데이트 (단건)
+
+    - live_status 테이블 upsert
+    - organization.is_live 업데이트
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    write_live_status_rows(client, [build_live_status_row(member_id, user_id, status, now)])
 
 
 def batch_update_live_status(
-    client: Client,
+    client: "Client",
     members: list[dict],
-    statuses: list[LiveStatus]
+    statuses: list[LiveStatus],
+    writer: Optional["WriteBehindQueue"] = None,
 ) -> dict:
     """
     여러 멤버의 라이브 상태 일괄 업데이트
 
+    writer가 주어지면 쓰기 큐에 넣고 바로 반환하며 (write-behind),
+    없으면 한 번의 일괄 쓰기로 즉시 반영합니다.
+
+    상태가 확인되지 않은 멤버(조회가 중간에 실패한 틱)는 쓰지 않고
+    DB의 마지막 상태를 유지합니다. 이 경우 incomplete가 True가 됩니다.
+    상태 머신이 보류(HELD_ERROR)하거나 변화 없음(UNCHANGED_ERROR)으로 표시한
+    멤버도 쓰지 않습니다.
+
     Returns:
-        {"total": 10, "updated": 8, "live": 2, "errors": [...]}
+        {"total": 10, "updated": 8, "live": 2, "unconfirmed": 0, "held": 0,
+         "unchanged": 0, "incomplete": False, "errors": [...], "failed": [...]}
+        failed: 쓰기에 실패한 (platform, user_id) 목록
     """
     result = {
         "total": len(members),
         "updated": 0,
         "live": 0,
-        "errors": []
+        "unconfirmed": 0,
+        "held": 0,
+        "unchanged": 0,
+        "incomplete": False,
+        "errors": [],
+        "failed": [],
     }
 
-    # user_id -> status 맵
-    status_map = {s.user_id: s for s in statuses}
+    # (platform, user_id) -> status 맵
+    status_map = {(s.platform, s.user_id): s for s in statuses}
+    now = datetime.now(timezone.utc).isoformat()
+    rows = []
+    keys = []
 
     for member in members:
         user_id = member["user_id"]
-        status = status_map.get(user_id)
+        status = status_map.get((member.get("platform", "pandatv"), user_id))
 
         if not status:
             result["errors"].append(f"No status for {user_id}")
             continue
 
-        if status.error:
-            result["errors"].append(f"{user_id}: {status.error}")
+        if status.error == UNCONFIRMED_ERROR:
+            result["unconfirmed"] += 1
+            result["incomplete"] = True
             continue
 
-        try:
-            update_live_status(client, member["id"], user_id, status)
-            result["updated"] += 1
+        if status.error == HELD_ERROR:
+            # 라이브로 확정된 상태 유지 - live 수에 포함
+            result["held"] += 1
+            result["live"] += 1
+            continue
+
+        if status.error == UNCHANGED_ERROR:
+            result["unchanged"] += 1
             if status.is_live:
                 result["live"] += 1
-        except Exception as e:
-            result["errors"].append(f"{user_id}: {str(e)}")
+            continue
+
+        if status.error:
+            result["errors"].append(f"{user_id}: {status.error}")
+            continue
+
+        rows.append(build_live_status_row(member["id"], user_id, status, now))
+        keys.append((status.platform, user_id))
+        if status.is_live:
+            result["live"] += 1
+
+    if writer is not None:
+        writer.enqueue_many(rows)
+        result["updated"] = len(rows)
+        return result
+
+    try:
+        write_live_status_rows(client, rows)
+        result["updated"] = len(rows)
+    except Exception as e:
+        result["live"] = 0
+        result["failed"] = keys
+        result["errors"].append(f"Batch write failed ({len(rows)} rows): {e}")
 
     return result
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Supabase Table Exporter
+
+테이블을 keyset pagination(key > 마지막 key, key 순 정렬)으로 읽어
+압축 파일(gzip NDJSON 또는 CSV)로 바로 흘려 씁니다. 메모리에는 한 페이지만 둡니다.
+
+- 여러 테이블을 동시에 내보냄 (EXPORT_CONCURRENCY)
+- 페이지마다 gzip 멤버 하나를 닫고 manifest.json에 (마지막 key, 파일 오프셋) 기록
+  → 중단된 내보내기는 같은 명령으로 이어서 실행 (오프셋 이후의 잘린 부분은 버림)
+- 증분 내보내기: 이전 스냅샷 이후 바뀐 행만
+  - updated_at 등 변경 시각 컬럼이 있는 테이블: 이전 스냅샷 시작 시각 이후 변경된 행
+  - 추가만 되는 테이블(donations 등): 이전 스냅샷의 마지막 key 이후
+  - 둘 다 아닌 작은 테이블: 전체
+
+출력:
+    data/db-export-YYYYMMDD/        전체 (analytics.py가 .csv.gz도 읽음)
+    data/db-delta-YYYYMMDD-HHMMSS/  증분
+
+Usage:
+    # 전체 내보내기 (기본 CSV)
+    python exporter.py
+
+    # NDJSON, 일부 테이블만
+    python exporter.py --format ndjson --tables donations,organization
+
+    # 이전 스냅샷 이후 변경분만
+    python exporter.py --incremental
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional, TYPE_CHECKING
+
+from config import EXPORT_CONCURRENCY, EXPORT_PAGE_SIZE
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+EXPORT_ROOT = Path(__file__).resolve().parent.parent / "data"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+FORMATS = ("ndjson", "csv")
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    """내보낼 테이블"""
+    name: str
+    key: str = "id"
+    # 증분 기준 변경 시각 컬럼 (없으면 append_only 또는 전체)
+    changed: Optional[str] = None
+    # 행이 추가만 되고 수정되지 않음 → key 기준 증분
+    append_only: bool = False
+
+    def incremental_mode(self) -> str:
+        if self.changed:
+            return "changed"
+        return "append" if self.append_only else "full"
+
+
+EXPORT_TABLES = {spec.name: spec for spec in (
+    TableSpec("profiles", changed="updated_at"),
+    TableSpec("seasons"),
+    TableSpec("episodes"),
+    TableSpec("donations", append_only=True),
+    TableSpec("organization"),
+    TableSpec("schedules"),
+    TableSpec("total_donation_rankings", changed="updated_at"),
+    TableSpec("season_donation_rankings", changed="updated_at"),
+    TableSpec("vip_rewards", append_only=True),
+    TableSpec("vip_images", append_only=True),
+    TableSpec("banners", changed="updated_at"),
+    TableSpec("notices", changed="updated_at"),
+    TableSpec("posts", changed="updated_at"),
+    TableSpec("comments", append_only=True),
+    TableSpec("signatures", append_only=True),
+    TableSpec("media_content", append_only=True),
+    TableSpec("timeline_events", append_only=True),
+    TableSpec("live_status", changed="last_checked"),
+)}
+
+
+def _csv_value(value: Any) -> str:
+    """CSV 셀 값 (기존 db-export 형식: null은 빈 칸, bool은 true/false, 객체는 JSON)"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+class Manifest:
+    """
+    스냅샷 manifest.json (테이블별 진행 상황 = 체크포인트)
+
+    여러 스레드가 갱신하므로 잠금 후 임시 파일 + rename으로 저장합니다.
+    """
+
+    def __init__(self, path: Path, data: dict):
+        self.path = path
+        self.data = data
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, export_dir: Path) -> Optional["Manifest"]:
+        path = export_dir / MANIFEST_NAME
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != MANIFEST_VERSION:
+            return None
+        return cls(path, data)
+
+    @property
+    def complete(self) -> bool:
+        return bool(self.data.get("completed_at"))
+
+    def table(self, name: str) -> dict:
+        return self.data["tables"][name]
+
+    def update_table(self, name: str, **values) -> None:
+        with self._lock:
+            self.data["tables"][name].update(values)
+            self._save()
+
+    def finish(self) -> None:
+        with self._lock:
+            self.data["completed_at"] = datetime.now(timezone.utc).isoformat()
+            self._save()
+
+    def save(self) -> None:
+        with self._lock:
+            self._save()
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.data, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+
+def list_snapshots(root: Path = EXPORT_ROOT) -> list[tuple[Path, Manifest]]:
+    """manifest가 있는 스냅샷 (시작 시각 순)"""
+    snapshots = []
+    for path in list(root.glob("db-export-*")) + list(root.glob("db-delta-*")):
+        manifest = Manifest.load(path) if path.is_dir() else None
+        if manifest is not None:
+            snapshots.append((path, manifest))
+    return sorted(snapshots, key=lambda item: item[1].data["started_at"])
+
+
+def plan_export(
+    tables: list[str],
+    fmt: str,
+    incremental: bool,
+    root: Path = EXPORT_ROOT,
+    out: Optional[Path] = None,
+) -> Manifest:
+    """
+    이어서 할 스냅샷을 찾거나 새 스냅샷 manifest 생성
+
+    증분이면 마지막 완료 스냅샷을 기준(base)으로 테이블별 시작 조건을 정합니다.
+    """
+    mode = "incremental" if incremental else "full"
+    snapshots = list_snapshots(root)
+
+    # 같은 모드의 미완료 스냅샷이 있으면 이어서
+    if out is None:
+        for path, manifest in reversed(snapshots):
+            if not manifest.complete and manifest.data["mode"] == mode and manifest.data["format"] == fmt:
+                print(f"[EXPORT] Resuming {path.name}")
+                return manifest
+    elif (existing := Manifest.load(out)) is not None:
+        print(f"[EXPORT] Resuming {out.name}")
+        return existing
+
+    now = datetime.now(timezone.utc)
+    base: Optional[Manifest] = None
+    if incremental:
+        completed = [manifest for _, manifest in snapshots if manifest.complete]
+        if not completed:
+            raise SystemExit("[EXPORT] No completed snapshot with a manifest - run a full export first")
+        base = completed[-1]
+
+    if out is None:
+        local = now.astimezone()
+        name = f"db-delta-{local:%Y%m%d-%H%M%S}" if incremental else f"db-export-{local:%Y%m%d}"
+        out = root / name
+        if out.exists():
+            # 같은 날 이미 있는 스냅샷은 덮어쓰지 않음
+            out = root / f"{name}-{local:%H%M%S}"
+
+    entries = {}
+    for name in tables:
+        spec = EXPORT_TABLES[name]
+        entry = {
+            "file": f"db_{name}.{fmt}.gz",
+            "rows": 0,
+            "offset": 0,
+            "last_key": None,
+            "columns": None,
+            "complete": False,
+            "since": None,
+            "after_key": None,
+        }
+        if base is not None and name in base.data["tables"]:
+            previous = base.table(name)
+            strategy = spec.incremental_mode()
+            if strategy == "changed":
+                # 이전 스냅샷이 읽는 도중 바뀐 행도 포함되도록 시작 시각 기준
+                entry["since"] = base.data["started_at"]
+            elif strategy == "append":
+                entry["after_key"] = previous.get("last_key") or previous.get("after_key")
+        entries[name] = entry
+
+    manifest = Manifest(out / MANIFEST_NAME, {
+        "version": MANIFEST_VERSION,
+        "mode": mode,
+        "format": fmt,
+        "base": base.path.parent.name if base else None,
+        "started_at": now.isoformat(),
+        "completed_at": None,
+        "tables": entries,
+    })
+    manifest.save()
+    print(f"[EXPORT] Writing {out.name} ({mode}, {fmt})")
+    return manifest
+
+
+def export_table(client: "Client", manifest: Manifest, name: str, page_size: int = EXPORT_PAGE_SIZE) -> int:
+    """
+    테이블 1개 내보내기 (체크포인트부터 이어서)
+
+    Returns:
+        이번 실행에서 쓴 행 수
+    """
+    spec = EXPORT_TABLES[name]
+    entry = dict(manifest.table(name))
+    if entry["complete"]:
+        return 0
+
+    fmt = manifest.data["format"]
+    path = manifest.path.parent / entry["file"]
+    last_key = entry["last_key"] if entry["last_key"] is not None else entry["after_key"]
+    columns = entry["columns"]
+    written = 0
+
+    with open(path, "ab") as raw:
+        # 마지막 체크포인트 이후 잘린 gzip 멤버 제거
+        raw.truncate(entry["offset"])
+        raw.seek(entry["offset"])
+
+        while True:
+            query = client.table(name).select("*")
+            if entry["since"]:
+                query = query.gte(spec.changed, entry["since"])
+            if last_key is not None:
+                query = query.gt(spec.key, last_key)
+            page = query.order(spec.key).limit(page_size).execute().data or []
+
+            if page:
+                if columns is None:
+                    columns = list(page[0])
+                # 페이지 1개 = gzip 멤버 1개 (이어 붙여도 하나의 gzip 스트림으로 읽힘)
+                with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as gz:
+                    text = io.TextIOWrapper(gz, encoding="utf-8", newline="")
+                    if fmt == "csv":
+                        writer = csv.writer(text)
+                        if entry["offset"] == 0 and written == 0:
+                            writer.writerow(columns)
+                        writer.writerows([_csv_value(row.get(col)) for col in columns] for row in page)
+                    else:
+                        for row in page:
+                            text.write(json.dumps(row, ensure_ascii=False, default=str))
+                            text.write("\n")
+                    text.flush()
+                    text.detach()
+                raw.flush()
+                os.fsync(raw.fileno())
+
+                last_key = page[-1][spec.key]
+                written += len(page)
+
+            done = len(page) < page_size
+            manifest.update_table(
+                name,
+                rows=entry["rows"] + written,
+                offset=raw.tell(),
+                last_key=last_key,
+                columns=columns,
+                complete=done,
+            )
+            if done:
+                return written
+
+
+def run_export(client: "Client", manifest: Manifest, workers: int = EXPORT_CONCURRENCY) -> dict:
+    """
+    테이블 동시 내보내기
+
+    Returns:
+        {"rows": {테이블: 이번에 쓴 행 수}, "errors": {테이블: 오류}}
+    """
+    result = {"rows": {}, "errors": {}}
+    names = [name for name in manifest.data["tables"] if not manifest.table(name)["complete"]]
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="export") as pool:
+        futures = {pool.submit(export_table, client, manifest, name): name for name in names}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                result["rows"][name] = future.result()
+                print(f"[EXPORT] {name}: {manifest.table(name)['rows']} rows")
+            except Exception as e:
+                # 다른 테이블은 계속 진행, 실패한 테이블은 다음 실행에서 체크포인트부터
+                result["errors"][name] = str(e)
+                print(f"[EXPORT] {name} failed: {e}")
+
+    if not result["errors"]:
+        manifest.finish()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export Supabase tables to compressed NDJSON/CSV snapshots")
+    parser.add_argument("--format", choices=FORMATS, default="csv", help="csv (readable by analytics.py) or ndjson")
+    parser.add_argument("--tables", help=f"Comma-separated tables (default: all {len(EXPORT_TABLES)})")
+    parser.add_argument("--incremental", action="store_true", help="Only rows changed since the last snapshot")
+    parser.add_argument("--out", type=Path, help="Snapshot directory (resumes if it has a manifest)")
+    parser.add_argument("--root", type=Path, default=EXPORT_ROOT, help="Directory holding snapshots")
+    parser.add_argument("--workers", type=int, default=EXPORT_CONCURRENCY, help="Tables exported concurrently")
+    args = parser.parse_args()
+
+    tables = [t.strip() for t in args.tables.split(",")] if args.tables else list(EXPORT_TABLES)
+    unknown = [t for t in tables if t not in EXPORT_TABLES]
+    if unknown:
+        raise SystemExit(f"[EXPORT] Unknown table(s): {', '.join(unknown)}")
+
+    from db import get_supabase_client
+
+    started = time.perf_counter()
+    manifest = plan_export(tables, args.format, args.incremental, args.root, args.out)
+    result = run_export(get_supabase_client(), manifest, args.workers)
+    elapsed = time.perf_counter() - started
+
+    total = sum(result["rows"].values())
+    print(f"[EXPORT] {total} row(s) from {len(result['rows'])} table(s) in {elapsed:.1f}s -> {manifest.path.parent}")
+    if result["errors"]:
+        print(f"[EXPORT] {len(result['errors'])} table(s) failed - run the same command again to resume")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
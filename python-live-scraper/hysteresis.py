@@ -0,0 +1,233 @@
+"""
+Live State Hysteresis
+
+짧은 네트워크 오류나 페이지 경계 이동으로 멤버가 한 틱 동안 목록에서 빠지면
+organization.is_live가 깜빡이고 사이트에 실시간 이벤트가 연달아 발생합니다.
+
+batch_update_live_status 앞단에서 상태 전이를 걸러냅니다.
+
+- 오프라인 -> 라이브: 즉시 반영 (방송 시작 감지 지연 없음)
+- 라이브 -> 오프라인: OFFLINE_CONFIRMATIONS회 연속 오프라인이고
+  첫 오프라인 관측 후 OFFLINE_GRACE_SECONDS가 지나야 반영
+- 값이 그대로인 멤버는 쓰지 않음 (UNCHANGED_HEARTBEAT_SECONDS마다 한 번은 씀)
+
+멤버의 플랫폼 중 하나라도 쓰면 나머지 플랫폼도 함께 씁니다 (보류 중인 플랫폼은 마지막 라이브 값).
+organization.is_live 자체는 쓰기 후 live_status 전체로 다시 계산됩니다 (db.write_live_status_rows).
+"""
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Optional
+
+from config import OFFLINE_CONFIRMATIONS, OFFLINE_GRACE_SECONDS, UNCHANGED_HEARTBEAT_SECONDS
+from scraper import LiveStatus, HELD_ERROR, UNCHANGED_ERROR
+
+StateKey = tuple[str, str]
+
+
+@dataclass
+class MemberState:
+    is_live: bool
+    offline_streak: int = 0
+    offline_since: Optional[float] = None
+    written: Optional[tuple] = None  # 마지막으로 쓴 값
+    written_at: float = 0.0
+    last_live: Optional[LiveStatus] = None  # 마지막으로 쓴 라이브 상태
+
+
+def status_fingerprint(status: LiveStatus) -> tuple:
+    """쓰기가 필요한 변화인지 판단하는 값"""
+    if not status.is_live:
+        return (False,)
+    return (True, status.viewer_count, status.thumbnail_url, status.title, status.stream_url)
+
+
+class LiveStateMachine:
+    """
+    (platform, user_id)별 확정 상태를 유지하는 상태 머신
+
+    장기 실행 모드에서 틱 사이에 재사용합니다.
+    """
+
+    def __init__(
+        self,
+        offline_confirmations: int = OFFLINE_CONFIRMATIONS,
+        offline_grace_seconds: float = OFFLINE_GRACE_SECONDS,
+        heartbeat_seconds: float = UNCHANGED_HEARTBEAT_SECONDS,
+    ):
+        self.offline_confirmations = max(1, offline_confirmations)
+        self.offline_grace_seconds = offline_grace_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.states: dict[StateKey, MemberState] = {}
+        self._lock = threading.Lock()
+
+    def unseen(self, members: list[dict]) -> list[dict]:
+        """아직 상태가 없는 계정 (seed 대상)"""
+        with self._lock:
+            return [m for m in members if (m.get("platform", "pandatv"), m["user_id"]) not in self.states]
+
+    def seed(self, members: list[dict], platform_live: dict[tuple[int, str], bool]) -> None:
+        """
+        처음 보는 계정의 확정 상태를 DB의 플랫폼별 마지막 상태로 초기화
+
+        Args:
+            platform_live: get_live_status_map() 결과 ((member_id, platform) -> is_live).
+                organization.is_live는 멤버 단위라 다른 플랫폼만 라이브여도 true이므로 쓰지 않음.
+                live_status 행이 없는 계정은 오프라인으로 시작
+        """
+        with self._lock:
+            for member in members:
+                platform = member.get("platform", "pandatv")
+                key = (platform, member["user_id"])
+                if key not in self.states:
+                    self.states[key] = MemberState(is_live=platform_live.get((member["id"], platform), False))
+
+    def retain(self, members: list[dict]) -> int:
+        """
+        전체 멤버 목록에 없는 계정(비활성화/계정 변경) 제거
+
+        Returns:
+            제거한 계정 수
+        """
+        keys = {(m.get("platform", "pandatv"), m["user_id"]) for m in members}
+        with self._lock:
+            gone = set(self.states) - keys
+        if gone:
+            self.forget(gone)
+        return len(gone)
+
+    def apply(
+        self,
+        statuses: list[LiveStatus],
+        members: Optional[list[dict]] = None,
+        now: Optional[float] = None,
+    ) -> list[LiveStatus]:
+        """
+        관측 결과를 확정 상태로 변환
+
+        Args:
+            members: 주어지면 같은 멤버(id)의 플랫폼을 묶어서 함께 쓰기
+
+        Returns:
+            같은 길이의 LiveStatus 목록. 보류된 전이는 HELD_ERROR,
+            변화 없는 멤버는 UNCHANGED_ERROR가 붙어 쓰기에서 제외됩니다.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            results = [self._apply_one(status, now) for status in statuses]
+            if members:
+                results = self._group_by_member(statuses, results, members, now)
+            return results
+
+    def _group_by_member(
+        self,
+        observed: list[LiveStatus],
+        results: list[LiveStatus],
+        members: list[dict],
+        now: float,
+    ) -> list[LiveStatus]:
+        """쓰는 플랫폼이 있는 멤버는 나머지 플랫폼도 쓰도록 되돌림"""
+        member_of = {(m.get("platform", "pandatv"), m["user_id"]): m["id"] for m in members}
+        writing = {
+            member_of.get((s.platform, s.user_id)) for s in results if not s.error
+        }
+        writing.discard(None)
+
+        grouped = []
+        for original, status in zip(observed, results):
+            key = (status.platform, status.user_id)
+            if member_of.get(key) not in writing:
+                grouped.append(status)
+                continue
+
+            state = self.states.get(key)
+            if status.error == UNCHANGED_ERROR:
+                status = original
+            elif status.error == HELD_ERROR and state and state.last_live:
+                status = state.last_live
+            else:
+                grouped.append(status)
+                continue
+
+            state.written = status_fingerprint(status)
+            state.written_at = now
+            grouped.append(status)
+        return grouped
+
+    def record(self, statuses: list[LiveStatus], now: Optional[float] = None) -> None:
+        """
+        확정된 이벤트(푸시 웹훅 등)를 보류 없이 상태에 반영
+
+        명시적인 방송 종료 이벤트는 깜빡임이 아니므로 바로 오프라인으로 확정합니다.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            for status in statuses:
+                if status.error:
+                    continue
+                self.states[(status.platform, status.user_id)] = MemberState(
+                    is_live=status.is_live,
+                    written=status_fingerprint(status),
+                    written_at=now,
+                    last_live=status if status.is_live else None,
+                )
+
+    def _apply_one(self, status: LiveStatus, now: float) -> LiveStatus:
+        if status.error:
+            # 확인되지 않은 관측은 상태 머신에 반영하지 않음
+            return status
+
+        key = (status.platform, status.user_id)
+        state = self.states.get(key)
+        if state is None:
+            state = self.states[key] = MemberState(is_live=status.is_live)
+
+        if status.is_live:
+            state.is_live = True
+            state.offline_streak = 0
+            state.offline_since = None
+        elif state.is_live:
+            state.offline_streak += 1
+            if state.offline_since is None:
+                state.offline_since = now
+
+            confirmed = (
+                state.offline_streak >= self.offline_confirmations
+                and now - state.offline_since >= self.offline_grace_seconds
+            )
+            if not confirmed:
+                return replace(status, error=HELD_ERROR)
+
+            state.is_live = False
+            state.offline_streak = 0
+            state.offline_since = None
+
+        fingerprint = status_fingerprint(status)
+        if state.written == fingerprint and now - state.written_at < self.heartbeat_seconds:
+            return replace(status, error=UNCHANGED_ERROR)
+
+        state.written = fingerprint
+        state.written_at = now
+        if status.is_live:
+            state.last_live = status
+        return status
+
+    def invalidate(self, keys: list[StateKey]) -> None:
+        """
+        쓰기에 실패한 계정의 마지막 쓴 값 지우기
+
+        apply()/record()는 내보낸 시점에 쓴 값으로 기록하므로,
+        지우지 않으면 같은 상태가 하트비트까지 UNCHANGED로 걸러져 DB가 틀린 채로 남습니다.
+        """
+        with self._lock:
+            for key in keys:
+                state = self.states.get(key)
+                if state is not None:
+                    state.written = None
+                    state.written_at = 0.0
+
+    def forget(self, keys: set[StateKey]) -> None:
+        """더 이상 추적하지 않는 멤버 제거"""
+        with self._lock:
+            for key in keys:
+                self.states.pop(key, None)
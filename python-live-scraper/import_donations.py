@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Bulk donation importer (CSV / XLSX -> donations)
+
+PandaTV 후원 내역 내보내기 파일을 한 줄씩 읽어 donations에 넣습니다.
+
+    후원시간,후원 아이디(닉네임),후원하트,참여BJ,하트점수,기여도,기타
+
+- 후원자 이름: "아이디(닉네임)"에서 닉네임만 추출 + NFC 정규화
+- 하트 0 이하(벌금 등), 대표BJ(RG_family) 후원은 제외
+  (scripts/update-donation-rankings.ts와 같은 규칙)
+- 중복 방지: (시즌, 시각, 후원자, 하트, 같은 내용의 n번째) 해시를 DB에 이미 있는
+  시즌 후원과 비교 → 같은 파일을 다시 넣어도 새 행만 들어감
+- IMPORT_BATCH_SIZE 단위로 insert하고, 배치마다 .state/imports/에 체크포인트 저장
+  → 중간에 실패하면 같은 명령으로 이어서 실행
+
+Usage:
+    # 미리보기 (DB에 쓰지 않음)
+    python import_donations.py ../data/season2.csv --season 2 --dry-run
+
+    # 가져오기 (XLSX는 openpyxl 필요)
+    python import_donations.py ep1.csv ep2.xlsx --season 2 --unit excel --episode 14
+"""
+import argparse
+import csv
+import hashlib
+import json
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional, TYPE_CHECKING
+from zoneinfo import ZoneInfo
+
+from config import STATE_DIR, IMPORT_BATCH_SIZE, IMPORT_TIMEZONE
+from db import get_supabase_client
+from profile_data import normalize_name
+
+try:
+    import openpyxl
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+CHECKPOINT_DIR = STATE_DIR / "imports"
+
+# 헤더 이름 -> 필드 (PandaTV 내보내기 + 영문 컬럼)
+HEADER_ALIASES = {
+    "후원시간": "created_at",
+    "후원 아이디(닉네임)": "donor",
+    "후원아이디(닉네임)": "donor",
+    "후원하트": "amount",
+    "기타": "message",
+    "created_at": "created_at",
+    "donor_name": "donor",
+    "amount": "amount",
+    "message": "message",
+    "unit": "unit",
+}
+REQUIRED_FIELDS = ("created_at", "donor", "amount")
+EXCLUDED_DONORS = ("RG_family", "대표BJ")
+UNITS = ("excel", "crew")
+
+# "아이디(닉네임)" - 닉네임 안의 괄호는 그대로 유지
+_NICKNAME_RE = re.compile(r"^[^()]*\((.+)\)$")
+
+
+class ImportFormatError(ValueError):
+    """가져올 파일 형식 오류"""
+
+
+@dataclass
+class DonationRow:
+    """정규화된 후원 1건"""
+    line: int
+    donor_name: str
+    amount: int
+    created_at: datetime
+    message: Optional[str] = None
+    unit: Optional[str] = None
+
+
+def extract_nickname(raw: str) -> str:
+    """"아이디(닉네임)" -> 닉네임 (형식이 아니면 전체)"""
+    value = normalize_name(raw)
+    match = _NICKNAME_RE.match(value)
+    return normalize_name(match.group(1)) if match else value
+
+
+def parse_amount(raw) -> int:
+    if isinstance(raw, (int, float)):
+        return int(raw)
+    return int(str(raw).replace(",", "").strip() or 0)
+
+
+def parse_timestamp(raw, tz: ZoneInfo) -> datetime:
+    """후원 시각 -> UTC (시간대가 없으면 tz 기준)"""
+    if isinstance(raw, datetime):
+        value = raw
+    else:
+        text = str(raw).strip().replace("/", "-").replace("Z", "+00:00")
+        value = datetime.fromisoformat(text)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=tz)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def _iter_csv(path: Path) -> Iterator[list]:
+    # 내보내기 파일은 UTF-8(BOM) 또는 CP949
+    for encoding in ("utf-8-sig", "cp949"):
+        try:
+            with open(path, newline="", encoding=encoding) as f:
+                f.read(64 * 1024)
+        except UnicodeDecodeError:
+            continue
+        with open(path, newline="", encoding=encoding) as f:
+            yield from csv.reader(f)
+        return
+    raise ImportFormatError(f"{path}: unsupported encoding (expected UTF-8 or CP949)")
+
+
+def _iter_xlsx(path: Path) -> Iterator[list]:
+    if not OPENPYXL_AVAILABLE:
+        raise ImportFormatError(f"{path}: XLSX requires openpyxl (pip install openpyxl)")
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for values in workbook.active.iter_rows(values_only=True):
+            yield ["" if value is None else value for value in values]
+    finally:
+        workbook.close()
+
+
+def read_donations(path: Path, tz: ZoneInfo) -> Iterator[DonationRow]:
+    """
+    파일을 한 줄씩 읽어 정규화된 후원 행 생성 (제외 규칙 적용)
+
+    Raises:
+        ImportFormatError: 필수 컬럼 누락, 값 형식 오류
+    """
+    raw_rows = _iter_xlsx(path) if path.suffix.lower() == ".xlsx" else _iter_csv(path)
+    header = next(raw_rows, None)
+    if header is None:
+        return
+    columns = {}
+    for index, name in enumerate(header):
+        field = HEADER_ALIASES.get(str(name).strip())
+        if field and field not in columns:
+            columns[field] = index
+    missing = [field for field in REQUIRED_FIELDS if field not in columns]
+    if missing:
+        raise ImportFormatError(f"{path}: missing column(s) {missing} in header {header}")
+
+    for line, values in enumerate(raw_rows, start=2):
+        if not any(str(value).strip() for value in values):
+            continue
+
+        def get(field):
+            index = columns.get(field)
+            return values[index] if index is not None and index < len(values) else ""
+
+        try:
+            amount = parse_amount(get("amount"))
+            created_at = parse_timestamp(get("created_at"), tz)
+        except ValueError as e:
+            raise ImportFormatError(f"{path}:{line}: {e}") from e
+
+        donor = extract_nickname(str(get("donor")))
+        if amount <= 0 or not donor or any(name in donor for name in EXCLUDED_DONORS):
+            continue
+        unit = str(get("unit")).strip().lower() or None
+        message = str(get("message")).strip() or None
+        yield DonationRow(line, donor, amount, created_at, message, unit if unit in UNITS else None)
+
+
+def content_key(season_id: int, donor_name: str, amount: int, created_at: datetime) -> str:
+    """중복 판별용 내용 키 (같은 키의 n번째 여부는 호출자가 붙임)"""
+    stamp = int(created_at.timestamp())
+    return f"{season_id}|{stamp}|{normalize_name(donor_name)}|{amount}"
+
+
+def content_hash(key: str, occurrence: int) -> str:
+    return hashlib.sha256(f"{key}|{occurrence}".encode("utf-8")).hexdigest()
+
+
+def fetch_existing_hashes(client: "Client", season_id: int, page_size: int = 1000) -> set[str]:
+    """
+    시즌에 이미 있는 후원의 내용 해시
+
+    같은 시각/후원자/하트의 연속 후원도 구분하도록 id 순서대로 n번째를 붙입니다.
+    """
+    hashes = set()
+    seen: Counter = Counter()
+    last_id = 0
+    while True:
+        rows = client.table("donations").select(
+            "id, donor_name, amount, created_at"
+        ).eq("season_id", season_id).gt("id", last_id).order("id").limit(page_size).execute().data or []
+        for row in rows:
+            created_at = datetime.fromisoformat(row["created_at"].replace("Z", "+00:00"))
+            key = content_key(season_id, row["donor_name"], row["amount"], created_at)
+            hashes.add(content_hash(key, seen[key]))
+            seen[key] += 1
+        if len(rows) < page_size:
+            return hashes
+        last_id = rows[-1]["id"]
+
+
+def file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def load_checkpoint(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_checkpoint(path: Path, checkpoint: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(checkpoint, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp_path.replace(path)
+
+
+def import_file(
+    client: Optional["Client"],
+    path: Path,
+    season_id: int,
+    existing: set[str],
+    seen: Counter,
+    unit: Optional[str] = None,
+    episode_id: Optional[int] = None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    tz: ZoneInfo = ZoneInfo(IMPORT_TIMEZONE),
+    dry_run: bool = False,
+) -> dict:
+    """
+    파일 1개 가져오기
+
+    Args:
+        existing: DB에 이미 있는 내용 해시 (넣은 행도 추가됨)
+        seen: 내용 키별 등장 횟수 (여러 파일에 걸쳐 공유)
+        client: dry_run이면 None 가능
+
+    Returns:
+        {"read": n, "inserted": n, "duplicates": n, "resumed": n, "batches": n}
+    """
+    checkpoint_path = CHECKPOINT_DIR / f"{path.stem}.{season_id}.{file_digest(path)}.json"
+    checkpoint = load_checkpoint(checkpoint_path)
+    committed = checkpoint.get("rows_committed", 0)
+    stats = {"read": 0, "inserted": 0, "duplicates": 0, "resumed": 0, "batches": 0}
+    batch: list[dict] = []
+
+    def flush(rows_done: int):
+        if batch and not dry_run:
+            client.table("donations").insert(batch).execute()
+            stats["batches"] += 1
+        stats["inserted"] += len(batch)
+        batch.clear()
+        if not dry_run:
+            save_checkpoint(checkpoint_path, {
+                "source": str(path),
+                "season_id": season_id,
+                "rows_committed": rows_done,
+                "inserted": checkpoint.get("inserted", 0) + stats["inserted"],
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            })
+
+    for row in read_donations(path, tz):
+        stats["read"] += 1
+        key = content_key(season_id, row.donor_name, row.amount, row.created_at)
+        digest = content_hash(key, seen[key])
+        seen[key] += 1
+
+        # 체크포인트 이전 행은 이미 반영됨 (해시 비교만으로도 걸러지지만 조회 생략)
+        if stats["read"] <= committed:
+            stats["resumed"] += 1
+            continue
+        if digest in existing:
+            stats["duplicates"] += 1
+            continue
+
+        existing.add(digest)
+        batch.append({
+            "donor_name": row.donor_name,
+            "amount": row.amount,
+            "season_id": season_id,
+            "episode_id": episode_id,
+            "unit": row.unit or unit,
+            "message": row.message,
+            "created_at": row.created_at.isoformat(),
+        })
+        if len(batch) >= batch_size:
+            flush(stats["read"])
+
+    flush(stats["read"])
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import donation exports (CSV/XLSX) into donations")
+    parser.add_argument("files", nargs="+", type=Path, help="CSV or XLSX export files")
+    parser.add_argument("--season", type=int, required=True, help="donations.season_id")
+    parser.add_argument("--unit", choices=UNITS, help="Default unit when the file has no unit column")
+    parser.add_argument("--episode", type=int, help="donations.episode_id")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="Rows per insert")
+    parser.add_argument("--timezone", default=IMPORT_TIMEZONE, help="Time zone of naive timestamps")
+    parser.add_argument("--dry-run", action="store_true", help="Parse and dedupe without writing")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    client = None
+    existing: set[str] = set()
+    try:
+        client = get_supabase_client()
+        existing = fetch_existing_hashes(client, args.season)
+        print(f"[IMPORT] Season {args.season}: {len(existing)} existing donation(s)")
+    except Exception as e:
+        if not args.dry_run:
+            raise
+        print(f"[IMPORT] Database unavailable ({e}) - dry run without dedupe against donations")
+
+    seen: Counter = Counter()
+    totals = Counter()
+    for path in args.files:
+        try:
+            stats = import_file(
+                client, path, args.season, existing, seen,
+                unit=args.unit,
+                episode_id=args.episode,
+                batch_size=max(1, args.batch_size),
+                tz=ZoneInfo(args.timezone),
+                dry_run=args.dry_run,
+            )
+        except ImportFormatError as e:
+            print(f"[IMPORT] {e}")
+            raise SystemExit(1)
+        totals.update(stats)
+        label = "would insert" if args.dry_run else "inserted"
+        resumed = f", {stats['resumed']} resumed" if stats["resumed"] else ""
+        print(
+            f"[IMPORT] {path.name}: {stats['read']} read, {stats['inserted']} {label}, "
+            f"{stats['duplicates']} duplicate(s){resumed}"
+        )
+
+    elapsed = time.perf_counter() - started
+    print(f"[IMPORT] Done: {totals['inserted']} row(s) in {totals['batches']} batch(es), {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Push Event Ingestion
+
+웹훅/실시간 피드로 들어온 방송 시작/종료 이벤트를 LiveStatus로 정규화하여
+폴링과 같은 쓰기 경로(batch_update_live_status)로 반영합니다.
+
+폴링은 느린 주기의 정합성 검사(reconciliation)로만 동작하고,
+라이브 감지 지연은 이벤트 도착 시간으로 줄어듭니다.
+
+웹훅 이벤트 형식 (단건 또는 {"events": [...]}):
+    {"user_id": "hj042300", "event": "live_start", "viewer_count": 120,
+     "title": "...", "thumbnail_url": "...", "platform": "pandatv"}
+
+PandaTV /v1/live 목록 항목 형식({"userId", "userNick", "user", "thumbUrl", ...})도
+그대로 받을 수 있으며, 이 경우 라이브 중인 것으로 간주합니다.
+"""
+import hmac
+import queue
+import threading
+from typing import Optional
+
+from config import PUSH_WEBHOOK_SECRET, DEBUG
+from db import batch_update_live_status
+from scraper import LiveStatus
+from server import Request, Response, WorkerHTTPServer
+
+LIVE_EVENTS = {"live_start", "live", "online", "update"}
+OFFLINE_EVENTS = {"live_end", "offline", "end"}
+
+
+def normalize_event(event: dict) -> Optional[LiveStatus]:
+    """
+    푸시 이벤트 -> LiveStatus 변환
+
+    Returns:
+        LiveStatus / 알 수 없는 형식이면 None
+    """
+    user_id = event.get("user_id") or event.get("userId")
+    if not user_id:
+        return None
+
+    platform = event.get("platform") or "pandatv"
+    event_type = (event.get("event") or event.get("type") or "live_start").lower()
+    if event_type in OFFLINE_EVENTS:
+        return LiveStatus(user_id=user_id, is_live=False, platform=platform)
+    if event_type not in LIVE_EVENTS:
+        return None
+
+    return LiveStatus(
+        user_id=user_id,
+        is_live=True,
+        platform=platform,
+        user_nick=event.get("user_nick") or event.get("userNick"),
+        viewer_count=event.get("viewer_count", event.get("user")),
+        thumbnail_url=event.get("thumbnail_url") or event.get("thumbUrl"),
+        title=event.get("title"),
+    )
+
+
+class PushIngestor:
+    """
+    푸시 이벤트 수신 큐 + 단일 쓰기 스레드
+
+    HTTP 핸들러는 이벤트를 큐에 넣고 바로 응답하며,
+    쓰기 스레드가 큐를 비우면서 같은 유저의 이벤트는 마지막 것만 반영합니다.
+    """
+
+    def __init__(self, client, members: Optional[list[dict]] = None, writer=None, state_machine=None, snapshot=None,
+                 notifier=None, rollup=None, thumbnails=None):
+        self.client = client
+        self.writer = writer
+        # 읽기 API 스냅샷 - 이벤트를 받은 멤버만 바로 갱신
+        self.snapshot = snapshot
+        # 방송 시작 알림 - 웹훅 live_start는 폴링보다 먼저 전이를 알려줌
+        self.notifier = notifier
+        # 조직 전체 집계 - 이벤트로 바뀐 멤버만 반영
+        self.rollup = rollup
+        # 썸네일 프록시 - 정합성 검사와 같은 URL을 써야 thumbnail_url이 원본/프록시로 번갈아 바뀌지 않음
+        self.thumbnails = thumbnails
+        # 폴링 히스테리시스와 상태 공유 - 명시적 이벤트는 보류 없이 확정
+        self.state_machine = state_machine
+        self.members_by_user: dict[tuple[str, str], dict] = {}
+        # None은 종료 신호 (stop())
+        self.events: "queue.Queue[Optional[LiveStatus]]" = queue.Queue()
+        self._members_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        if members is not None:
+            self.set_members(members)
+
+    def set_members(self, members: list[dict]) -> None:
+        """수신 대상 멤버 갱신 (정합성 검사 때마다 호출)"""
+        with self._members_lock:
+            self.members_by_user = {
+                (m.get("platform", "pandatv"), m["user_id"]): m for m in members
+            }
+
+    def submit(self, status: LiveStatus) -> bool:
+        """
+        정규화된 상태를 큐에 추가
+
+        웹훅 외의 어댑터(채팅/웹소켓 피드 등)도 이 메서드로 이벤트를 전달합니다.
+
+        Returns:
+            관리 대상 멤버이면 True
+        """
+        with self._members_lock:
+            known = (status.platform, status.user_id) in self.members_by_user
+        if known:
+            self.events.put(status)
+        return known
+
+    def _drain(self) -> list[LiveStatus]:
+        """큐에 쌓인 이벤트를 유저별 최신 상태로 병합 (종료 신호까지)"""
+        latest: dict[tuple[str, str], LiveStatus] = {}
+        status = self.events.get()
+        while status is not None:
+            latest[(status.platform, status.user_id)] = status
+            try:
+                status = self.events.get_nowait()
+            except queue.Empty:
+                break
+        return list(latest.values())
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            statuses = self._drain()
+            if not statuses:
+                continue
+            with self._members_lock:
+                members = [
+                    self.members_by_user[(s.platform, s.user_id)]
+                    for s in statuses
+                    if (s.platform, s.user_id) in self.members_by_user
+                ]
+
+            # 한 배치의 예외가 유일한 반영 스레드를 끝내지 않도록 전체를 감쌈
+            try:
+                if self.thumbnails is not None:
+                    statuses = self.thumbnails.process(statuses)
+                if self.state_machine is not None:
+                    self.state_machine.record(statuses)
+                if self.snapshot is not None:
+                    self.snapshot.update(members, statuses, complete=False)
+                if self.notifier is not None:
+                    self.notifier.observe(members, statuses)
+                if self.rollup is not None:
+                    self.rollup.update(self.client, members, statuses, complete=False)
+
+                result = batch_update_live_status(self.client, members, statuses, writer=self.writer)
+                if self.state_machine is not None and result["failed"]:
+                    self.state_machine.invalidate(result["failed"])
+                print(f"[PUSH] Applied {result['updated']} event(s), live: {result['live']}")
+                for err in result["errors"][:5]:
+                    print(f"[PUSH]   - {err}")
+            except Exception as e:
+                print(f"[PUSH] Error applying events: {e}")
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="push-ingest", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        쓰기 스레드 종료 (진행 중인 반영이 끝날 때까지 대기)
+
+        종료 신호 전에 들어온 이벤트는 반영하고, 이후 이벤트는 다음 정합성 검사가 맞춥니다.
+        writer.stop()보다 먼저 호출해야 마지막 반영이 write-behind 큐에 남지 않습니다.
+        """
+        self._stop.set()
+        self.events.put(None)
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def handle_webhook(self, request: Request) -> Response:
+        """POST /webhook/live 핸들러"""
+        # 비밀값이 없으면 모든 요청 거부 (run_push_mode도 시작하지 않음)
+        provided = request.header("x-webhook-secret") or ""
+        if not PUSH_WEBHOOK_SECRET or not hmac.compare_digest(provided, PUSH_WEBHOOK_SECRET):
+            return Response.json({"error": "Unauthorized"}, status=401)
+
+        try:
+            payload = request.json()
+        except ValueError:
+            return Response.json({"error": "Invalid JSON body"}, status=400)
+
+        if isinstance(payload, dict) and "events" in payload:
+            raw_events = payload["events"]
+        else:
+            raw_events = payload if isinstance(payload, list) else [payload]
+
+        accepted = 0
+        ignored = 0
+        for raw in raw_events:
+            status = normalize_event(raw) if isinstance(raw, dict) else None
+            if status and self.submit(status):
+                accepted += 1
+            else:
+                ignored += 1
+
+        if DEBUG:
+            print(f"[PUSH] Webhook accepted={accepted} ignored={ignored}")
+
+        return Response.json({"accepted": accepted, "ignored": ignored}, status=202)
+
+
+def register_push_routes(server: WorkerHTTPServer, ingestor: PushIngestor) -> None:
+    server.route("POST", r"/webhook/live", ingestor.handle_webhook)
@@ -16,22 +16,152 @@ Usage:
 
     # 현재 라이브 목록 보기
     python main.py --list
+
+    # 푸시(웹훅) 수신 + 느린 정합성 폴링
+    python main.py --push
+
+    # 후원 랭킹 증분 갱신 (새 후원만 반영, 바뀐 순위만 쓰기)
+    python main.py --rankings [--dry-run]
 """
 import argparse
-from datetime import datetime
-
-import schedule
 import time
-
-from config import SCRAPE_INTERVAL_SECONDS, DEBUG
-from scraper import get_all_live_streams, check_multiple_users, check_user_live_status
-from db import get_supabase_client, get_pandatv_members, batch_update_live_status
-
-
-def sync_live_status():
+from datetime import datetime
+from typing import Optional, TYPE_CHECKING
+
+from config import (
+    SCRAPE_INTERVAL_SECONDS,
+    RECONCILE_INTERVAL_SECONDS,
+    PUSH_WEBHOOK_SECRET,
+    SERVER_HOST,
+    SERVER_PORT,
+    LIVE_API_ENABLED,
+    BROADCAST_SSE_ENABLED,
+    BROADCAST_REALTIME_TOPIC,
+    NOTIFY_WEBHOOK_URLS,
+    ROLLUP_ENABLED,
+    WRITE_BEHIND_ENABLED,
+    THUMBNAIL_PROXY_ENABLED,
+    THUMBNAIL_BUCKET,
+    THUMBNAIL_PUBLIC_BASE_URL,
+    RANKINGS_INTERVAL_SECONDS,
+    MEMORY_WATCH_ENABLED,
+    DEBUG,
+)
+
+# supabase / schedule / httpx 등 무거운 모듈은 명령별로 필요한 시점에 import
+# (--list, --test는 DB에 접근하지 않으므로 supabase를 로드하지 않음)
+# 시작 시간 회귀는 bench_startup.py로 확인
+if TYPE_CHECKING:
+    from broadcast import DiffBroadcaster
+    from hysteresis import LiveStateMachine
+    from memwatch import MemoryWatch
+    from notify import GoLiveNotifier
+    from platforms import PlatformEngine
+    from rankings import RankingState
+    from rollups import LiveRollup
+    from server import WorkerHTTPServer
+    from snapshot import LiveSnapshot
+    from thumbnails import ThumbnailStage
+    from writer import WriteBehindQueue
+
+
+def start_writer() -> Optional["WriteBehindQueue"]:
+    """장기 실행 모드용 write-behind 쓰기 큐 시작 (비활성화 시 None)"""
+    if not WRITE_BEHIND_ENABLED:
+        return None
+
+    from db import get_supabase_client, write_live_status_rows
+    from writer import WriteBehindQueue
+
+    client = get_supabase_client()
+    writer = WriteBehindQueue(lambda rows: write_live_status_rows(client, rows))
+    writer.start()
+    return writer
+
+
+def start_thumbnails() -> Optional["ThumbnailStage"]:
+    """장기 실행 모드용 썸네일 프록시 단계 (비활성화 시 None)"""
+    if not THUMBNAIL_PROXY_ENABLED:
+        return None
+
+    from db import get_supabase_client
+    from thumbnails import ThumbnailStage, ThumbnailStore, PIL_AVAILABLE, is_public_base_url
+
+    # 버킷 없이 로컬 캐시만 쓰면 방문자가 닿을 수 있는 워커 주소가 있어야 함
+    # (localhost URL을 thumbnail_url에 쓰면 사이트에서 깨진 이미지가 됨)
+    if not THUMBNAIL_BUCKET and not is_public_base_url(THUMBNAIL_PUBLIC_BASE_URL):
+        print("[THUMB] THUMBNAIL_BUCKET or a public THUMBNAIL_PUBLIC_BASE_URL is required - "
+              "thumbnail proxy disabled, using platform thumbnail URLs")
+        return None
+    if not PIL_AVAILABLE:
+        print("[THUMB] Pillow not installed - storing original thumbnails without resizing")
+    storage = get_supabase_client().storage if THUMBNAIL_BUCKET else None
+    return ThumbnailStage(ThumbnailStore(storage=storage))
+
+
+def start_memwatch() -> Optional["MemoryWatch"]:
+    """장기 실행 모드용 틱 단위 메모리 관찰 (비활성화 시 None)"""
+    if not MEMORY_WATCH_ENABLED:
+        return None
+
+    from memwatch import MemoryWatch
+
+    return MemoryWatch()
+
+
+def start_broadcast(snapshot: "LiveSnapshot", server: "WorkerHTTPServer") -> Optional["DiffBroadcaster"]:
+    """스냅샷이 바뀔 때마다 diff 메시지 하나를 SSE / Supabase Realtime으로 전송 (둘 다 꺼져 있으면 None)"""
+    if not BROADCAST_SSE_ENABLED and not BROADCAST_REALTIME_TOPIC:
+        return None
+
+    from broadcast import DiffBroadcaster, RealtimePublisher, SSEHub, register_broadcast_routes
+
+    hub = SSEHub(snapshot.epoch) if BROADCAST_SSE_ENABLED else None
+    realtime = RealtimePublisher() if BROADCAST_REALTIME_TOPIC else None
+    broadcaster = DiffBroadcaster(snapshot, hub=hub, realtime=realtime)
+    if hub is not None:
+        register_broadcast_routes(server, snapshot, hub)
+    broadcaster.start()
+    return broadcaster
+
+
+def start_notifier() -> Optional["GoLiveNotifier"]:
+    """장기 실행 모드용 방송 시작 알림 (대상이 없으면 None)"""
+    if not NOTIFY_WEBHOOK_URLS:
+        return None
+
+    from notify import GoLiveNotifier
+
+    notifier = GoLiveNotifier()
+    notifier.start()
+    return notifier
+
+
+def sync_live_status(
+    writer: Optional["WriteBehindQueue"] = None,
+    engine: Optional["PlatformEngine"] = None,
+    state_machine: Optional["LiveStateMachine"] = None,
+    thumbnails: Optional["ThumbnailStage"] = None,
+    snapshot: Optional["LiveSnapshot"] = None,
+    notifier: Optional["GoLiveNotifier"] = None,
+    rollup: Optional["LiveRollup"] = None,
+):
     """
-    모든 PandaTV 멤버의 라이브 상태 동기화
+    모든 멤버의 라이브 상태 동기화 (PandaTV, 치지직, Twitch, YouTube)
+
+    Args:
+        writer: 주어지면 DB 쓰기를 큐에 넘기고 바로 반환 (write-behind)
+        engine: 장기 실행 모드에서 재사용하는 플랫폼 엔진 (없으면 이번 틱만 생성)
+        state_machine: 틱 사이 상태를 기억하는 히스테리시스 (없으면 관측값 그대로 반영)
+        thumbnails: 썸네일 프록시 단계 (없으면 플랫폼 썸네일 URL 그대로 반영)
+        snapshot: 읽기 API 스냅샷 (틱마다 한 번 다시 만듦)
+        notifier: 방송 시작 알림 (outbox에 넣기만 하고 전송을 기다리지 않음)
+        rollup: 조직 전체 라이브 집계 (바뀐 상태만 반영, 바뀐 틱에만 요약 한 행 쓰기)
     """
+    from db import get_supabase_client, get_platform_members, get_live_status_map, batch_update_live_status
+    from platforms import PlatformEngine
+    from scraper import UNCHANGED_ERROR
+
     print(f"\n{'='*50}")
     print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Starting live status sync...")
     print(f"{'='*50}")
@@ -40,38 +170,83 @@ def sync_live_status():
         # Supabase 연결
         client = get_supabase_client()
 
-        # PandaTV 멤버 조회
-        members = get_pandatv_members(client)
-        print(f"Found {len(members)} PandaTV members")
+        # 플랫폼 계정이 있는 멤버 조회
+        members = get_platform_members(client)
+        print(f"Found {len(members)} platform accounts")
 
         if not members:
-            print("No PandaTV members to check")
+            print("No platform members to check")
             return
 
         # 유저 ID 목록
-        user_ids = [m["user_id"] for m in members]
+        user_ids = [f"{m['platform']}:{m['user_id']}" for m in members]
         print(f"Users: {user_ids}")
 
-        # 라이브 상태 확인 (API 1회 호출로 전체 확인)
-        print("\nChecking live status via API...")
-        statuses = check_multiple_users(user_ids)
+        # 라이브 상태 확인 (플랫폼별 동시 조회)
+        print("\nChecking live status via platform APIs...")
+        owns_engine = engine is None
+        if owns_engine:
+            engine = PlatformEngine()
+        try:
+            statuses = engine.check_all(members)
+        finally:
+            if owns_engine:
+                engine.close()
+
+        # 썸네일 프록시: 내용이 바뀐 경우에만 새 URL
+        if thumbnails is not None:
+            statuses = thumbnails.process(statuses)
+
+        # 깜빡임 억제: 오프라인 전이 보류 + 변화 없는 멤버 쓰기 생략
+        if state_machine is not None:
+            state_machine.retain(members)
+            unseen = state_machine.unseen(members)
+            if unseen:
+                state_machine.seed(unseen, get_live_status_map(client, [m["id"] for m in unseen]))
+            statuses = state_machine.apply(statuses, members)
+
+        # 읽기 API 응답 갱신 (DB 쓰기와 무관하게 이번 틱의 확정 상태)
+        if snapshot is not None:
+            snapshot.update(members, statuses)
+
+        # 오프라인 -> 라이브 전이 알림
+        if notifier is not None:
+            notifier.observe(members, statuses)
 
         # 결과 출력
         for status in statuses:
-            emoji = "🔴" if status.is_live else "⚫"
-            print(f"  {emoji} {status.user_id}: {'LIVE' if status.is_live else 'offline'}")
+            if status.error == UNCHANGED_ERROR and not DEBUG:
+                continue
+            emoji = "🔴" if status.is_live else ("❔" if status.error else "⚫")
+            label = "LIVE" if status.is_live else (status.error or "offline")
+            print(f"  {emoji} [{status.platform}] {status.user_id}: {label}")
             if status.viewer_count:
                 print(f"      viewers: {status.viewer_count}")
 
         # DB 업데이트
         print("\nUpdating database...")
-        result = batch_update_live_status(client, members, statuses)
+        result = batch_update_live_status(client, members, statuses, writer=writer)
+        if state_machine is not None and result["failed"]:
+            # 다음 틱에 같은 상태를 다시 쓰도록
+            state_machine.invalidate(result["failed"])
+
+        if rollup is not None:
+            summary = rollup.update(client, members, statuses)
+            if summary:
+                print(f"[ROLLUP] live {summary['live_count']}, viewers {summary['total_viewers']}, "
+                      f"top {summary['top_member_name'] or summary['top_member_id']}")
 
         print(f"\n{'='*50}")
         print(f"Sync completed!")
         print(f"  Total: {result['total']}")
-        print(f"  Updated: {result['updated']}")
+        print(f"  {'Queued' if writer else 'Updated'}: {result['updated']}")
         print(f"  Live: {result['live']}")
+        if result["incomplete"]:
+            print(f"  Tick incomplete: {result['unconfirmed']} unconfirmed member(s) kept last known state")
+        if result["held"]:
+            print(f"  Held: {result['held']} offline transition(s) awaiting confirmation")
+        if result["unchanged"]:
+            print(f"  Unchanged (skipped): {result['unchanged']}")
         if result["errors"]:
             print(f"  Errors: {len(result['errors'])}")
             for err in result["errors"][:5]:
@@ -83,8 +258,42 @@ def sync_live_status():
         raise
 
 
+def sync_rankings(state: Optional["RankingState"] = None, dry_run: bool = False):
+    """
+    후원 랭킹 증분 갱신
+
+    Args:
+        state: 장기 실행 모드에서 메모리에 유지하는 랭킹 상태 (없으면 .state에서 로드)
+        dry_run: DB에 쓰지 않고 바뀔 순위 행 수만 출력
+    """
+    from db import get_supabase_client
+    from rankings import refresh_rankings, load_state, print_unit_leaders
+
+    if state is None:
+        state = load_state()
+
+    try:
+        result = refresh_rankings(get_supabase_client(), state, dry_run=dry_run)
+    except Exception as e:
+        # 스케줄 루프는 계속 돌고, 상태는 마지막 저장 시점부터 다시 처리
+        print(f"[RANK] Refresh failed: {e}")
+        return
+
+    label = "Would write" if dry_run else "Wrote"
+    print(
+        f"[RANK] {result['new_donations']} new donation(s) up to id {result['high_water_mark']}; "
+        f"{label} {result['upserted']} rank row(s), removed {result['deleted']}"
+    )
+    for err in result["errors"]:
+        print(f"[RANK]   - {err}")
+    if DEBUG:
+        print_unit_leaders(state)
+
+
 def test_user(user_id: str):
     """단일 유저 테스트"""
+    from scraper import check_user_live_status
+
     print(f"\nTesting user: {user_id}")
 
     status = check_user_live_status(user_id)
@@ -101,6 +310,8 @@ def test_user(user_id: str):
 
 def list_live_streams():
     """현재 라이브 중인 모든 BJ 목록"""
+    from scraper import get_all_live_streams
+
     print("\n=== PandaTV Live Streams ===\n")
 
     streams = get_all_live_streams()
@@ -115,8 +326,177 @@ def list_live_streams():
     print(f"\nTotal: {len(streams)} live streams")
 
 
+def run_push_mode():
+    """
+    푸시 수신 모드
+
+    웹훅으로 들어온 이벤트를 즉시 반영하고,
+    폴링은 RECONCILE_INTERVAL_SECONDS 주기의 정합성 검사로만 실행
+    """
+    import schedule
+
+    if not PUSH_WEBHOOK_SECRET:
+        # 0.0.0.0에 열리므로 비밀값 없이 띄우면 누구나 라이브 상태를 바꿀 수 있음
+        raise SystemExit("[PUSH] PUSH_WEBHOOK_SECRET is required for --push")
+
+    from db import get_supabase_client, get_platform_members
+    from hysteresis import LiveStateMachine
+    from ingest import PushIngestor, register_push_routes
+    from platforms import PlatformEngine
+    from rollups import LiveRollup
+    from server import WorkerHTTPServer
+    from snapshot import LiveSnapshot, register_live_routes
+
+    client = get_supabase_client()
+    writer = start_writer()
+    engine = PlatformEngine()
+    state_machine = LiveStateMachine()
+    thumbnails = start_thumbnails()
+    memwatch = start_memwatch()
+    snapshot = LiveSnapshot() if LIVE_API_ENABLED else None
+    notifier = start_notifier()
+    rollup = LiveRollup() if ROLLUP_ENABLED else None
+    ingestor = PushIngestor(
+        client, get_platform_members(client), writer=writer, state_machine=state_machine,
+        snapshot=snapshot, notifier=notifier, rollup=rollup, thumbnails=thumbnails,
+    )
+    ingestor.start()
+
+    server = WorkerHTTPServer(SERVER_HOST, SERVER_PORT)
+    register_push_routes(server, ingestor)
+    if thumbnails is not None:
+        from thumbnails import register_thumbnail_routes
+        register_thumbnail_routes(server, thumbnails.store)
+    if memwatch is not None:
+        from memwatch import register_memory_routes
+        register_memory_routes(server, memwatch)
+    broadcaster = None
+    if snapshot is not None:
+        register_live_routes(server, snapshot)
+        broadcaster = start_broadcast(snapshot, server)
+    server.start()
+
+    def reconcile():
+        sync_live_status(writer, engine, state_machine, thumbnails, snapshot, notifier, rollup)
+        ingestor.set_members(get_platform_members(client))
+        if memwatch:
+            memwatch.tick()  # 상한 초과 시 MemoryCeilingExceeded → finally에서 정리
+
+    print(f"Starting push mode (reconcile interval: {RECONCILE_INTERVAL_SECONDS}s)")
+    print("Press Ctrl+C to stop\n")
+
+    try:
+        reconcile()
+        schedule.every(RECONCILE_INTERVAL_SECONDS).seconds.do(reconcile)
+
+        while True:
+            schedule.run_pending()
+            time.sleep(1)
+    finally:
+        # 웹훅 수신을 먼저 멈춘 뒤 진행 중인 반영이 끝나기를 기다림 (재시작 시 쓰기 도중 종료 방지)
+        server.stop()
+        ingestor.stop()
+        if broadcaster:
+            broadcaster.close()
+        if notifier:
+            notifier.close()
+        engine.close()
+        if thumbnails:
+            thumbnails.close()
+        if writer:
+            writer.stop()
+
+
+def run_schedule_mode():
+    """스케줄러 모드: SCRAPE_INTERVAL_SECONDS마다 동기화"""
+    import schedule
+
+    from hysteresis import LiveStateMachine
+    from platforms import PlatformEngine
+
+    print(f"Starting scheduler (interval: {SCRAPE_INTERVAL_SECONDS}s)")
+    print("Press Ctrl+C to stop\n")
+
+    writer = start_writer()
+    engine = PlatformEngine()
+    state_machine = LiveStateMachine()
+    thumbnails = start_thumbnails()
+    memwatch = start_memwatch()
+    notifier = start_notifier()
+    rollup = None
+    if ROLLUP_ENABLED:
+        from rollups import LiveRollup
+
+        rollup = LiveRollup()
+    snapshot = None
+    server = None
+    broadcaster = None
+
+    # 썸네일 프록시가 버킷 없이 로컬 캐시를 쓰면 워커가 /thumbnails를 직접 서빙
+    serve_thumbnails = thumbnails is not None and thumbnails.store.storage is None
+
+    if LIVE_API_ENABLED or serve_thumbnails:
+        from server import WorkerHTTPServer
+
+        server = WorkerHTTPServer(SERVER_HOST, SERVER_PORT)
+
+    # 읽기 API: 사이트가 DB 대신 워커 메모리의 현재 상태를 조회
+    if LIVE_API_ENABLED:
+        from snapshot import LiveSnapshot, register_live_routes
+
+        snapshot = LiveSnapshot()
+        register_live_routes(server, snapshot)
+        broadcaster = start_broadcast(snapshot, server)
+
+    if server is not None:
+        if serve_thumbnails:
+            from thumbnails import register_thumbnail_routes
+            register_thumbnail_routes(server, thumbnails.store)
+        if memwatch is not None:
+            from memwatch import register_memory_routes
+            register_memory_routes(server, memwatch)
+        server.start()
+
+    def tick():
+        sync_live_status(writer, engine, state_machine, thumbnails, snapshot, notifier, rollup)
+        if memwatch:
+            memwatch.tick()  # 상한 초과 시 MemoryCeilingExceeded → finally에서 정리
+
+    try:
+        # 즉시 한 번 실행
+        tick()
+
+        # 스케줄 등록
+        schedule.every(SCRAPE_INTERVAL_SECONDS).seconds.do(tick)
+
+        # 후원 랭킹 증분 갱신 (상태는 메모리에 유지, 매 실행 후 .state에 저장)
+        if RANKINGS_INTERVAL_SECONDS > 0:
+            from rankings import load_state
+
+            ranking_state = load_state()
+            sync_rankings(ranking_state)
+            schedule.every(RANKINGS_INTERVAL_SECONDS).seconds.do(sync_rankings, ranking_state)
+
+        while True:
+            schedule.run_pending()
+            time.sleep(1)
+    finally:
+        if broadcaster:
+            broadcaster.close()
+        if notifier:
+            notifier.close()
+        if server:
+            server.stop()
+        engine.close()
+        if thumbnails:
+            thumbnails.close()
+        # 남은 쓰기 반영 (실패 시 저널에 남아 다음 실행에서 복원)
+        if writer:
+            writer.stop()
+
+
 def main():
-    parser = argparse.ArgumentParser(description="PandaTV Live Status Checker")
+    parser = argparse.ArgumentParser(description="Live Status Checker (PandaTV, Chzzk, Twitch, YouTube)")
     parser.add_argument(
         "--schedule",
         action="store_true",
@@ -133,6 +513,21 @@ def main():
         action="store_true",
         help="List all currently live streams"
     )
+    parser.add_argument(
+        "--push",
+        action="store_true",
+        help=f"Accept push events via webhook; poll every {RECONCILE_INTERVAL_SECONDS}s to reconcile"
+    )
+    parser.add_argument(
+        "--rankings",
+        action="store_true",
+        help="Refresh donation rankings from donations newer than the last run"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="With --rankings: compute changed rank rows without writing"
+    )
     parser.add_argument(
         "--debug",
         action="store_true",
@@ -152,20 +547,22 @@ def main():
     elif args.test:
         # 단일 유저 테스트
         test_user(args.test)
-    elif args.schedule:
-        # 스케줄러 모드
-        print(f"Starting scheduler (interval: {SCRAPE_INTERVAL_SECONDS}s)")
-        print("Press Ctrl+C to stop\n")
-
-        # 즉시 한 번 실행
-        sync_live_status()
-
-        # 스케줄 등록
-        schedule.every(SCRAPE_INTERVAL_SECONDS).seconds.do(sync_live_status)
-
-        while True:
-            schedule.run_pending()
-            time.sleep(1)
+    elif args.rankings:
+        # 후원 랭킹 증분 갱신
+        sync_rankings(dry_run=args.dry_run)
+    elif args.push or args.schedule:
+        from memwatch import MemoryCeilingExceeded, restart_worker
+
+        try:
+            if args.push:
+                # 푸시 수신 모드
+                run_push_mode()
+            else:
+                # 스케줄러 모드
+                run_schedule_mode()
+        except MemoryCeilingExceeded as e:
+            # 쓰기 큐/엔진 정리가 끝난 상태 → 같은 명령으로 다시 실행
+            restart_worker(e)
     else:
         # 한 번 실행
         sync_live_status()
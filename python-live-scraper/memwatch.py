@@ -0,0 +1,218 @@
+"""
+Worker Memory Watch
+
+장기 실행 워커(--schedule, --push)의 메모리를 틱마다 기록합니다.
+
+    매 틱      RSS, GC 세대별 카운트/수집 횟수를 한 줄로 로그 ([MEM])
+    N틱마다    tracemalloc 스냅샷을 직전 스냅샷과 비교해 증가량 상위 줄 로그
+    상한 초과  gc.collect() 후에도 RSS가 MEMORY_CEILING_MB 이상이면
+               MemoryCeilingExceeded → 쓰기 큐/엔진을 정리한 뒤 프로세스 재시작
+
+Railway는 restartPolicyMaxRetries(3)만큼만 재시작하므로 상한 초과 시에는
+종료 코드로 재시작을 맡기지 않고 같은 명령으로 프로세스를 다시 실행(os.execv)합니다.
+"""
+import gc
+import os
+import sys
+import time
+from typing import Optional
+
+from config import (
+    MEMORY_CEILING_MB,
+    MEMORY_TRACE_EVERY_TICKS,
+    MEMORY_TRACE_TOP,
+    MEMORY_TRACE_FRAMES,
+)
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+MB = 1024 * 1024
+# 재시작 직후 프로세스가 첫 틱에서 또 상한을 넘으면 상한 설정이 잘못된 것 → 재실행하지 않고 종료
+RESTART_ENV = "MEMWATCH_RESTARTS"
+
+
+class MemoryCeilingExceeded(Exception):
+    """RSS가 메모리 상한을 넘음 (워커 정리 후 재시작 필요)"""
+
+    def __init__(self, rss_mb: float, ceiling_mb: float, tick: int):
+        super().__init__(f"RSS {rss_mb:.1f}MB >= ceiling {ceiling_mb:g}MB (tick {tick})")
+        self.rss_mb = rss_mb
+        self.ceiling_mb = ceiling_mb
+        self.tick = tick
+
+
+def rss_bytes() -> Optional[int]:
+    """
+    현재 RSS (바이트)
+
+    /proc가 없으면(macOS 등) getrusage의 최대 RSS로 대신합니다.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    if RESOURCE_AVAILABLE:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    return None
+
+
+def gc_stats() -> dict:
+    """GC 세대별 현재 카운트와 누적 수집/회수/회수 불가 수"""
+    stats = gc.get_stats()
+    return {
+        "counts": gc.get_count(),
+        "collections": tuple(s["collections"] for s in stats),
+        "collected": sum(s["collected"] for s in stats),
+        "uncollectable": sum(s["uncollectable"] for s in stats),
+        "garbage": len(gc.garbage),
+    }
+
+
+class MemoryWatch:
+    """
+    틱 단위 메모리 관찰
+
+    Example:
+        watch = MemoryWatch()
+        def tick():
+            sync_live_status(...)
+            watch.tick()   # 상한 초과 시 MemoryCeilingExceeded
+    """
+
+    def __init__(
+        self,
+        trace_every: int = MEMORY_TRACE_EVERY_TICKS,
+        ceiling_mb: float = MEMORY_CEILING_MB,
+        top: int = MEMORY_TRACE_TOP,
+        frames: int = MEMORY_TRACE_FRAMES,
+    ):
+        self.trace_every = trace_every
+        self.ceiling_mb = ceiling_mb
+        self.top = top
+        self.ticks = 0
+        self.restarts = int(os.getenv(RESTART_ENV, "0") or 0)
+        self.started = time.time()
+        self.baseline_rss: Optional[int] = rss_bytes()
+        self.last_rss = self.baseline_rss
+        self.last: dict = {}
+        self._tracemalloc = None
+        self._snapshot = None
+
+        if trace_every > 0:
+            import tracemalloc  # 켤 때만 로드 (추적 중에는 할당마다 오버헤드)
+
+            self._tracemalloc = tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            self._snapshot = self._take_snapshot()
+            print(f"[MEM] tracemalloc on (every {trace_every} ticks, {frames} frames)")
+
+    def _take_snapshot(self):
+        tracemalloc = self._tracemalloc
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+    def trace_growth(self) -> list:
+        """직전 스냅샷 대비 증가량 상위 항목 로그 후 반환"""
+        snapshot = self._take_snapshot()
+        stats = [s for s in snapshot.compare_to(self._snapshot, "lineno") if s.size_diff > 0][:self.top]
+        self._snapshot = snapshot
+
+        current, peak = self._tracemalloc.get_traced_memory()
+        print(f"[MEM] tracemalloc: traced {current / MB:.1f}MB (peak {peak / MB:.1f}MB), top growth since last snapshot:")
+        for stat in stats:
+            frame = stat.traceback[0]
+            print(f"[MEM]   {stat.size_diff / 1024:+9.1f}KiB {stat.count_diff:+7d} blocks  {frame.filename}:{frame.lineno}")
+        if not stats:
+            print("[MEM]   (no growth)")
+        return stats
+
+    def stats(self) -> dict:
+        """최근 틱 통계 (HTTP 노출용)"""
+        return {
+            "tick": self.ticks,
+            "uptime_seconds": round(time.time() - self.started),
+            "restarts": self.restarts,
+            "ceiling_mb": self.ceiling_mb or None,
+            **self.last,
+        }
+
+    def tick(self) -> dict:
+        """
+        틱 종료 시 호출: 통계 로그, N틱마다 tracemalloc 비교, 상한 검사
+
+        Raises:
+            MemoryCeilingExceeded: gc.collect() 후에도 RSS가 상한 이상
+        """
+        self.ticks += 1
+        rss = rss_bytes()
+        gcs = gc_stats()
+        rss_mb = rss / MB if rss is not None else None
+        delta_mb = (rss - self.last_rss) / MB if rss is not None and self.last_rss is not None else 0.0
+        growth_mb = (rss - self.baseline_rss) / MB if rss is not None and self.baseline_rss is not None else 0.0
+        self.last_rss = rss
+        self.last = {
+            "rss_mb": round(rss_mb, 1) if rss_mb is not None else None,
+            "rss_delta_mb": round(delta_mb, 2),
+            "rss_growth_mb": round(growth_mb, 1),
+            "gc": {**gcs, "counts": list(gcs["counts"]), "collections": list(gcs["collections"])},
+        }
+
+        rss_text = f"{rss_mb:.1f}MB ({delta_mb:+.1f}, {growth_mb:+.1f} since start)" if rss_mb is not None else "n/a"
+        print(
+            f"[MEM] tick {self.ticks}: rss {rss_text}, gc counts {gcs['counts']}, "
+            f"collections {gcs['collections']}, uncollectable {gcs['uncollectable']}"
+        )
+
+        if self._tracemalloc is not None and self.ticks % self.trace_every == 0:
+            self.trace_growth()
+
+        if self.ceiling_mb > 0 and rss_mb is not None and rss_mb >= self.ceiling_mb:
+            # 아직 회수되지 않은 순환 참조일 수 있으므로 한 번 수집 후 다시 확인
+            gc.collect()
+            rss = rss_bytes()
+            rss_mb = rss / MB if rss is not None else 0.0
+            if rss_mb >= self.ceiling_mb:
+                raise MemoryCeilingExceeded(rss_mb, self.ceiling_mb, self.ticks)
+            print(f"[MEM] Back under ceiling after gc.collect(): {rss_mb:.1f}MB")
+
+        return self.last
+
+
+def restart_worker(error: MemoryCeilingExceeded) -> None:
+    """
+    정리(drain)가 끝난 뒤 같은 명령으로 프로세스 재실행
+
+    재시작 직후 첫 틱에서 다시 상한을 넘으면 재실행 대신 exit 1
+    (상한이 기본 사용량보다 낮은 설정 오류 → Railway 재시작 정책에 맡김)
+    """
+    print(f"[MEM] Memory ceiling exceeded: {error}")
+    restarts = int(os.getenv(RESTART_ENV, "0") or 0)
+    if error.tick <= 1 and restarts > 0:
+        print(f"[MEM] Ceiling hit on the first tick after restart - MEMORY_CEILING_MB={error.ceiling_mb:g} is too low")
+        sys.exit(1)
+
+    os.environ[RESTART_ENV] = str(restarts + 1)
+    print(f"[MEM] Restarting worker (restart #{restarts + 1})")
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os.execv(sys.executable, [sys.executable, *sys.argv])
+
+
+def register_memory_routes(server, watch: MemoryWatch) -> None:
+    """GET /debug/memory: 최근 틱의 RSS/GC 통계"""
+    from server import Response
+
+    server.route("GET", r"/debug/memory", lambda request: Response.json(watch.stats()))
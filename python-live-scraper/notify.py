@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+"""
+Go-live Notifications
+
+멤버가 방송을 시작하면(오프라인 -> 라이브) 설정된 웹훅 대상으로 알림을 보냅니다.
+
+- observe()는 틱/푸시 스레드에서 호출되며 전이를 outbox(sqlite)에 기록만 하고 바로 반환
+- 전송은 별도 스레드의 asyncio 루프가 대상별 태스크로 처리 (대상끼리 서로 막지 않음)
+- 대상별 배치: 깨어난 뒤 NOTIFY_BATCH_WINDOW_MS만큼 모아 요청 한 번 ({"events": [...]})
+- 실패 시 지수 백오프로 재시도, NOTIFY_MAX_ATTEMPTS회 실패하면 포기
+- 방송 세션 단위 중복 제거: (멤버, 플랫폼)의 열린 세션이 있으면 다시 알리지 않고,
+  종료 후 NOTIFY_SESSION_GAP_SECONDS 안에 다시 켜지면 같은 세션으로 봄.
+  세션과 outbox가 파일에 있으므로 재시작해도 같은 방송을 두 번 알리지 않습니다.
+
+Usage:
+    # 로컬 수신기 (대역) - NOTIFY_WEBHOOK_URLS=local=http://127.0.0.1:8099/notify
+    python notify.py receive --port 8099
+
+    # outbox 상태
+    python notify.py status
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
+
+from config import (
+    NOTIFY_WEBHOOK_URLS,
+    NOTIFY_WEBHOOK_SECRET,
+    NOTIFY_OUTBOX_PATH,
+    NOTIFY_BATCH_SIZE,
+    NOTIFY_BATCH_WINDOW_MS,
+    NOTIFY_MAX_ATTEMPTS,
+    NOTIFY_SESSION_GAP_SECONDS,
+    NOTIFY_MAX_AGE_SECONDS,
+    DEBUG,
+)
+from scraper import LiveStatus, UNCHANGED_ERROR
+
+EVENT_TYPE = "live_start"
+RETRY_BASE_SECONDS = 1.0
+RETRY_MAX_SECONDS = 300.0
+REQUEST_TIMEOUT_SECONDS = 10.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    member_id INTEGER NOT NULL,
+    platform TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    PRIMARY KEY (member_id, platform, started_at)
+);
+CREATE INDEX IF NOT EXISTS sessions_open ON sessions (member_id, platform, ended_at);
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    target TEXT NOT NULL,
+    session_key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    delivered REAL,
+    failed REAL,
+    UNIQUE (target, session_key)
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (target, delivered, failed, next_attempt);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def parse_targets(spec: str) -> dict[str, str]:
+    """
+    "discord=https://...,fan=https://..." -> {"discord": url, "fan": url}
+
+    이름을 생략하면 URL의 호스트를 이름으로 사용
+    """
+    targets = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, url = item.partition("=")
+        if not sep or "://" in name:
+            name, url = urlsplit(item).netloc, item
+        targets[name.strip()] = url.strip()
+    return targets
+
+
+def sign(body: bytes, secret: str) -> str:
+    return "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+
+def backoff_seconds(attempts: int) -> float:
+    return min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+class Outbox:
+    """
+    세션 + 전송 대기열 (sqlite, WAL)
+
+    연결 하나를 잠금으로 공유합니다. 호출은 모두 짧은 로컬 쓰기라 틱을 붙잡지 않습니다.
+    """
+
+    def __init__(self, path: Path = NOTIFY_OUTBOX_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # 세션
+    # ------------------------------------------------------------------
+    def initialized(self) -> bool:
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM meta WHERE key = 'initialized'").fetchone() is not None
+
+    def mark_initialized(self) -> None:
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('initialized', ?)", (str(time.time()),))
+
+    def open_sessions(self) -> set[tuple[int, str]]:
+        with self._lock:
+            rows = self._db.execute("SELECT member_id, platform FROM sessions WHERE ended_at IS NULL").fetchall()
+        return {(member_id, platform) for member_id, platform in rows}
+
+    def start_session(self, member_id: int, platform: str, user_id: str, now: float, gap: float) -> Optional[float]:
+        """
+        세션 시작 (직전 세션이 gap 안에 끝났으면 그 세션을 다시 엶)
+
+        Returns:
+            새 세션의 started_at, 이어진 세션이면 None
+        """
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT started_at, ended_at FROM sessions WHERE member_id = ? AND platform = ? "
+                "ORDER BY started_at DESC LIMIT 1",
+                (member_id, platform),
+            ).fetchone()
+            if row and (row[1] is None or now - row[1] < gap):
+                self._db.execute(
+                    "UPDATE sessions SET ended_at = NULL WHERE member_id = ? AND platform = ? AND started_at = ?",
+                    (member_id, platform, row[0]),
+                )
+                return None
+            self._db.execute(
+                "INSERT INTO sessions (member_id, platform, user_id, started_at) VALUES (?, ?, ?, ?)",
+                (member_id, platform, user_id, now),
+            )
+            return now
+
+    def end_session(self, member_id: int, platform: str, now: float) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE sessions SET ended_at = ? WHERE member_id = ? AND platform = ? AND ended_at IS NULL",
+                (now, member_id, platform),
+            )
+
+    # ------------------------------------------------------------------
+    # 전송 대기열
+    # ------------------------------------------------------------------
+    def enqueue(self, targets: list[str], session_key: str, payload: dict, now: float) -> int:
+        """대상별 한 행 (같은 세션은 UNIQUE로 무시)"""
+        body = json.dumps(payload, ensure_ascii=False)
+        with self._lock, self._db:
+            before = self._db.total_changes
+            self._db.executemany(
+                "INSERT OR IGNORE INTO outbox (target, session_key, payload, created, next_attempt) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(target, session_key, body, now, now) for target in targets],
+            )
+            return self._db.total_changes - before
+
+    def due(self, target: str, now: float, limit: int) -> list[tuple[int, dict, int, float]]:
+        """(id, payload, attempts, created) - 오래된 것부터"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, payload, attempts, created FROM outbox "
+                "WHERE target = ? AND delivered IS NULL AND failed IS NULL AND next_attempt <= ? "
+                "ORDER BY id LIMIT ?",
+                (target, now, limit),
+            ).fetchall()
+        return [(row_id, json.loads(payload), attempts, created) for row_id, payload, attempts, created in rows]
+
+    def next_due(self, target: str) -> Optional[float]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MIN(next_attempt) FROM outbox WHERE target = ? AND delivered IS NULL AND failed IS NULL",
+                (target,),
+            ).fetchone()
+        return row[0] if row else None
+
+    def mark_delivered(self, ids: list[int], now: float) -> None:
+        with self._lock, self._db:
+            self._db.executemany("UPDATE outbox SET delivered = ? WHERE id = ?", [(now, i) for i in ids])
+
+    def mark_failed(self, ids: list[int], attempts: int, now: float, give_up: bool) -> None:
+        with self._lock, self._db:
+            if give_up:
+                self._db.executemany(
+                    "UPDATE outbox SET attempts = ?, failed = ? WHERE id = ?", [(attempts, now, i) for i in ids]
+                )
+            else:
+                self._db.executemany(
+                    "UPDATE outbox SET attempts = ?, next_attempt = ? WHERE id = ?",
+                    [(attempts, now + backoff_seconds(attempts), i) for i in ids],
+                )
+
+    def mark_expired(self, ids: list[int], now: float) -> None:
+        with self._lock, self._db:
+            self._db.executemany("UPDATE outbox SET failed = ? WHERE id = ?", [(now, i) for i in ids])
+
+    def counts(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT target, "
+                "SUM(delivered IS NOT NULL), SUM(failed IS NOT NULL), SUM(delivered IS NULL AND failed IS NULL) "
+                "FROM outbox GROUP BY target"
+            ).fetchall()
+        return {
+            target: {"delivered": delivered or 0, "failed": failed or 0, "pending": pending or 0}
+            for target, delivered, failed, pending in rows
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class GoLiveNotifier:
+    """
+    오프라인 -> 라이브 전이를 감지해 웹훅 대상으로 알림
+
+    Example:
+        notifier = GoLiveNotifier()
+        notifier.start()
+        notifier.observe(members, statuses)   # 틱마다 (히스테리시스 이후 상태)
+        notifier.close()
+    """
+
+    def __init__(
+        self,
+        targets: Optional[dict[str, str]] = None,
+        outbox: Optional[Outbox] = None,
+        secret: str = NOTIFY_WEBHOOK_SECRET,
+        batch_size: int = NOTIFY_BATCH_SIZE,
+        batch_window: float = NOTIFY_BATCH_WINDOW_MS / 1000,
+        max_attempts: int = NOTIFY_MAX_ATTEMPTS,
+        session_gap: float = NOTIFY_SESSION_GAP_SECONDS,
+        max_age: float = NOTIFY_MAX_AGE_SECONDS,
+    ):
+        self.targets = parse_targets(NOTIFY_WEBHOOK_URLS) if targets is None else targets
+        self.outbox = outbox or Outbox()
+        self.secret = secret
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.max_attempts = max_attempts
+        self.session_gap = session_gap
+        self.max_age = max_age
+        self.stats = {"sessions": 0, "queued": 0, "delivered": 0, "retried": 0, "failed": 0, "expired": 0}
+
+        self.live: set[tuple[int, str]] = self.outbox.open_sessions()
+        self._observe_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._main_task: Optional[asyncio.Task] = None
+        self._wake: dict[str, asyncio.Event] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    # ------------------------------------------------------------------
+    # 전이 감지 (틱 스레드)
+    # ------------------------------------------------------------------
+    def observe(self, members: list[dict], statuses: list[LiveStatus], now: Optional[float] = None) -> int:
+        """
+        확정된 상태로 세션을 열고 닫음 - 새 세션이면 outbox에 넣고 전송 태스크를 깨움
+
+        보류(HELD)/미확인 상태는 무시합니다 (라이브 유지로 간주).
+        outbox를 처음 만든 실행에서는 이미 라이브인 멤버를 알리지 않고 세션만 엽니다.
+
+        Returns:
+            새로 시작된 세션 수
+        """
+        now = time.time() if now is None else now
+        member_of = {(m.get("platform", "pandatv"), m["user_id"]): m for m in members}
+        started = []
+
+        with self._observe_lock:
+            bootstrap = not self.outbox.initialized()
+            for status in statuses:
+                if status.error and status.error != UNCHANGED_ERROR:
+                    continue
+                member = member_of.get((status.platform, status.user_id))
+                if member is None:
+                    continue
+                key = (member["id"], status.platform)
+
+                if not status.is_live:
+                    if key in self.live:
+                        self.live.discard(key)
+                        self.outbox.end_session(member["id"], status.platform, now)
+                    continue
+                if key in self.live:
+                    continue
+
+                self.live.add(key)
+                started_at = self.outbox.start_session(member["id"], status.platform, status.user_id, now, self.session_gap)
+                if started_at is not None and not bootstrap:
+                    started.append((member, status, started_at))
+            if bootstrap:
+                self.outbox.mark_initialized()
+
+        for member, status, started_at in started:
+            self._enqueue(member, status, started_at)
+        if started:
+            self._wake_all()
+        return len(started)
+
+    def _enqueue(self, member: dict, status: LiveStatus, started_at: float) -> None:
+        session_key = f"{member['id']}:{status.platform}:{started_at:.3f}"
+        payload = {
+            "type": EVENT_TYPE,
+            "session": session_key,
+            "member_id": member["id"],
+            "name": member.get("name"),
+            "unit": member.get("unit"),
+            "platform": status.platform,
+            "user_id": status.user_id,
+            "title": status.title,
+            "viewer_count": status.viewer_count or 0,
+            "thumbnail_url": status.thumbnail_url,
+            "stream_url": status.stream_url or (
+                f"https://www.pandalive.co.kr/play/{status.user_id}" if status.platform == "pandatv" else None
+            ),
+            "started_at": datetime.fromtimestamp(started_at, timezone.utc).isoformat(),
+        }
+        self.stats["sessions"] += 1
+        self.stats["queued"] += self.outbox.enqueue(list(self.targets), session_key, payload, started_at)
+        print(f"[NOTIFY] {member.get('name') or member['id']} went live on {status.platform} -> {len(self.targets)} target(s)")
+
+    # ------------------------------------------------------------------
+    # 전송 (asyncio 루프 스레드)
+    # ------------------------------------------------------------------
+    def _wake_all(self) -> None:
+        loop = self._loop
+        if loop is None:
+            return
+        for event in self._wake.values():
+            loop.call_soon_threadsafe(event.set)
+
+    async def _deliver_target(self, name: str, url: str, client) -> None:
+        import httpx
+
+        wake = self._wake[name]
+        while True:
+            wake.clear()  # 조회 전에 지워야 그 사이 들어온 알림을 놓치지 않음
+            now = time.time()
+            next_due = self.outbox.next_due(name)
+            if next_due is None or next_due > now:
+                timeout = None if next_due is None else next_due - now
+                try:
+                    await asyncio.wait_for(wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                # 같은 틱에 시작한 다른 멤버와 묶기 위해 잠깐 대기
+                await asyncio.sleep(self.batch_window)
+                continue
+
+            rows = self.outbox.due(name, now, self.batch_size)
+            expired = [row_id for row_id, _, attempts, created in rows if now - created > self.max_age]
+            if expired:
+                self.outbox.mark_expired(expired, now)
+                self.stats["expired"] += len(expired)
+                print(f"[NOTIFY] {name}: dropped {len(expired)} notification(s) older than {self.max_age:g}s")
+            rows = [row for row in rows if row[0] not in expired]
+            if not rows:
+                continue
+
+            body = json.dumps({"events": [payload for _, payload, _, _ in rows]}, ensure_ascii=False).encode("utf-8")
+            headers = {"Content-Type": "application/json; charset=utf-8"}
+            if self.secret:
+                headers["X-Signature"] = sign(body, self.secret)
+
+            ids = [row_id for row_id, _, _, _ in rows]
+            attempts = max(a for _, _, a, _ in rows) + 1
+            try:
+                response = await client.post(url, content=body, headers=headers)
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                give_up = attempts >= self.max_attempts
+                self.outbox.mark_failed(ids, attempts, time.time(), give_up)
+                self.stats["failed" if give_up else "retried"] += len(ids)
+                action = "giving up" if give_up else f"retry in {backoff_seconds(attempts):g}s"
+                print(f"[NOTIFY] {name}: batch of {len(ids)} failed ({e}); {action}")
+                continue
+
+            done = time.time()
+            self.outbox.mark_delivered(ids, done)
+            self.stats["delivered"] += len(ids)
+            if DEBUG:
+                latency = max(done - created for _, _, _, created in rows)
+                print(f"[NOTIFY] {name}: delivered {len(ids)} in one request (max latency {latency * 1000:.0f}ms)")
+
+    async def _main(self) -> None:
+        import httpx
+
+        self._wake = {name: asyncio.Event() for name in self.targets}
+        async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT_SECONDS) as client:
+            tasks = [
+                asyncio.create_task(self._deliver_target(name, url, client), name=f"notify-{name}")
+                for name, url in self.targets.items()
+            ]
+            self._ready.set()
+            try:
+                await asyncio.gather(*tasks)
+            except asyncio.CancelledError:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        self._main_task = loop.create_task(self._main())
+        try:
+            loop.run_until_complete(self._main_task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            loop.close()
+
+    def start(self) -> None:
+        if self._thread is not None or not self.targets:
+            return
+        self._thread = threading.Thread(target=self._run, name="notify", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=5)
+        print(f"[NOTIFY] Delivering go-live notifications to {', '.join(self.targets)}")
+
+    def close(self, timeout: float = 5.0) -> None:
+        """전송 루프 종료 (보내지 못한 알림은 outbox에 남아 다음 실행에서 전송)"""
+        if self._thread is not None and self._main_task is not None:
+            self._loop.call_soon_threadsafe(self._main_task.cancel)
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        self.outbox.close()
+
+
+# ----------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------
+def receive(host: str, port: int, secret: str) -> None:
+    """로컬 수신기 대역: 받은 이벤트와 방송 시작부터의 지연을 출력"""
+    from server import WorkerHTTPServer, Request, Response
+
+    def handle(request: Request) -> Response:
+        if secret and not hmac.compare_digest(request.header("x-signature") or "", sign(request.body, secret)):
+            return Response.json({"error": "Bad signature"}, status=401)
+        events = (request.json() or {}).get("events", [])
+        now = datetime.now(timezone.utc)
+        for event in events:
+            started = datetime.fromisoformat(event["started_at"])
+            print(f"[RECEIVER] {event.get('name') or event['member_id']} ({event['platform']}) live - "
+                  f"{(now - started).total_seconds() * 1000:.0f}ms after detection, session {event['session']}")
+        print(f"[RECEIVER] batch of {len(events)}")
+        return Response.json({"received": len(events)})
+
+    server = WorkerHTTPServer(host, port)
+    server.route("POST", r"/notify", handle)
+    server.start()
+    print(f"Set NOTIFY_WEBHOOK_URLS=local=http://{host}:{port}/notify")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Go-live notification outbox")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    recv = sub.add_parser("receive", help="Run a local stand-in webhook receiver")
+    recv.add_argument("--host", default="127.0.0.1")
+    recv.add_argument("--port", type=int, default=8099)
+    recv.add_argument("--secret", default=NOTIFY_WEBHOOK_SECRET, help="Verify X-Signature with this secret")
+
+    sub.add_parser("status", help="Show outbox counts per target and open sessions")
+
+    args = parser.parse_args()
+    if args.command == "receive":
+        receive(args.host, args.port, args.secret)
+        return
+
+    outbox = Outbox()
+    counts = outbox.counts()
+    print(f"Outbox: {outbox.path}")
+    for target, count in sorted(counts.items()):
+        print(f"  {target:20} delivered {count['delivered']:6}  pending {count['pending']:4}  failed {count['failed']:4}")
+    if not counts:
+        print("  (empty)")
+    print(f"Open sessions: {len(outbox.open_sessions())}")
+    outbox.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+"""
+Multi-platform Live Status Engine
+
+플랫폼별 어댑터가 일괄 상태 조회를 담당하고,
+엔진이 한 틱 안에서 모든 플랫폼을 동시에 실행합니다.
+
+- 플랫폼마다 전용 httpx.Client(커넥션 풀)와 요청 속도 제한(ratelimit.py 토큰 버킷)을 가짐
+- 느린 플랫폼은 PLATFORM_TICK_TIMEOUT_SECONDS 이후 이번 틱에서 제외되어
+  다른 플랫폼 결과 반영을 막지 않음
+- 결과는 하나의 LiveStatus 목록으로 합쳐 batch_update_live_status로 한 번에 씀
+"""
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Optional
+
+import httpx
+
+from config import (
+    TWITCH_CLIENT_ID,
+    TWITCH_CLIENT_SECRET,
+    YOUTUBE_API_KEY,
+    PLATFORM_TICK_TIMEOUT_SECONDS,
+    DEBUG,
+)
+from ratelimit import THROTTLE_STATUS_CODES, limiter, retry_after_seconds
+from scraper import LiveStatus, check_multiple_users
+
+USER_AGENT = "Mozilla/5.0"
+
+
+def account_id_from_link(value: str) -> str:
+    """social_links 값(ID 또는 URL)에서 계정 ID 추출"""
+    value = value.strip().rstrip("/")
+    if "/" in value:
+        value = value.rsplit("/", 1)[-1]
+    return value.split("?", 1)[0]
+
+
+class PlatformAdapter:
+    """
+    플랫폼 어댑터 기본 클래스
+
+    하위 클래스는 name, fetch_statuses()를 구현합니다.
+    """
+
+    name = ""
+    max_connections = 4
+    min_request_interval = 0.0  # 요청 간 최소 간격 (초) - RATE_LIMITS에 예산이 없을 때 기본값
+    request_timeout = 10.0
+
+    def __init__(self):
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
+        )
+        self.client = httpx.Client(
+            headers={"User-Agent": USER_AGENT},
+            timeout=self.request_timeout,
+            limits=limits,
+            transport=self.transport(limits),
+        )
+        self.limiter = limiter(
+            self.name, rate=1 / self.min_request_interval if self.min_request_interval > 0 else 0.0
+        )
+
+    def enabled(self) -> bool:
+        """필요한 자격 증명이 설정되어 있는지"""
+        return True
+
+    def transport(self, limits: httpx.Limits) -> Optional[httpx.BaseTransport]:
+        """httpx 트랜스포트 교체 지점 (None이면 기본 커넥션 풀)"""
+        return None
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        """속도 제한 토큰을 얻은 뒤 요청 (스로틀링 응답이면 백오프 기록)"""
+        self.limiter.acquire()
+        response = self.client.get(url, **kwargs)
+        if response.status_code in THROTTLE_STATUS_CODES:
+            self.limiter.throttled(retry_after_seconds(response.headers))
+        else:
+            self.limiter.succeeded()
+        response.raise_for_status()
+        return response
+
+    def fetch_statuses(self, user_ids: list[str]) -> list[LiveStatus]:
+        raise NotImplementedError
+
+    def offline(self, user_id: str, error: Optional[str] = None) -> LiveStatus:
+        return LiveStatus(user_id=user_id, is_live=False, platform=self.name, error=error)
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class PandaTVAdapter(PlatformAdapter):
+    """PandaTV - /v1/live 목록 1회(페이지네이션) 조회로 전체 확인"""
+
+    name = "pandatv"
+    max_connections = 2
+
+    def transport(self, limits: httpx.Limits) -> Optional[httpx.BaseTransport]:
+        # CASSETTE_RECORD_DIR 설정 시 /v1/live 응답을 카세트에 기록
+        from cassette import recording_transport
+        return recording_transport(limits)
+
+    def fetch_statuses(self, user_ids: list[str]) -> list[LiveStatus]:
+        statuses = check_multiple_users(user_ids, client=self.client)
+        for status in statuses:
+            status.stream_url = f"https://www.pandalive.co.kr/play/{status.user_id}"
+        return statuses
+
+
+class ChzzkAdapter(PlatformAdapter):
+    """치지직 - 채널별 live-status 폴링 API (인증 불필요)"""
+
+    name = "chzzk"
+    max_connections = 4
+    min_request_interval = 0.1
+    API_URL = "https://api.chzzk.naver.com/polling/v2/channels/{channel_id}/live-status"
+
+    def fetch_one(self, user_id: str) -> LiveStatus:
+        channel_id = account_id_from_link(user_id)
+        try:
+            content = self.get(self.API_URL.format(channel_id=channel_id)).json().get("content") or {}
+        except (httpx.HTTPError, ValueError) as e:
+            return self.offline(user_id, error=str(e))
+
+        if content.get("status") != "OPEN":
+            return self.offline(user_id)
+
+        thumbnail = content.get("liveImageUrl")
+        return LiveStatus(
+            user_id=user_id,
+            is_live=True,
+            platform=self.name,
+            viewer_count=content.get("concurrentUserCount"),
+            thumbnail_url=thumbnail.replace("{type}", "480") if thumbnail else None,
+            title=content.get("liveTitle"),
+            stream_url=f"https://chzzk.naver.com/live/{channel_id}",
+        )
+
+    def fetch_statuses(self, user_ids: list[str]) -> list[LiveStatus]:
+        with ThreadPoolExecutor(max_workers=self.max_connections) as pool:
+            return list(pool.map(self.fetch_one, user_ids))
+
+
+class TwitchAdapter(PlatformAdapter):
+    """Twitch - Helix streams API (최대 100명 단위 일괄 조회, 앱 토큰 필요)"""
+
+    name = "twitch"
+    max_connections = 2
+    BATCH_SIZE = 100
+    TOKEN_URL = "https://id.twitch.tv/oauth2/token"
+    STREAMS_URL = "https://api.twitch.tv/helix/streams"
+
+    def __init__(self):
+        super().__init__()
+        self._token: Optional[str] = None
+        self._token_expires_at = 0.0
+
+    def enabled(self) -> bool:
+        return bool(TWITCH_CLIENT_ID and TWITCH_CLIENT_SECRET)
+
+    def token(self) -> str:
+        if self._token and time.monotonic() < self._token_expires_at:
+            return self._token
+
+        response = self.client.post(self.TOKEN_URL, params={
+            "client_id": TWITCH_CLIENT_ID,
+            "client_secret": TWITCH_CLIENT_SECRET,
+            "grant_type": "client_credentials",
+        })
+        response.raise_for_status()
+        data = response.json()
+        self._token = data["access_token"]
+        # 만료 1분 전에 갱신
+        self._token_expires_at = time.monotonic() + data.get("expires_in", 3600) - 60
+        return self._token
+
+    def fetch_statuses(self, user_ids: list[str]) -> list[LiveStatus]:
+        logins = {account_id_from_link(u).lower(): u for u in user_ids}
+        live: dict[str, dict] = {}
+        names = list(logins)
+
+        try:
+            headers = {"Client-Id": TWITCH_CLIENT_ID, "Authorization": f"Bearer {self.token()}"}
+            for i in range(0, len(names), self.BATCH_SIZE):
+                response = self.get(
+                    self.STREAMS_URL,
+                    params=[("user_login", n) for n in names[i:i + self.BATCH_SIZE]],
+                    headers=headers,
+                )
+                for stream in response.json().get("data", []):
+                    live[stream["user_login"].lower()] = stream
+        except (httpx.HTTPError, KeyError, ValueError) as e:
+            return [self.offline(u, error=str(e)) for u in user_ids]
+
+        statuses = []
+        for login, user_id in logins.items():
+            stream = live.get(login)
+            if not stream:
+                statuses.append(self.offline(user_id))
+                continue
+            thumbnail = stream.get("thumbnail_url") or ""
+            statuses.append(LiveStatus(
+                user_id=user_id,
+                is_live=True,
+                platform=self.name,
+                user_nick=stream.get("user_name"),
+                viewer_count=stream.get("viewer_count"),
+                thumbnail_url=thumbnail.replace("{width}", "640").replace("{height}", "360") or None,
+                title=stream.get("title"),
+                stream_url=f"https://www.twitch.tv/{login}",
+            ))
+        return statuses
+
+
+class YouTubeAdapter(PlatformAdapter):
+    """
+    YouTube - Data API v3 (API 키 필요)
+
+    search.list(eventType=live)는 채널당 100 quota를 쓰므로 동시성을 낮게 유지합니다.
+    @handle URL은 channels.list(forHandle)로 채널 ID를 한 번만 조회하여 캐시합니다.
+    """
+
+    name = "youtube"
+    max_connections = 2
+    min_request_interval = 0.2
+    API_BASE = "https://www.googleapis.com/youtube/v3"
+    CHANNEL_ID_PATTERN = re.compile(r"(UC[\w-]{22})")
+
+    def __init__(self):
+        super().__init__()
+        self._channel_ids: dict[str, Optional[str]] = {}
+
+    def enabled(self) -> bool:
+        return bool(YOUTUBE_API_KEY)
+
+    def channel_id(self, link: str) -> Optional[str]:
+        if link in self._channel_ids:
+            return self._channel_ids[link]
+
+        match = self.CHANNEL_ID_PATTERN.search(link)
+        if match:
+            channel_id = match.group(1)
+        else:
+            handle = account_id_from_link(link)
+            response = self.get(f"{self.API_BASE}/channels", params={
+                "part": "id",
+                "forHandle": handle if handle.startswith("@") else f"@{handle}",
+                "key": YOUTUBE_API_KEY,
+            })
+            items = response.json().get("items", [])
+            channel_id = items[0]["id"] if items else None
+
+        self._channel_ids[link] = channel_id
+        return channel_id
+
+    def fetch_one(self, user_id: str) -> LiveStatus:
+        try:
+            channel_id = self.channel_id(user_id)
+            if not channel_id:
+                return self.offline(user_id, error="Unknown YouTube channel")
+
+            items = self.get(f"{self.API_BASE}/search", params={
+                "part": "snippet",
+                "channelId": channel_id,
+                "eventType": "live",
+                "type": "video",
+                "key": YOUTUBE_API_KEY,
+            }).json().get("items", [])
+        except (httpx.HTTPError, KeyError, ValueError) as e:
+            return self.offline(user_id, error=str(e))
+
+        if not items:
+            return self.offline(user_id)
+
+        video = items[0]
+        snippet = video.get("snippet", {})
+        thumbnails = snippet.get("thumbnails", {})
+        thumbnail = (thumbnails.get("high") or thumbnails.get("default") or {}).get("url")
+        return LiveStatus(
+            user_id=user_id,
+            is_live=True,
+            platform=self.name,
+            user_nick=snippet.get("channelTitle"),
+            thumbnail_url=thumbnail,
+            title=snippet.get("title"),
+            stream_url=f"https://www.youtube.com/watch?v={video['id']['videoId']}",
+        )
+
+    def fetch_statuses(self, user_ids: list[str]) -> list[LiveStatus]:
+        with ThreadPoolExecutor(max_workers=self.max_connections) as pool:
+            return list(pool.map(self.fetch_one, user_ids))
+
+
+ADAPTER_CLASSES: tuple[type[PlatformAdapter], ...] = (
+    PandaTVAdapter,
+    ChzzkAdapter,
+    TwitchAdapter,
+    YouTubeAdapter,
+)
+
+
+class PlatformEngine:
+    """
+    모든 플랫폼을 동시에 조회하는 엔진
+
+    어댑터(와 커넥션 풀)는 엔진 수명 동안 재사용됩니다.
+    """
+
+    def __init__(self, adapters: Optional[list[PlatformAdapter]] = None):
+        if adapters is None:
+            adapters = [cls() for cls in ADAPTER_CLASSES]
+        self.adapters = {a.name: a for a in adapters if a.enabled()}
+        # 느린 플랫폼이 틱을 넘겨도 다음 틱이 막히지 않도록 플랫폼별 워커를 여유 있게 둠
+        self.pool = ThreadPoolExecutor(
+            max_workers=max(1, len(self.adapters) * 2),
+            thread_name_prefix="platform",
+        )
+        self._inflight: dict[str, object] = {}
+
+    def check_all(
+        self,
+        members: list[dict],
+        timeout: float = PLATFORM_TICK_TIMEOUT_SECONDS,
+    ) -> list[LiveStatus]:
+        """
+        멤버 목록의 모든 플랫폼 상태 조회
+
+        Args:
+            members: get_platform_members() 결과
+            timeout: 이 시간 안에 끝나지 않은 플랫폼은 이번 틱에서 제외
+
+        Returns:
+            완료된 플랫폼의 LiveStatus 목록
+        """
+        user_ids_by_platform: dict[str, list[str]] = {}
+        for member in members:
+            user_ids_by_platform.setdefault(member.get("platform", "pandatv"), []).append(member["user_id"])
+
+        futures = {}
+        for platform, user_ids in user_ids_by_platform.items():
+            adapter = self.adapters.get(platform)
+            if adapter is None:
+                if DEBUG:
+                    print(f"[ENGINE] Skipping {platform}: adapter disabled")
+                continue
+
+            previous = self._inflight.get(platform)
+            if previous is not None and not previous.done():
+                print(f"[ENGINE] {platform}: previous tick still running, skipping")
+                continue
+
+            future = self.pool.submit(self._timed_fetch, adapter, user_ids)
+            self._inflight[platform] = future
+            futures[future] = platform
+
+        done, not_done = wait(futures, timeout=timeout)
+
+        statuses: list[LiveStatus] = []
+        for future in done:
+            platform = futures[future]
+            try:
+                statuses.extend(future.result())
+            except Exception as e:
+                print(f"[ENGINE] {platform} failed: {e}")
+
+        for future in not_done:
+            print(f"[ENGINE] {futures[future]} exceeded {timeout:g}s, excluded from this tick")
+
+        return statuses
+
+    @staticmethod
+    def _timed_fetch(adapter: PlatformAdapter, user_ids: list[str]) -> list[LiveStatus]:
+        started = time.monotonic()
+        statuses = adapter.fetch_statuses(user_ids)
+        if DEBUG:
+            elapsed = (time.monotonic() - started) * 1000
+            print(f"[ENGINE] {adapter.name}: {len(user_ids)} user(s) in {elapsed:.0f}ms")
+        return statuses
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=False)
+        for adapter in self.adapters.values():
+            adapter.close()
@@ -0,0 +1,142 @@
+"""
+Profile Data Loader
+
+멤버 프로필(profile_info) 원본은 data/profile_info.json에 있습니다.
+
+    {"version": 1, "members": {"린아": {"mbti": "ESTP", ...}, "가애": null}}
+
+- 로드할 때 스키마를 검사하고, 통과한 결과를 파일 해시 기준으로
+  .state/profile_info.<해시>.pickle에 저장 → 파일이 그대로면 파싱/검사 생략
+- DB 멤버와의 매칭은 이름 인덱스(NFC 정규화)로 한 번에 처리
+"""
+import hashlib
+import json
+import pickle
+import unicodedata
+from pathlib import Path
+from typing import Any, Optional
+
+from config import STATE_DIR
+
+PROFILE_DATA_PATH = Path(__file__).resolve().parent / "data" / "profile_info.json"
+SCHEMA_VERSION = 1
+
+# profile_info 필드 -> 허용 타입 (모두 선택 필드)
+PROFILE_FIELDS: dict[str, tuple[type, ...]] = {
+    "mbti": (str,),
+    "blood_type": (str,),
+    "height": (str,),
+    "weight": (str,),
+    "birthday": (str,),
+    "signal_price": (int,),
+    "photo_delivery": (bool,),
+    "position_pledge": (str,),
+}
+
+
+class ProfileDataError(ValueError):
+    """프로필 데이터 파일 형식 오류"""
+
+
+def normalize_name(name: str) -> str:
+    """이름 비교용 정규화 (NFC + 앞뒤 공백 제거)"""
+    return unicodedata.normalize("NFC", name).strip()
+
+
+def validate_profiles(doc: Any) -> dict[str, Optional[dict]]:
+    """
+    스키마 검사
+
+    Returns:
+        {정규화된 이름: profile_info 또는 None}
+
+    Raises:
+        ProfileDataError: 형식 오류 (모든 오류를 모아서 보고)
+    """
+    if not isinstance(doc, dict):
+        raise ProfileDataError("top level must be an object")
+    if doc.get("version") != SCHEMA_VERSION:
+        raise ProfileDataError(f"unsupported version {doc.get('version')!r} (expected {SCHEMA_VERSION})")
+    members = doc.get("members")
+    if not isinstance(members, dict):
+        raise ProfileDataError("'members' must be an object keyed by member name")
+
+    errors = []
+    profiles: dict[str, Optional[dict]] = {}
+    for raw_name, profile in members.items():
+        name = normalize_name(raw_name)
+        if not name:
+            errors.append("empty member name")
+            continue
+        if name in profiles:
+            errors.append(f"{name}: duplicate member")
+            continue
+        if profile is not None and not isinstance(profile, dict):
+            errors.append(f"{name}: profile must be an object or null")
+            continue
+
+        for field, value in (profile or {}).items():
+            allowed = PROFILE_FIELDS.get(field)
+            if allowed is None:
+                errors.append(f"{name}: unknown field '{field}'")
+            elif value is not None and (
+                not isinstance(value, allowed)
+                # bool은 int의 하위 타입이므로 별도 확인
+                or (isinstance(value, bool) and bool not in allowed)
+            ):
+                errors.append(f"{name}.{field}: expected {allowed[0].__name__}, got {type(value).__name__}")
+        profiles[name] = profile
+
+    if errors:
+        raise ProfileDataError("; ".join(errors))
+    return profiles
+
+
+def load_profiles(
+    path: Path = PROFILE_DATA_PATH,
+    cache_dir: Optional[Path] = STATE_DIR,
+) -> dict[str, Optional[dict]]:
+    """
+    프로필 데이터 로드 (파일 해시가 같으면 캐시 사용)
+
+    Args:
+        cache_dir: 검사를 통과한 결과를 저장할 디렉토리 (None이면 캐시 미사용)
+    """
+    raw = Path(path).read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()[:16]
+    cache_path = Path(cache_dir) / f"profile_info.{digest}.pickle" if cache_dir else None
+
+    if cache_path and cache_path.exists():
+        try:
+            with open(cache_path, "rb") as f:
+                cached = pickle.load(f)
+            if cached.get("schema_version") == SCHEMA_VERSION:
+                return cached["profiles"]
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError):
+            pass  # 손상된 캐시는 다시 생성
+
+    try:
+        doc = json.loads(raw.decode("utf-8"))
+    except ValueError as e:
+        raise ProfileDataError(f"{path}: invalid JSON ({e})") from e
+    profiles = validate_profiles(doc)
+
+    if cache_path:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # 이전 버전 캐시 정리
+            for old in cache_path.parent.glob("profile_info.*.pickle"):
+                old.unlink(missing_ok=True)
+            tmp_path = cache_path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                pickle.dump({"schema_version": SCHEMA_VERSION, "profiles": profiles}, f)
+            tmp_path.replace(cache_path)
+        except OSError as e:
+            print(f"[PROFILE] Failed to write cache {cache_path}: {e}")
+
+    return profiles
+
+
+def index_members(members: list[dict]) -> dict[str, dict]:
+    """DB 멤버 행 -> {정규화된 이름: 행} 인덱스"""
+    return {normalize_name(member["name"]): member for member in members}
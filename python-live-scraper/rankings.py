@@ -0,0 +1,360 @@
+"""
+Incremental Donation Rankings
+
+donations 테이블을 매번 전부 다시 집계하지 않고, 마지막으로 처리한
+donation id(high-water mark) 이후의 후원만 읽어 누적 합계를 갱신합니다.
+
+- 범위(scope)별 누적: 종합(total), 시즌별(season:<id>), 팬클럽별(unit:<unit>)
+- 범위마다 Top-K를 min-heap + 인덱스로 유지 → 후원 1건당 O(log K)
+- 마지막으로 DB에 쓴 순위와 비교해 바뀐 순위 행만 upsert
+- 상태(누적 합계, high-water mark, 쓴 순위)는 .state/rankings.pickle에 저장
+
+비용: 첫 실행만 donations 전체를 읽고, 이후에는 O(새 후원 수)
+"""
+import heapq
+import pickle
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, TYPE_CHECKING
+
+from config import (
+    RANKINGS_STATE_PATH,
+    RANKINGS_TOP_K,
+    RANKINGS_PAGE_SIZE,
+    RANKINGS_TABLES,
+    DEBUG,
+)
+from profile_data import normalize_name
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+STATE_VERSION = 1
+TOTAL_SCOPE = "total"
+
+
+def season_scope(season_id: int) -> str:
+    return f"season:{season_id}"
+
+
+def unit_scope(unit: str) -> str:
+    return f"unit:{unit}"
+
+
+@dataclass
+class DonorTotal:
+    """후원자 1명의 범위 내 누적"""
+    amount: int = 0
+    count: int = 0
+    # 동점이면 먼저 후원한 사람이 위 (처리 순서 = donation id 순서)
+    first_seq: int = 0
+    unit: Optional[str] = None
+
+    def key(self) -> tuple[int, int]:
+        """정렬 키 (클수록 상위)"""
+        return (self.amount, -self.first_seq)
+
+
+class Leaderboard:
+    """
+    범위 하나의 누적 합계 + Top-K
+
+    _top은 현재 Top-K에 든 후원자 -> 정렬 키 인덱스이고,
+    _heap은 그 키들의 min-heap입니다. 키가 바뀌면 새 항목을 넣고
+    옛 항목은 꺼낼 때 인덱스와 비교해 버립니다(lazy deletion).
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self.totals: dict[str, DonorTotal] = {}
+        self._top: dict[str, tuple[int, int]] = {}
+        self._heap: list[tuple[int, int, str]] = []
+        # 음수 후원(환불 등)으로 Top-K 안의 값이 줄면 전체에서 다시 선정
+        self._dirty = False
+
+    def add(self, donor: str, amount: int, seq: int, unit: Optional[str] = None) -> None:
+        total = self.totals.get(donor)
+        if total is None:
+            total = self.totals[donor] = DonorTotal(first_seq=seq)
+        total.amount += amount
+        total.count += 1
+        if unit:
+            total.unit = unit
+
+        key = total.key()
+        if donor in self._top:
+            self._push(donor, key)
+            if amount < 0:
+                self._dirty = True
+        elif len(self._top) < self.k:
+            self._push(donor, key)
+        elif key > self._min_key():
+            evicted = heapq.heappop(self._heap)[2]
+            del self._top[evicted]
+            self._push(donor, key)
+
+    def _push(self, donor: str, key: tuple[int, int]) -> None:
+        self._top[donor] = key
+        heapq.heappush(self._heap, (key[0], key[1], donor))
+
+    def _min_key(self) -> tuple[int, int]:
+        """Top-K 최소 키 (오래된 heap 항목 정리)"""
+        while True:
+            amount, tiebreak, donor = self._heap[0]
+            if self._top.get(donor) == (amount, tiebreak):
+                return (amount, tiebreak)
+            heapq.heappop(self._heap)
+
+    def _reselect(self) -> None:
+        best = heapq.nlargest(self.k, self.totals.items(), key=lambda item: item[1].key())
+        self._top = {donor: total.key() for donor, total in best}
+        self._heap = [(key[0], key[1], donor) for donor, key in self._top.items()]
+        heapq.heapify(self._heap)
+        self._dirty = False
+
+    def ranking(self) -> list[tuple[int, str, DonorTotal]]:
+        """[(순위, 후원자, 누적)] - 1위부터"""
+        if self._dirty:
+            self._reselect()
+        ordered = sorted(self._top, key=lambda donor: self._top[donor], reverse=True)
+        return [(rank, donor, self.totals[donor]) for rank, donor in enumerate(ordered, start=1)]
+
+
+@dataclass
+class RankingState:
+    """디스크에 저장하는 랭킹 작업 상태"""
+    high_water_mark: int = 0
+    seq: int = 0
+    boards: dict[str, Leaderboard] = field(default_factory=dict)
+    # 테이블 키 -> {rank: 마지막으로 쓴 행}
+    written: dict[str, dict[int, dict]] = field(default_factory=dict)
+    permanent_vips: set[str] = field(default_factory=set)
+
+    def board(self, scope: str, k: int) -> Leaderboard:
+        if scope not in self.boards:
+            self.boards[scope] = Leaderboard(k)
+        return self.boards[scope]
+
+    def apply(self, donation: dict, k: int) -> None:
+        """후원 1건 반영 (id 순서로 호출)"""
+        self.high_water_mark = max(self.high_water_mark, int(donation["id"]))
+        donor = normalize_name(donation.get("donor_name") or "")
+        if not donor:
+            return
+        amount = int(donation.get("amount") or 0)
+        unit = donation.get("unit")
+        self.seq += 1
+
+        self.board(TOTAL_SCOPE, k).add(donor, amount, self.seq, unit)
+        if donation.get("season_id") is not None:
+            self.board(season_scope(donation["season_id"]), k).add(donor, amount, self.seq, unit)
+        if unit:
+            self.board(unit_scope(unit), k).add(donor, amount, self.seq, unit)
+
+
+def load_state(path: Path = RANKINGS_STATE_PATH) -> RankingState:
+    """저장된 상태 로드 (없거나 버전이 다르면 빈 상태 → 처음부터 집계)"""
+    try:
+        with open(path, "rb") as f:
+            saved = pickle.load(f)
+        if saved.get("version") == STATE_VERSION:
+            return saved["state"]
+    except FileNotFoundError:
+        pass
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError) as e:
+        print(f"[RANK] Ignoring unreadable state {path}: {e}")
+    return RankingState()
+
+
+def save_state(state: RankingState, path: Path = RANKINGS_STATE_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump({"version": STATE_VERSION, "state": state}, f)
+    tmp_path.replace(path)
+
+
+def fetch_new_donations(client: "Client", after_id: int, page_size: int = RANKINGS_PAGE_SIZE):
+    """id > after_id 후원을 id 순서로 페이지 단위 조회 (keyset pagination)"""
+    while True:
+        response = client.table("donations").select(
+            "id, donor_name, amount, season_id, unit"
+        ).gt("id", after_id).order("id").limit(page_size).execute()
+        rows = response.data or []
+        yield from rows
+        if len(rows) < page_size:
+            return
+        after_id = rows[-1]["id"]
+
+
+# 테이블 키 -> (테이블, on_conflict)
+RANKING_TABLES = {
+    "total": ("total_donation_rankings", "rank"),
+    "season": ("season_donation_rankings", "season_id,rank"),
+}
+
+
+def build_rows(state: RankingState, k: int) -> dict[str, dict[int, dict]]:
+    """
+    현재 Top-K -> 테이블별 순위 행
+
+    Returns:
+        {"total": {rank: row}, "season:1": {rank: row}, ...}
+    """
+    tables: dict[str, dict[int, dict]] = {}
+    if "total" in RANKINGS_TABLES and TOTAL_SCOPE in state.boards:
+        tables["total"] = {
+            rank: {
+                "rank": rank,
+                "donor_name": donor,
+                "total_amount": total.amount,
+                "is_permanent_vip": donor in state.permanent_vips,
+            }
+            for rank, donor, total in state.board(TOTAL_SCOPE, k).ranking()
+        }
+    if "season" in RANKINGS_TABLES:
+        for scope, board in state.boards.items():
+            if not scope.startswith("season:"):
+                continue
+            season_id = int(scope.split(":", 1)[1])
+            tables[scope] = {
+                rank: {
+                    "season_id": season_id,
+                    "rank": rank,
+                    "donor_name": donor,
+                    "total_amount": total.amount,
+                    "donation_count": total.count,
+                    "unit": total.unit,
+                }
+                for rank, donor, total in board.ranking()
+            }
+    return tables
+
+
+def diff_rows(written: dict[int, dict], current: dict[int, dict]) -> tuple[list[dict], list[int]]:
+    """
+    바뀐 순위 행만 추출
+
+    Returns:
+        (upsert할 행, 삭제할 순위)
+    """
+    changed = [row for rank, row in sorted(current.items()) if written.get(rank) != row]
+    removed = sorted(rank for rank in written if rank not in current)
+    return changed, removed
+
+
+def seed_written(client: "Client", state: RankingState) -> None:
+    """
+    첫 실행: DB에 이미 있는 순위 행을 '쓴 상태'로 불러와 비교 기준으로 사용
+
+    영구 VIP 표시(is_permanent_vip)는 후원자 기준으로 보존합니다.
+    """
+    if "total" in RANKINGS_TABLES:
+        rows = client.table("total_donation_rankings").select(
+            "rank, donor_name, total_amount, is_permanent_vip"
+        ).execute().data or []
+        state.permanent_vips = {
+            normalize_name(row["donor_name"]) for row in rows if row.get("is_permanent_vip")
+        }
+        state.written["total"] = {row["rank"]: row for row in rows}
+
+    if "season" in RANKINGS_TABLES:
+        rows = client.table("season_donation_rankings").select(
+            "season_id, rank, donor_name, total_amount, donation_count, unit"
+        ).execute().data or []
+        for row in rows:
+            state.written.setdefault(season_scope(row["season_id"]), {})[row["rank"]] = row
+
+
+def write_changes(client: "Client", state: RankingState, tables: dict[str, dict[int, dict]]) -> dict:
+    """
+    테이블별로 바뀐 행만 upsert, 밀려난 순위는 삭제
+
+    테이블 하나가 실패해도 나머지는 계속 쓰고, 실패한 테이블은 written을
+    갱신하지 않아 다음 실행에서 다시 비교됩니다.
+    """
+    result = {"upserted": 0, "deleted": 0, "errors": []}
+    now = datetime.now(timezone.utc).isoformat()
+
+    for key, current in tables.items():
+        written = state.written.get(key, {})
+        changed, removed = diff_rows(written, current)
+        if not changed and not removed:
+            continue
+
+        table, on_conflict = RANKING_TABLES[key.split(":", 1)[0]]
+        try:
+            if changed:
+                client.table(table).upsert(
+                    [{**row, "updated_at": now} for row in changed], on_conflict=on_conflict
+                ).execute()
+            if removed:
+                query = client.table(table).delete().in_("rank", removed)
+                if key.startswith("season:"):
+                    query = query.eq("season_id", int(key.split(":", 1)[1]))
+                query.execute()
+        except Exception as e:
+            result["errors"].append(f"{key}: {e}")
+            continue
+
+        state.written[key] = current
+        result["upserted"] += len(changed)
+        result["deleted"] += len(removed)
+        if DEBUG:
+            print(f"[RANK] {key}: {len(changed)} changed, {len(removed)} removed")
+
+    return result
+
+
+def refresh_rankings(
+    client: "Client",
+    state: Optional[RankingState] = None,
+    state_path: Path = RANKINGS_STATE_PATH,
+    k: int = RANKINGS_TOP_K,
+    dry_run: bool = False,
+) -> dict:
+    """
+    랭킹 갱신 1회
+
+    Args:
+        state: 장기 실행 모드에서 메모리에 유지하는 상태 (없으면 파일에서 로드)
+        dry_run: DB에 쓰지 않고 바뀔 행 수만 계산
+
+    Returns:
+        {"new_donations": 3, "high_water_mark": 1234, "upserted": 2, "deleted": 0, "errors": []}
+    """
+    if state is None:
+        state = load_state(state_path)
+    if not state.written and not state.boards:
+        seed_written(client, state)
+
+    # id 순서로 읽으므로 중간에 실패해도 상태는 마지막으로 처리한 id까지 일관됨
+    new_donations = 0
+    for donation in fetch_new_donations(client, state.high_water_mark):
+        state.apply(donation, k)
+        new_donations += 1
+
+    tables = build_rows(state, k)
+    if dry_run:
+        pending = [diff_rows(state.written.get(key, {}), rows) for key, rows in tables.items()]
+        result = {
+            "upserted": sum(len(changed) for changed, _ in pending),
+            "deleted": sum(len(removed) for _, removed in pending),
+            "errors": [],
+        }
+    else:
+        result = write_changes(client, state, tables)
+        save_state(state, state_path)
+
+    result["new_donations"] = new_donations
+    result["high_water_mark"] = state.high_water_mark
+    return result
+
+
+def print_unit_leaders(state: RankingState, k: int = RANKINGS_TOP_K, limit: int = 3) -> None:
+    """팬클럽별 상위 후원자 출력 (unit 랭킹은 별도 테이블 없이 로그로만)"""
+    for scope in sorted(s for s in state.boards if s.startswith("unit:")):
+        leaders = state.board(scope, k).ranking()[:limit]
+        names = ", ".join(f"{rank}. {donor}" for rank, donor, _ in leaders)
+        print(f"  [{scope}] {names}")
@@ -0,0 +1,231 @@
+"""
+Token Bucket Rate Limiter
+
+엔드포인트별 토큰 버킷을 스레드, asyncio 태스크, 프로세스가 함께 씁니다.
+버킷 상태는 .state/ratelimit/<이름>.json에 있고 fcntl 파일 잠금으로 갱신하므로
+워커(--schedule), --list/--test, 크롤러(scripts/crawler)를 동시에 띄워도
+PandaTV로 나가는 요청 합계가 예산을 넘지 않습니다.
+
+    acquire()         토큰 1개를 얻을 때까지 대기 (블로킹)
+    acquire_async()   같은 동작을 asyncio.sleep으로 대기
+    throttled()       429/503 또는 result: false 응답 → 지수 백오프 (모든 프로세스에 적용)
+    succeeded()       정상 응답 → 백오프 단계 초기화
+
+fcntl이 없는 환경(Windows)에서는 프로세스 안에서만 공유됩니다.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from config import STATE_DIR, RATE_LIMITS, RATE_LIMIT_MAX_BACKOFF_SECONDS, DEBUG
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+RATE_LIMIT_DIR = STATE_DIR / "ratelimit"
+BASE_BACKOFF_SECONDS = 2.0
+
+
+def parse_limits(spec: str) -> dict[str, tuple[float, float]]:
+    """
+    "pandatv_live=2:5,pandatv_channel=1" -> {"pandatv_live": (초당 2회, 버스트 5), "pandatv_channel": (1, 1)}
+
+    버스트를 생략하면 max(1, 초당 횟수)
+    """
+    limits = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        name, _, budget = item.partition("=")
+        rate, _, burst = budget.partition(":")
+        limits[name.strip()] = (float(rate), float(burst) if burst else max(1.0, float(rate)))
+    return limits
+
+
+class RateLimiter:
+    """
+    공유 토큰 버킷
+
+    시간 기준은 프로세스 간에 비교할 수 있도록 time.time()을 씁니다.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float, state_dir: Optional[Path] = RATE_LIMIT_DIR):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.path = Path(state_dir) / f"{name}.json" if state_dir and FCNTL_AVAILABLE else None
+        self._lock = threading.Lock()
+        self._local = {"tokens": burst, "updated": time.time(), "backoff_until": 0.0, "strikes": 0}
+
+    def _update(self, change) -> float:
+        """
+        잠금 상태에서 버킷을 읽어 change(state, now)를 적용하고 저장
+
+        Returns:
+            change의 반환값 (대기할 초)
+        """
+        with self._lock:
+            if self.path is None:
+                return change(self._local, time.time())
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                raw = os.read(fd, 4096)
+                try:
+                    state = {**self._local, **json.loads(raw)} if raw else dict(self._local)
+                except ValueError:
+                    state = dict(self._local)
+                result = change(state, time.time())
+                data = json.dumps(state).encode()
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.write(fd, data)
+                os.ftruncate(fd, len(data))
+                return result
+            finally:
+                os.close(fd)  # 닫으면 잠금도 해제
+
+    def _take(self, state: dict, now: float) -> float:
+        if now < state["backoff_until"]:
+            return state["backoff_until"] - now
+        if self.rate <= 0:
+            return 0.0  # 예산 없음 - 백오프만 적용
+        elapsed = max(0.0, now - state["updated"])
+        state["tokens"] = min(self.burst, state["tokens"] + elapsed * self.rate)
+        state["updated"] = now
+        if state["tokens"] >= 1:
+            state["tokens"] -= 1
+            return 0.0
+        return (1 - state["tokens"]) / self.rate
+
+    def try_acquire(self) -> float:
+        """토큰을 얻으면 0, 아니면 다시 시도할 때까지 기다릴 초"""
+        return self._update(self._take)
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        토큰 1개 획득 (대기)
+
+        Returns:
+            timeout 안에 얻었으면 True
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """토큰 1개 획득 (이벤트 루프를 막지 않음)"""
+        import asyncio  # 동기 호출 경로의 시작 시간에 포함되지 않도록
+
+        while True:
+            wait = await asyncio.to_thread(self.try_acquire) if self.path else self.try_acquire()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def throttled(self, retry_after: Optional[float] = None) -> float:
+        """
+        스로틀링 응답 기록 → 백오프 (Retry-After가 있으면 그 값 이상)
+
+        Returns:
+            적용된 백오프 초
+        """
+        def backoff(state: dict, now: float) -> float:
+            state["strikes"] = min(state["strikes"] + 1, 16)
+            delay = min(BASE_BACKOFF_SECONDS * 2 ** (state["strikes"] - 1), RATE_LIMIT_MAX_BACKOFF_SECONDS)
+            if retry_after:
+                delay = max(delay, min(retry_after, RATE_LIMIT_MAX_BACKOFF_SECONDS))
+            state["backoff_until"] = max(state["backoff_until"], now + delay)
+            state["tokens"] = 0.0
+            state["updated"] = now
+            return delay
+
+        delay = self._update(backoff)
+        print(f"[RATE] {self.name}: throttled, backing off {delay:g}s")
+        return delay
+
+    def succeeded(self) -> None:
+        def reset(state: dict, now: float) -> float:
+            state["strikes"] = 0
+            return 0.0
+
+        self._update(reset)
+
+
+class DisabledRateLimiter(RateLimiter):
+    """
+    제한 없는 리미터 (disable() 이후)
+
+    토큰 대기도, 스로틀링 응답에 대한 백오프도 하지 않습니다.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name, 0.0, 1.0, state_dir=None)
+
+    def try_acquire(self) -> float:
+        return 0.0
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        return True
+
+    async def acquire_async(self) -> None:
+        return None
+
+    def throttled(self, retry_after: Optional[float] = None) -> float:
+        return 0.0
+
+    def succeeded(self) -> None:
+        return None
+
+
+def retry_after_seconds(headers) -> Optional[float]:
+    """Retry-After 헤더(초 단위)만 해석"""
+    value = headers.get("Retry-After") if headers else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+THROTTLE_STATUS_CODES = (429, 503)
+
+_limiters: dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter(endpoint: str, rate: Optional[float] = None, burst: Optional[float] = None) -> RateLimiter:
+    """
+    엔드포인트 이름으로 공유 리미터 조회 (RATE_LIMITS 예산, 없으면 주어진 값)
+
+    같은 프로세스에서는 같은 객체를 반환합니다.
+    """
+    with _limiters_lock:
+        if endpoint not in _limiters:
+            budget = parse_limits(RATE_LIMITS).get(endpoint)
+            if budget is None:
+                budget = (rate or 0.0, burst or max(1.0, rate or 0.0))
+            _limiters[endpoint] = RateLimiter(endpoint, *budget)
+            if DEBUG:
+                print(f"[RATE] {endpoint}: {budget[0]:g}/s, burst {budget[1]:g}")
+        return _limiters[endpoint]
+
+
+def disable(endpoint: str) -> None:
+    """이 프로세스에서 엔드포인트 제한 해제 (카세트 재생 등 실제 요청이 없는 경우)"""
+    with _limiters_lock:
+        _limiters[endpoint] = DisabledRateLimiter(endpoint)
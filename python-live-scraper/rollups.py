@@ -0,0 +1,202 @@
+"""
+Live Rollups
+
+홈페이지용 조직 전체 집계 (방송 중 멤버 수, 총 시청자 수, 최다 시청 멤버, 유닛별 현황)를
+틱마다 바뀐 LiveStatus만으로 갱신합니다.
+
+- 히스테리시스가 UNCHANGED/HELD로 표시한 계정과 미확인 계정은 건너뜀 → 집계 비용은 바뀐 계정 수에 비례
+- 멤버별 기여분(라이브 여부, 시청자 합계, 유닛)을 기억해 두고 바뀐 멤버만 빼고 다시 더함
+- 최다 시청 멤버는 최대 힙 + 지연 삭제 (rankings.Leaderboard와 같은 방식)
+- 결과가 바뀐 틱에만 live_summary 한 행 upsert (+ 선택적으로 JSON 파일)
+"""
+import heapq
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from config import ROLLUP_TABLE, ROLLUP_ARTIFACT_PATH, DEBUG
+from scraper import LiveStatus
+
+UNITS = ("excel", "crew")
+
+
+class LiveRollup:
+    """
+    조직 전체 라이브 집계
+
+    Example:
+        rollup = LiveRollup()
+        summary = rollup.apply(members, statuses)   # 틱마다, 히스테리시스 이후 상태
+    """
+
+    def __init__(self):
+        # member_id -> {platform: (is_live, viewer_count)}
+        self.accounts: dict[int, dict[str, tuple[bool, int]]] = {}
+        # member_id -> (is_live, viewers, unit)
+        self.contrib: dict[int, tuple[bool, int, Optional[str]]] = {}
+        self.names: dict[int, Optional[str]] = {}
+        self.live_count = 0
+        self.total_viewers = 0
+        self.units: dict[str, dict[str, int]] = {unit: {"live": 0, "viewers": 0} for unit in UNITS}
+        # 최다 시청: (-viewers, member_id) 힙, 멤버의 현재 값과 다르면 낡은 항목
+        self._heap: list[tuple[int, int]] = []
+        self._written: Optional[dict] = None
+        self._lock = threading.Lock()
+
+    def _unit(self, unit: Optional[str]) -> dict[str, int]:
+        return self.units.setdefault(unit or "unknown", {"live": 0, "viewers": 0})
+
+    def _set_member(self, member_id: int, is_live: bool, viewers: int, unit: Optional[str]) -> None:
+        """멤버 기여분 교체 (이전 값 빼고 새 값 더함)"""
+        old = self.contrib.get(member_id)
+        if old == (is_live, viewers, unit):
+            return
+        if old is not None and old[0]:
+            self.live_count -= 1
+            self.total_viewers -= old[1]
+            bucket = self._unit(old[2])
+            bucket["live"] -= 1
+            bucket["viewers"] -= old[1]
+
+        if is_live:
+            self.live_count += 1
+            self.total_viewers += viewers
+            bucket = self._unit(unit)
+            bucket["live"] += 1
+            bucket["viewers"] += viewers
+            heapq.heappush(self._heap, (-viewers, member_id))
+        self.contrib[member_id] = (is_live, viewers, unit)
+
+        # 시청자 수가 바뀔 때마다 쌓이는 낡은 항목 정리 (장기 실행 시 힙이 계속 자라지 않도록)
+        if len(self._heap) > 4 * self.live_count + 64:
+            self._heap = [(-c[1], m) for m, c in self.contrib.items() if c[0]]
+            heapq.heapify(self._heap)
+
+    def _refresh_member(self, member: dict) -> None:
+        """멤버의 플랫폼 중 하나라도 라이브면 라이브, 시청자는 라이브 플랫폼 합계"""
+        live = [viewers for is_live, viewers in self.accounts[member["id"]].values() if is_live]
+        self._set_member(member["id"], bool(live), sum(live), member.get("unit"))
+
+    def apply(self, members: list[dict], statuses: list[LiveStatus], complete: bool = True) -> dict:
+        """
+        바뀐 상태만 반영
+
+        Args:
+            members: get_platform_members() 결과 (계정 -> 멤버 조회용)
+            statuses: 히스테리시스를 거친 상태 (error가 있으면 변화 없음으로 간주)
+            complete: members가 전체 목록이면 True (빠진 멤버 제거), 푸시 이벤트처럼 일부면 False
+
+        Returns:
+            현재 요약
+        """
+        changed_members: dict[int, dict] = {}
+        member_of = None
+
+        for status in statuses:
+            if status.error:
+                continue
+            if member_of is None:
+                member_of = {(m.get("platform", "pandatv"), m["user_id"]): m for m in members}
+            member = member_of.get((status.platform, status.user_id))
+            if member is None:
+                continue
+            value = (status.is_live, (status.viewer_count or 0) if status.is_live else 0)
+            accounts = self.accounts.setdefault(member["id"], {})
+            if accounts.get(status.platform) == value:
+                continue
+            accounts[status.platform] = value
+            self.names[member["id"]] = member.get("name")
+            changed_members[member["id"]] = member
+
+        for member in changed_members.values():
+            self._refresh_member(member)
+
+        # 멤버 목록을 펼친 틱에서만 비활성화된 멤버 확인
+        if complete and member_of is not None:
+            gone = set(self.contrib) - {m["id"] for m in member_of.values()}
+            if gone:
+                self.forget(gone)
+
+        if DEBUG and changed_members:
+            print(f"[ROLLUP] {len(changed_members)} member(s) changed")
+        return self.summary()
+
+    def forget(self, member_ids: set[int]) -> None:
+        """비활성화된 멤버 제거"""
+        for member_id in member_ids:
+            self.accounts.pop(member_id, None)
+            self._set_member(member_id, False, 0, None)
+            self.contrib.pop(member_id, None)
+            self.names.pop(member_id, None)
+
+    def top(self) -> Optional[tuple[int, int]]:
+        """(member_id, viewers) - 라이브 멤버 중 시청자 최다 (같으면 member_id 작은 쪽)"""
+        while self._heap:
+            neg_viewers, member_id = self._heap[0]
+            current = self.contrib.get(member_id)
+            if current and current[0] and current[1] == -neg_viewers:
+                return member_id, -neg_viewers
+            heapq.heappop(self._heap)  # 낡은 항목
+        return None
+
+    def summary(self) -> dict:
+        top = self.top()
+        return {
+            "live_count": self.live_count,
+            "total_viewers": self.total_viewers,
+            "top_member_id": top[0] if top else None,
+            "top_member_name": self.names.get(top[0]) if top else None,
+            "top_viewer_count": top[1] if top else 0,
+            "units": {unit: dict(counts) for unit, counts in self.units.items()},
+        }
+
+    def update(self, client, members: list[dict], statuses: list[LiveStatus], complete: bool = True) -> Optional[dict]:
+        """
+        반영 + 바뀌었으면 쓰기 (틱 스레드와 푸시 수신 스레드에서 호출)
+
+        쓰기 실패는 로그만 남기고 다음 변경 때 다시 씁니다.
+
+        Returns:
+            썼으면 요약, 아니면 None
+        """
+        with self._lock:
+            summary = self.apply(members, statuses, complete)
+            try:
+                return summary if self.write(client, summary) else None
+            except Exception as e:
+                print(f"[ROLLUP] Failed to write summary: {e}")
+                return None
+
+    def write(self, client, summary: dict) -> bool:
+        """
+        요약이 바뀐 경우에만 live_summary 한 행 upsert (+ JSON 파일)
+
+        Returns:
+            썼으면 True
+        """
+        if summary == self._written:
+            return False
+
+        row = {key: value for key, value in summary.items() if key != "top_member_name"}
+        row["id"] = 1
+        row["updated_at"] = datetime.now(timezone.utc).isoformat()
+
+        if ROLLUP_TABLE and client is not None:
+            client.table(ROLLUP_TABLE).upsert(row, on_conflict="id").execute()
+        if ROLLUP_ARTIFACT_PATH:
+            write_artifact(Path(ROLLUP_ARTIFACT_PATH), {**summary, "updated_at": row["updated_at"]})
+
+        self._written = summary
+        return True
+
+
+def write_artifact(path: Path, data: dict) -> None:
+    """임시 파일에 쓴 뒤 교체 (읽는 쪽이 쓰다 만 파일을 보지 않도록)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
@@ -5,10 +5,12 @@ PandaTV 내부 API를 사용하여 라이브 상태를 확인합니다.
 Playwright 없이 간단한 HTTP 요청으로 동작합니다.
 """
 import httpx
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
-from config import DEBUG
+from circuit import CircuitBreaker
+from config import DEBUG, PANDATV_BREAKER_FAILURES, PANDATV_BREAKER_RESET_SECONDS
+from ratelimit import THROTTLE_STATUS_CODES, limiter, retry_after_seconds
 
 PANDATV_API_URL = "https://api.pandalive.co.kr/v1/live"
 
@@ -23,58 +25,135 @@ class LiveStatus:
     thumbnail_url: Optional[str] = None
     title: Optional[str] = None
     error: Optional[str] = None
+    platform: str = "pandatv"
+    stream_url: Optional[str] = None
 
 
-def get_all_live_streams() -> list[dict]:
+@dataclass
+class LiveStreamsResult:
     """
-    현재 라이브 중인 모든 BJ 목록 조회 (페이지네이션 처리)
+    라이브 목록 조회 결과
 
-    Returns:
-        라이브 중인 BJ 정보 리스트
+    complete가 False면 일부 페이지를 가져오지 못한 것이므로,
+    목록에 없는 유저를 오프라인으로 단정할 수 없습니다.
     """
-    all_streams = []
-    offset = 0
-    limit = 100  # 한 번에 가져올 최대 개수
-
-    try:
-        while True:
-            response = httpx.get(
-                PANDATV_API_URL,
-                params={"offset": offset, "limit": limit},
-                headers={"User-Agent": "Mozilla/5.0"},
-                timeout=30.0
-            )
-            response.raise_for_status()
+    streams: list[dict] = field(default_factory=list)
+    complete: bool = True
+    pages_fetched: int = 0
+    failed_pages: list[int] = field(default_factory=list)  # 실패한 페이지 offset
+    error: Optional[str] = None
 
-            data = response.json()
 
-            if not data.get("result"):
-                if DEBUG:
-                    print(f"[API] Request failed: {data.get('message', 'Unknown error')}")
-                break
+# 미확인 상태 표시 - batch_update_live_status는 이 상태를 쓰지 않고 이전 상태를 유지
+UNCONFIRMED_ERROR = "unconfirmed (tick incomplete)"
+# 상태 머신(hysteresis.py)이 쓰기에서 제외한 상태 - 오프라인 전이 보류 / 변화 없음
+HELD_ERROR = "held (offline not yet confirmed)"
+UNCHANGED_ERROR = "unchanged"
 
-            live_list = data.get("list", [])
+PAGE_LIMIT = 100  # 한 번에 가져올 최대 개수
+PAGE_ATTEMPTS = 2  # 페이지별 시도 횟수
 
-            if not live_list:
-                break
+pandatv_breaker = CircuitBreaker(
+    "pandatv",
+    failure_threshold=PANDATV_BREAKER_FAILURES,
+    reset_timeout=PANDATV_BREAKER_RESET_SECONDS,
+)
 
-            all_streams.extend(live_list)
 
-            # 가져온 개수가 limit보다 적으면 마지막 페이지
-            if len(live_list) < limit:
+def fetch_live_page(http, offset: int) -> list[dict]:
+    """
+    라이브 목록 한 페이지 조회 (실패 시 예외)
+
+    pandatv_live 속도 제한을 다른 프로세스와 공유하고,
+    429/503 또는 result: false 응답이면 모두 함께 백오프합니다.
+    """
+    budget = limiter("pandatv_live")
+    budget.acquire()
+    response = http.get(
+        PANDATV_API_URL,
+        params={"offset": offset, "limit": PAGE_LIMIT},
+        headers={"User-Agent": "Mozilla/5.0"},
+        timeout=30.0
+    )
+    if response.status_code in THROTTLE_STATUS_CODES:
+        budget.throttled(retry_after_seconds(response.headers))
+    response.raise_for_status()
+
+    data = response.json()
+    if not data.get("result"):
+        budget.throttled()
+        raise ValueError(f"API result false: {data.get('message', 'Unknown error')}")
+
+    budget.succeeded()
+    return data.get("list", [])
+
+
+def fetch_live_streams(client: Optional[httpx.Client] = None) -> LiveStreamsResult:
+    """
+    현재 라이브 중인 모든 BJ 목록 조회 (페이지별 실패 추적)
+
+    - 페이지마다 PAGE_ATTEMPTS회까지 시도하고, 그래도 실패하면 중단 후 incomplete 반환
+    - 연속 실패 시 회로 차단기가 열려 reset 시간 동안 호출하지 않음
+
+    Args:
+        client: 재사용할 httpx.Client (없으면 요청마다 새 연결)
+    """
+    result = LiveStreamsResult()
+    http = client or httpx
+
+    if not pandatv_breaker.allow():
+        result.complete = False
+        result.error = "circuit open"
+        return result
+
+    offset = 0
+    while True:
+        live_list = None
+        for attempt in range(PAGE_ATTEMPTS):
+            try:
+                live_list = fetch_live_page(http, offset)
                 break
+            except (httpx.HTTPError, ValueError) as e:
+                result.error = str(e)
+                if DEBUG:
+                    print(f"[API] Page offset={offset} attempt {attempt + 1}/{PAGE_ATTEMPTS} failed: {e}")
+
+        if live_list is None:
+            pandatv_breaker.record_failure()
+            result.complete = False
+            result.failed_pages.append(offset)
+            print(f"[API] Live list incomplete: page offset={offset} failed ({result.error})")
+            return result
+
+        result.pages_fetched += 1
+        result.streams.extend(live_list)
+
+        # 가져온 개수가 limit보다 적으면 마지막 페이지
+        if len(live_list) < PAGE_LIMIT:
+            break
 
-            offset += limit
+        offset += PAGE_LIMIT
 
-        if DEBUG:
-            print(f"[API] Found {len(all_streams)} live streams")
+    pandatv_breaker.record_success()
+    result.error = None
 
-        return all_streams
+    if DEBUG:
+        print(f"[API] Found {len(result.streams)} live streams ({result.pages_fetched} page(s))")
 
-    except Exception as e:
-        if DEBUG:
-            print(f"[API] Error: {e}")
-        return all_streams
+    return result
+
+
+def get_all_live_streams(client: Optional[httpx.Client] = None) -> list[dict]:
+    """
+    현재 라이브 중인 모든 BJ 목록 조회 (페이지네이션 처리)
+
+    일부 페이지가 실패해도 가져온 만큼 반환합니다.
+    완전성 여부가 필요하면 fetch_live_streams()를 사용하세요.
+
+    Returns:
+        라이브 중인 BJ 정보 리스트
+    """
+    return fetch_live_streams(client).streams
 
 
 def check_user_live_status(user_id: str) -> LiveStatus:
@@ -87,10 +166,10 @@ def check_user_live_status(user_id: str) -> LiveStatus:
     Returns:
         LiveStatus 객체
     """
-    live_streams = get_all_live_streams()
+    fetched = fetch_live_streams()
 
     # 라이브 목록에서 해당 유저 찾기
-    for stream in live_streams:
+    for stream in fetched.streams:
         if stream.get("userId") == user_id:
             return LiveStatus(
                 user_id=user_id,
@@ -101,29 +180,35 @@ def check_user_live_status(user_id: str) -> LiveStatus:
                 title=stream.get("title")
             )
 
-    # 라이브 목록에 없으면 오프라인
+    # 라이브 목록에 없으면 오프라인 (목록이 불완전하면 미확인)
     return LiveStatus(
         user_id=user_id,
-        is_live=False
+        is_live=False,
+        error=None if fetched.complete else UNCONFIRMED_ERROR
     )
 
 
-def check_multiple_users(user_ids: list[str]) -> list[LiveStatus]:
+def check_multiple_users(
+    user_ids: list[str],
+    client: Optional[httpx.Client] = None
+) -> list[LiveStatus]:
     """
     여러 유저의 라이브 상태를 한 번에 확인
 
     API 호출 1회로 모든 유저 상태 확인 가능
+    목록 조회가 불완전하면 목록에 없는 유저는 오프라인이 아닌 미확인(UNCONFIRMED_ERROR)으로 반환
 
     Args:
         user_ids: PandaTV 유저 ID 목록
+        client: 재사용할 httpx.Client
 
     Returns:
         LiveStatus 리스트
     """
-    live_streams = get_all_live_streams()
+    fetched = fetch_live_streams(client)
 
     # userId -> stream 맵 생성
-    live_map = {stream.get("userId"): stream for stream in live_streams}
+    live_map = {stream.get("userId"): stream for stream in fetched.streams}
 
     results = []
     for user_id in user_ids:
@@ -141,7 +226,8 @@ def check_multiple_users(user_ids: list[str]) -> list[LiveStatus]:
         else:
             results.append(LiveStatus(
                 user_id=user_id,
-                is_live=False
+                is_live=False,
+                error=None if fetched.complete else UNCONFIRMED_ERROR
             ))
 
     return results
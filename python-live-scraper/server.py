@@ -0,0 +1,180 @@
+"""
+Worker HTTP Server
+
+스케줄러 프로세스 안에서 동작하는 작은 HTTP 서버 (표준 라이브러리만 사용)
+라우트는 (메서드, 정규식 경로) -> 핸들러 함수로 등록합니다.
+Response.stream이 있으면 본문을 청크 단위로 보내고 연결을 닫습니다 (SSE 등).
+"""
+import json
+import re
+import threading
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterator, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from config import DEBUG
+
+
+@dataclass
+class Request:
+    """핸들러에 전달되는 요청"""
+    method: str
+    path: str
+    query: dict[str, list[str]]
+    headers: dict[str, str]
+    body: bytes
+    params: dict[str, str] = field(default_factory=dict)
+
+    def header(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self.headers.get(name.lower(), default)
+
+    def json(self):
+        return json.loads(self.body.decode("utf-8")) if self.body else None
+
+
+@dataclass
+class Response:
+    """핸들러 반환값"""
+    status: int = 200
+    body: bytes = b""
+    headers: dict[str, str] = field(default_factory=dict)
+    stream: Optional[Iterator[bytes]] = None  # 주어지면 body 대신 끝날 때까지 전송
+
+    @classmethod
+    def json(cls, data, status: int = 200, headers: Optional[dict[str, str]] = None) -> "Response":
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        return cls(
+            status=status,
+            body=body,
+            headers={"Content-Type": "application/json; charset=utf-8", **(headers or {})},
+        )
+
+
+Handler = Callable[[Request], Response]
+
+
+class WorkerHTTPServer:
+    """
+    라우트 기반 HTTP 서버
+
+    Example:
+        server = WorkerHTTPServer("0.0.0.0", 8080)
+        server.route("GET", r"/health", lambda req: Response.json({"ok": True}))
+        server.start()
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.routes: list[tuple[str, re.Pattern, Handler]] = []
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def route(self, method: str, pattern: str, handler: Handler) -> None:
+        """라우트 등록 (pattern의 named group은 Request.params로 전달)"""
+        self.routes.append((method.upper(), re.compile(f"^{pattern}$"), handler))
+
+    def dispatch(self, request: Request) -> Response:
+        path_matched = False
+        for method, pattern, handler in self.routes:
+            match = pattern.match(request.path)
+            if not match:
+                continue
+            path_matched = True
+            if method != request.method and not (method == "GET" and request.method == "HEAD"):
+                continue
+            request.params = match.groupdict()
+            return handler(request)
+
+        if path_matched:
+            return Response.json({"error": "Method not allowed"}, status=405)
+        return Response.json({"error": "Not found"}, status=404)
+
+    def _make_handler_class(self):
+        server = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _handle(self):
+                url = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                request = Request(
+                    method=self.command,
+                    path=url.path,
+                    query=parse_qs(url.query),
+                    headers={k.lower(): v for k, v in self.headers.items()},
+                    body=self.rfile.read(length) if length else b"",
+                )
+
+                try:
+                    response = server.dispatch(request)
+                except Exception as e:
+                    print(f"[HTTP] Handler error on {request.method} {request.path}: {e}")
+                    response = Response.json({"error": "Internal error"}, status=500)
+
+                if response.stream is not None:
+                    self._send_stream(response)
+                    return
+
+                self.send_response(response.status)
+                for name, value in response.headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(response.body)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(response.body)
+
+            def _send_stream(self, response: Response):
+                """길이를 모르는 본문: 연결 종료로 끝을 표시"""
+                self.close_connection = True
+                self.send_response(response.status)
+                for name, value in response.headers.items():
+                    self.send_header(name, value)
+                self.send_header("Connection", "close")
+                self.end_headers()
+                try:
+                    if self.command == "HEAD":
+                        return
+                    for chunk in response.stream:
+                        self.wfile.write(chunk)
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # 클라이언트가 연결을 끊음
+                finally:
+                    close = getattr(response.stream, "close", None)
+                    if close:
+                        close()
+
+            do_GET = _handle
+            do_HEAD = _handle
+            do_POST = _handle
+
+            def log_message(self, format, *args):
+                if DEBUG:
+                    print(f"[HTTP] {self.address_string()} {format % args}")
+
+        return RequestHandler
+
+    def start(self) -> None:
+        """백그라운드 스레드에서 서버 시작"""
+        if self._httpd is not None:
+            return
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), self._make_handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever,
+            name="worker-http",
+            daemon=True,
+        )
+        self._thread.start()
+        print(f"[HTTP] Listening on {self.host}:{self.port}")
+
+    def stop(self) -> None:
+        if self._httpd is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._httpd = None
@@ -0,0 +1,223 @@
+"""
+Live Snapshot Read API
+
+워커가 메모리에 가진 현재 라이브 상태를 HTTP로 제공합니다.
+사이트가 live_status/organization을 매 페이지뷰마다 조회하는 대신 이 엔드포인트를 읽으면
+읽기 트래픽이 DB에 닿지 않습니다.
+
+    GET /live               전체 멤버 (member_id 순)
+    GET /live/<member_id>   멤버 한 명
+
+응답 JSON은 틱마다 한 번 미리 만들어 두고(요청마다 직렬화하지 않음),
+내용이 바뀌지 않은 틱에서는 같은 본문과 ETag를 유지하므로
+If-None-Match 요청은 다음 변화 전까지 304로 끝납니다.
+
+내용이 바뀔 때마다 version이 1 증가하고, 바뀐 멤버만 리스너(broadcast.py)에 전달됩니다.
+응답의 X-Snapshot-Version(<epoch>:<version>)으로 diff 메시지와 맞춰 볼 수 있습니다.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from config import LIVE_API_MAX_AGE_SECONDS, LIVE_API_CORS_ORIGIN, SCRAPE_INTERVAL_SECONDS, DEBUG
+from scraper import LiveStatus, UNCHANGED_ERROR
+from server import Request, Response, WorkerHTTPServer
+
+ALL_VIEW = "all"
+
+
+@dataclass(frozen=True)
+class SnapshotView:
+    """미리 직렬화한 응답 본문"""
+    body: bytes
+    etag: str
+    updated_at: str  # 내용이 마지막으로 바뀐 시각
+    version: int = 0  # 전체 응답에만 기록 (이 본문을 만든 스냅샷 version)
+
+
+def account_entry(status: LiveStatus, user_id: str) -> dict:
+    """live_status 행과 같은 필드 (last_checked는 스냅샷 단위로 제공)"""
+    return {
+        "platform": status.platform,
+        "user_id": user_id,
+        "is_live": status.is_live,
+        "viewer_count": (status.viewer_count or 0) if status.is_live else 0,
+        "thumbnail_url": status.thumbnail_url if status.is_live else None,
+        "title": status.title if status.is_live else None,
+        "stream_url": status.stream_url or (
+            f"https://www.pandalive.co.kr/play/{user_id}" if status.platform == "pandatv" else None
+        ),
+    }
+
+
+class LiveSnapshot:
+    """
+    멤버별 현재 라이브 상태 + 미리 만든 응답
+
+    update()는 틱 스레드와 푸시 수신 스레드에서 호출되고,
+    HTTP 핸들러는 views 딕셔너리 참조만 읽습니다 (갱신 시 통째로 교체).
+    """
+
+    def __init__(self, max_age: int = LIVE_API_MAX_AGE_SECONDS):
+        self.max_age = max_age
+        self.members: dict[int, dict] = {}
+        self.accounts: dict[tuple[str, str], dict] = {}
+        self.views: dict[str, SnapshotView] = {}
+        self.checked_at: Optional[str] = None
+        # 프로세스마다 다른 epoch - 재시작으로 version이 0부터 다시 시작한 것을 구분
+        self.epoch = os.urandom(4).hex()
+        self.version = 0
+        # listener(version, 바뀐 멤버 payload 목록, 제거된 member_id 목록, live_count) - 잠금 안에서 순서대로 호출
+        self.listeners: list[Callable[[int, list[dict], list[int], int], None]] = []
+        self._lock = threading.Lock()
+
+    def update(self, members: list[dict], statuses: list[LiveStatus], complete: bool = True) -> int:
+        """
+        상태 반영 후 바뀐 응답만 다시 직렬화
+
+        Args:
+            members: get_platform_members() 결과
+            statuses: 히스테리시스를 거친 상태 목록. 보류(HELD)/미확인 상태는
+                마지막으로 알려진 값을 유지하고, 처음 보는 계정은 DB의 is_live로 시작
+            complete: members가 전체 목록이면 True (목록에서 빠진 계정 제거),
+                푸시 이벤트처럼 일부만 들어오면 False
+
+        Returns:
+            다시 만든 응답 수
+        """
+        status_map = {(s.platform, s.user_id): s for s in statuses}
+        started = time.perf_counter()
+
+        with self._lock:
+            if complete:
+                keys = {(m.get("platform", "pandatv"), m["user_id"]) for m in members}
+                for key in set(self.accounts) - keys:
+                    del self.accounts[key]
+                self.members = {}
+
+            for member in members:
+                key = (member.get("platform", "pandatv"), member["user_id"])
+                self.members.setdefault(member["id"], {
+                    "name": member.get("name"),
+                    "unit": member.get("unit"),
+                })
+                status = status_map.get(key)
+                if status is not None and (not status.error or status.error == UNCHANGED_ERROR):
+                    self.accounts[key] = {"member_id": member["id"], **account_entry(status, member["user_id"])}
+                elif key not in self.accounts:
+                    seed = LiveStatus(user_id=member["user_id"], is_live=bool(member.get("is_live")), platform=key[0])
+                    self.accounts[key] = {"member_id": member["id"], **account_entry(seed, member["user_id"])}
+
+            return self._rebuild_views(started)
+
+    def _member_payload(self, member_id: int, accounts: list[dict]) -> dict:
+        info = self.members[member_id]
+        live = [a for a in accounts if a["is_live"]]
+        return {
+            "member_id": member_id,
+            "name": info["name"],
+            "unit": info["unit"],
+            "is_live": bool(live),
+            "viewer_count": sum(a["viewer_count"] for a in live),
+            "platforms": [{k: v for k, v in a.items() if k != "member_id"} for a in accounts],
+        }
+
+    def _rebuild_views(self, started: float) -> int:
+        self.checked_at = datetime.now(timezone.utc).isoformat()
+        by_member: dict[int, list[dict]] = {member_id: [] for member_id in self.members}
+        for key in sorted(self.accounts):
+            account = self.accounts[key]
+            by_member.setdefault(account["member_id"], []).append(account)
+
+        old = self.views
+        views: dict[str, SnapshotView] = {}
+        payloads = []
+        for member_id in sorted(by_member):
+            if member_id not in self.members:
+                continue
+            payload = self._member_payload(member_id, by_member[member_id])
+            payloads.append(payload)
+            views[str(member_id)] = self._view(old.get(str(member_id)), payload)
+
+        live_count = sum(1 for p in payloads if p["is_live"])
+        all_view = self._view(old.get(ALL_VIEW), {"live_count": live_count, "members": payloads})
+        changed_any = all_view is not old.get(ALL_VIEW)
+        if changed_any:
+            self.version += 1
+            all_view = replace(all_view, version=self.version)
+        views[ALL_VIEW] = all_view
+
+        rebuilt = sum(1 for name, view in views.items() if old.get(name) is not view)
+        self.views = views
+
+        if old and changed_any and self.listeners:
+            # 처음 만든 스냅샷은 보내지 않음 (클라이언트는 /live로 시작)
+            changed = [p for p in payloads if old.get(str(p["member_id"])) is not views[str(p["member_id"])]]
+            removed = [int(name) for name in old if name != ALL_VIEW and name not in views]
+            for listener in self.listeners:
+                try:
+                    listener(self.version, changed, removed, live_count)
+                except Exception as e:
+                    print(f"[SNAPSHOT] Listener error: {e}")
+        if DEBUG:
+            print(f"[SNAPSHOT] {len(payloads)} member(s), {rebuilt} view(s) rebuilt in "
+                  f"{(time.perf_counter() - started) * 1000:.1f}ms")
+        return rebuilt
+
+    @staticmethod
+    def _view(previous: Optional[SnapshotView], payload: dict) -> SnapshotView:
+        """내용이 같으면 이전 응답 그대로 (ETag, updated_at 유지)"""
+        content = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        etag = '"' + hashlib.sha1(content.encode("utf-8")).hexdigest()[:20] + '"'
+        if previous is not None and previous.etag == etag:
+            return previous
+        updated_at = datetime.now(timezone.utc).isoformat()
+        body = json.dumps({"updated_at": updated_at, **payload}, ensure_ascii=False, separators=(",", ":"))
+        return SnapshotView(body=body.encode("utf-8"), etag=etag, updated_at=updated_at)
+
+    def respond(self, request: Request, name: str) -> Response:
+        """ETag/304 + 캐시 헤더를 붙인 응답"""
+        views = self.views
+        if not views:
+            return Response.json({"error": "Snapshot not ready"}, status=503, headers={"Retry-After": "5"})
+
+        view = views.get(name)
+        if view is None:
+            return Response.json({"error": "Not found"}, status=404)
+
+        headers = {
+            "ETag": view.etag,
+            "Cache-Control": f"public, max-age={self.max_age}, stale-while-revalidate={SCRAPE_INTERVAL_SECONDS}",
+            "X-Checked-At": self.checked_at or "",
+            "X-Snapshot-Version": f"{self.epoch}:{views[ALL_VIEW].version}",
+        }
+        if LIVE_API_CORS_ORIGIN:
+            headers["Access-Control-Allow-Origin"] = LIVE_API_CORS_ORIGIN
+
+        if etag_matches(request.header("if-none-match"), view.etag):
+            return Response(status=304, headers=headers)
+        return Response(
+            body=view.body,
+            headers={"Content-Type": "application/json; charset=utf-8", **headers},
+        )
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """If-None-Match 비교 (약한 비교, 목록과 * 허용)"""
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def register_live_routes(server: WorkerHTTPServer, snapshot: LiveSnapshot) -> None:
+    server.route("GET", r"/live", lambda request: snapshot.respond(request, ALL_VIEW))
+    server.route("GET", r"/live/(?P<member_id>\d+)", lambda request: snapshot.respond(request, request.params["member_id"]))
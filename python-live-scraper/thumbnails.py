@@ -0,0 +1,325 @@
+"""
+Thumbnail Proxy Cache
+
+플랫폼 썸네일(thumbUrl)을 워커가 직접 받아 리사이즈한 WebP로 저장하고,
+live_status.thumbnail_url에는 저장소 URL을 씁니다.
+
+- 썸네일은 THUMBNAIL_CONCURRENCY 개까지 동시에 받음
+- 원본 바이트의 sha256으로 내용이 바뀌었는지 판단
+  → 같은 이미지면 이전 URL을 그대로 써서 불필요한 행 변경이 생기지 않음
+- 파일명은 내용 해시 기반이므로 한 번 쓴 URL은 바뀌지 않음 (immutable 캐시 가능)
+- 로컬 캐시는 THUMBNAIL_CACHE_MAX_MB를 넘으면 가장 오래 쓰지 않은 파일부터 삭제 (LRU)
+- THUMBNAIL_BUCKET이 설정되면 Supabase Storage에도 업로드하고 공개 URL 사용,
+  아니면 워커 HTTP 서버의 /thumbnails를 THUMBNAIL_PUBLIC_BASE_URL(방문자가 닿는 주소)로 노출
+
+Pillow가 없으면 리사이즈/WebP 변환 없이 원본을 그대로 저장합니다.
+"""
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from config import (
+    THUMBNAIL_DIR,
+    THUMBNAIL_PUBLIC_BASE_URL,
+    THUMBNAIL_BUCKET,
+    THUMBNAIL_WIDTHS,
+    THUMBNAIL_QUALITY,
+    THUMBNAIL_CONCURRENCY,
+    THUMBNAIL_CACHE_MAX_MB,
+    DEBUG,
+)
+from scraper import LiveStatus
+from server import Request, Response, WorkerHTTPServer
+
+# Pillow (선택)
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+USER_AGENT = "Mozilla/5.0"
+THUMBNAIL_NAME_PATTERN = r"[0-9a-f]{16}_\d+\.(?:webp|jpg|png)"
+
+CONTENT_TYPES = {
+    ".webp": "image/webp",
+    ".jpg": "image/jpeg",
+    ".png": "image/png",
+}
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "0.0.0.0", "::1"}
+
+
+def is_public_base_url(url: str) -> bool:
+    """사이트 방문자가 접근할 수 있는 http(s) 주소인지 (비어 있거나 localhost면 False)"""
+    parts = urlsplit(url or "")
+    return parts.scheme in ("http", "https") and bool(parts.hostname) and parts.hostname not in LOCAL_HOSTS
+
+
+def render_variants(data: bytes, widths: tuple[int, ...]) -> dict[int, tuple[bytes, str]]:
+    """
+    원본 이미지 -> 폭별 변환 이미지
+
+    Returns:
+        {폭: (바이트, 확장자)}. Pillow가 없으면 원본 하나만 {0: (...)}로 반환
+    """
+    if not PIL_AVAILABLE:
+        ext = ".png" if data[:8] == b"\x89PNG\r\n\x1a\n" else ".jpg"
+        return {0: (data, ext)}
+
+    variants = {}
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert("RGB")
+        for width in widths:
+            resized = image
+            if image.width > width:
+                height = round(image.height * width / image.width)
+                resized = image.resize((width, height), Image.LANCZOS)
+            out = io.BytesIO()
+            resized.save(out, "WEBP", quality=THUMBNAIL_QUALITY, method=4)
+            variants[width] = (out.getvalue(), ".webp")
+    return variants
+
+
+class ThumbnailStore:
+    """
+    내용 해시 기반 썸네일 저장소 (로컬 LRU 캐시 + 선택적 Supabase Storage)
+
+    Args:
+        cache_dir: 로컬 캐시 디렉토리
+        max_bytes: 로컬 캐시 최대 크기
+        public_base_url: 로컬 캐시를 서빙하는 공개 URL (예: https://worker.example.com/thumbnails)
+        storage: Supabase 클라이언트의 storage (bucket과 함께 주어지면 업로드)
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = THUMBNAIL_DIR,
+        max_bytes: int = THUMBNAIL_CACHE_MAX_MB * 1024 * 1024,
+        public_base_url: str = THUMBNAIL_PUBLIC_BASE_URL,
+        storage=None,
+        bucket: str = THUMBNAIL_BUCKET,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.public_base_url = public_base_url.rstrip("/")
+        self.storage = storage if bucket else None
+        self.bucket = bucket
+
+        # 파일명 -> 크기 (오래 쓰지 않은 것부터)
+        self.entries: "OrderedDict[str, int]" = OrderedDict()
+        self.total_bytes = 0
+        self._lock = threading.Lock()
+        self._load_entries()
+
+    def _load_entries(self) -> None:
+        """재시작 시 기존 캐시 파일을 mtime 순으로 LRU에 등록"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        files = sorted(
+            (p for p in self.cache_dir.iterdir() if p.is_file()),
+            key=lambda p: p.stat().st_mtime,
+        )
+        for path in files:
+            size = path.stat().st_size
+            self.entries[path.name] = size
+            self.total_bytes += size
+
+    def url_for(self, name: str) -> str:
+        if self.storage is not None:
+            return self.storage.from_(self.bucket).get_public_url(name)
+        return f"{self.public_base_url}/{name}"
+
+    def has(self, name: str) -> bool:
+        with self._lock:
+            if name not in self.entries:
+                return False
+            self.entries.move_to_end(name)
+        try:
+            os.utime(self.cache_dir / name)
+        except OSError:
+            pass
+        return True
+
+    def put(self, name: str, data: bytes) -> str:
+        """파일 저장 후 공개 URL 반환"""
+        path = self.cache_dir / name
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+        if self.storage is not None:
+            suffix = Path(name).suffix
+            self.storage.from_(self.bucket).upload(
+                name,
+                data,
+                {"content-type": CONTENT_TYPES.get(suffix, "application/octet-stream"),
+                 "cache-control": "31536000", "upsert": "true"},
+            )
+
+        with self._lock:
+            self.total_bytes += len(data) - self.entries.pop(name, 0)
+            self.entries[name] = len(data)
+            self._evict()
+        return self.url_for(name)
+
+    def _evict(self) -> None:
+        """최대 크기를 넘으면 가장 오래 쓰지 않은 파일부터 삭제 (_lock 보유 상태에서 호출)"""
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            name, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                (self.cache_dir / name).unlink()
+            except OSError:
+                pass
+            if DEBUG:
+                print(f"[THUMB] Evicted {name}")
+
+    def read(self, name: str) -> Optional[bytes]:
+        """로컬 캐시 파일 읽기 (없으면 None)"""
+        if not self.has(name):
+            return None
+        try:
+            return (self.cache_dir / name).read_bytes()
+        except OSError:
+            return None
+
+
+class ThumbnailStage:
+    """
+    라이브 상태의 thumbnail_url을 프록시 URL로 교체하는 단계
+
+    장기 실행 모드에서 틱 사이에 재사용합니다 (멤버별 마지막 해시 기억).
+    """
+
+    def __init__(
+        self,
+        store: Optional[ThumbnailStore] = None,
+        concurrency: int = THUMBNAIL_CONCURRENCY,
+        widths: tuple[int, ...] = THUMBNAIL_WIDTHS,
+    ):
+        self.store = store or ThumbnailStore()
+        self.widths = widths
+        self.primary_width = max(widths) if PIL_AVAILABLE else 0
+        self.client = httpx.Client(
+            headers={"User-Agent": USER_AGENT},
+            timeout=10.0,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+        self.pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="thumb")
+        # (platform, user_id) -> (내용 해시, 프록시 URL, 대표 파일명)
+        self.last: dict[tuple[str, str], tuple[str, str, str]] = {}
+        self.stats = {"fetched": 0, "changed": 0, "failed": 0}
+        # last / stats는 풀 스레드에서 갱신 (틱 스레드와 푸시 수신 스레드가 함께 호출)
+        self._lock = threading.Lock()
+
+    def process(self, statuses: list[LiveStatus]) -> list[LiveStatus]:
+        """라이브 상태의 썸네일을 동시에 받아 프록시 URL로 교체"""
+        targets = [
+            i for i, s in enumerate(statuses)
+            if s.is_live and not s.error and s.thumbnail_url
+        ]
+        if not targets:
+            return statuses
+
+        results = list(statuses)
+        futures = {i: self.pool.submit(self._proxy, statuses[i]) for i in targets}
+        for i, future in futures.items():
+            url = future.result()
+            if url != statuses[i].thumbnail_url:
+                results[i] = replace(statuses[i], thumbnail_url=url)
+        return results
+
+    def _proxy(self, status: LiveStatus) -> str:
+        """
+        썸네일 하나 처리
+
+        Returns:
+            프록시 URL (실패 시 이전 프록시 URL, 없으면 원본 URL)
+        """
+        key = (status.platform, status.user_id)
+        with self._lock:
+            previous = self.last.get(key)
+        try:
+            response = self.client.get(status.thumbnail_url)
+            response.raise_for_status()
+            data = response.content
+            self._count("fetched")
+        except httpx.HTTPError as e:
+            self._count("failed")
+            if DEBUG:
+                print(f"[THUMB] Fetch failed for {status.user_id}: {e}")
+            return previous[1] if previous else status.thumbnail_url
+
+        digest = hashlib.sha256(data).hexdigest()[:16]
+        # 같은 이미지: 이전 URL 유지 (캐시에서 밀려났으면 다시 저장)
+        if previous and previous[0] == digest and self.store.has(previous[2]):
+            return previous[1]
+
+        try:
+            url, name = self._store_variants(digest, data)
+        except Exception as e:
+            self._count("failed")
+            print(f"[THUMB] Failed to store thumbnail for {status.user_id}: {e}")
+            return previous[1] if previous else status.thumbnail_url
+
+        with self._lock:
+            if not previous or previous[0] != digest:
+                self.stats["changed"] += 1
+            self.last[key] = (digest, url, name)
+        return url
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def _store_variants(self, digest: str, data: bytes) -> tuple[str, str]:
+        """
+        변환 이미지 저장 (이미 있으면 저장 생략)
+
+        Returns:
+            (대표(가장 큰 폭) URL, 대표 파일명)
+        """
+        if PIL_AVAILABLE:
+            primary = f"{digest}_{self.primary_width}.webp"
+            if all(self.store.has(f"{digest}_{w}.webp") for w in self.widths):
+                return self.store.url_for(primary), primary
+
+        result = None
+        for width, (body, suffix) in render_variants(data, self.widths).items():
+            name = f"{digest}_{width}{suffix}"
+            url = self.store.put(name, body)
+            if width == self.primary_width:
+                result = (url, name)
+        return result
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=False)
+        self.client.close()
+
+
+def register_thumbnail_routes(server: WorkerHTTPServer, store: ThumbnailStore) -> None:
+    """GET /thumbnails/<name> - 로컬 캐시 서빙 (내용 해시 파일명이므로 immutable)"""
+
+    def serve(request: Request) -> Response:
+        name = request.params["name"]
+        data = store.read(name)
+        if data is None:
+            return Response.json({"error": "Not found"}, status=404)
+        return Response(
+            body=data,
+            headers={
+                "Content-Type": CONTENT_TYPES.get(Path(name).suffix, "application/octet-stream"),
+                "Cache-Control": "public, max-age=31536000, immutable",
+            },
+        )
+
+    server.route("GET", rf"/thumbnails/(?P<name>{THUMBNAIL_NAME_PATTERN})", serve)
@@ -0,0 +1,254 @@
+"""
+Write-behind Queue for live_status
+
+스크래퍼 틱과 Supabase 쓰기를 분리합니다.
+
+- 같은 (member_id, platform)의 대기 중인 업데이트는 최신 것 하나로 병합
+- 타이머(WRITE_FLUSH_INTERVAL_SECONDS) 또는 크기(WRITE_BATCH_SIZE) 기준으로 일괄 쓰기
+- 실패한 배치는 지수 백오프로 재시도하고, 대기 중인 최신 값을 로컬 저널에 기록하여
+  재시작 후에도 유실되지 않도록 함
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional
+
+from config import (
+    WRITE_FLUSH_INTERVAL_SECONDS,
+    WRITE_BATCH_SIZE,
+    WRITE_QUEUE_MAX,
+    WRITE_RETRY_MAX_DELAY,
+    WRITE_JOURNAL_PATH,
+    DEBUG,
+)
+
+RowKey = tuple[int, str]
+
+
+def row_key(row: dict) -> RowKey:
+    return (row["member_id"], row.get("platform", "pandatv"))
+
+
+class WriteBehindQueue:
+    """
+    병합(coalescing) 쓰기 큐
+
+    Args:
+        write_rows: 행 목록을 한 번에 쓰는 함수 (실패 시 예외)
+        journal_path: 실패한 배치를 기록할 저널 파일
+    """
+
+    def __init__(
+        self,
+        write_rows: Callable[[list[dict]], None],
+        journal_path: Path = WRITE_JOURNAL_PATH,
+        flush_interval: float = WRITE_FLUSH_INTERVAL_SECONDS,
+        batch_size: int = WRITE_BATCH_SIZE,
+        max_pending: int = WRITE_QUEUE_MAX,
+    ):
+        self.write_rows = write_rows
+        self.journal_path = Path(journal_path)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+
+        self.pending: "OrderedDict[RowKey, dict]" = OrderedDict()
+        self.journaled: set[RowKey] = set()
+        self.failures = 0
+        self.retry_at = 0.0
+        self.stats = {"enqueued": 0, "coalesced": 0, "written": 0, "failed_batches": 0}
+
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._replay_journal()
+
+    # ------------------------------------------------------------------
+    # 큐 조작
+    # ------------------------------------------------------------------
+    def enqueue(self, row: dict) -> None:
+        self.enqueue_many([row])
+
+    def enqueue_many(self, rows: list[dict]) -> None:
+        """
+        행 추가 (같은 키는 최신 값으로 교체)
+
+        대기 중인 키가 max_pending에 도달하면 쓰기가 진행될 때까지 대기합니다.
+        """
+        with self._cond:
+            for row in rows:
+                key = row_key(row)
+                if key in self.pending:
+                    self.stats["coalesced"] += 1
+                    self.pending.pop(key)
+                else:
+                    while len(self.pending) >= self.max_pending and not self._stop.is_set():
+                        self._cond.notify_all()
+                        self._cond.wait(timeout=1.0)
+                self.pending[key] = row
+                self.stats["enqueued"] += 1
+
+            if len(self.pending) >= self.batch_size:
+                self._cond.notify_all()
+
+    def _requeue(self, rows: list[dict]) -> None:
+        """실패한 행을 다시 대기열에 넣음 (그 사이 들어온 최신 값은 유지)"""
+        with self._cond:
+            for row in reversed(rows):
+                key = row_key(row)
+                if key not in self.pending:
+                    self.pending[key] = row
+                    self.pending.move_to_end(key, last=False)
+
+    # ------------------------------------------------------------------
+    # 쓰기
+    # ------------------------------------------------------------------
+    def flush(self) -> bool:
+        """
+        대기 중인 행을 batch_size 단위로 쓰기
+
+        Returns:
+            모든 배치가 성공하면 True
+        """
+        with self._flush_lock:
+            while True:
+                with self._cond:
+                    if not self.pending:
+                        return True
+                    keys = list(self.pending.keys())[:self.batch_size]
+                    batch = [self.pending.pop(key) for key in keys]
+                    self._cond.notify_all()
+
+                try:
+                    self.write_rows(batch)
+                except Exception as e:
+                    self._on_failure(batch, e)
+                    return False
+
+                self._on_success(batch)
+
+    def _on_success(self, batch: list[dict]) -> None:
+        self.failures = 0
+        self.retry_at = 0.0
+        self.stats["written"] += len(batch)
+
+        if self.journaled:
+            written = {row_key(row) for row in batch}
+            if self.journaled & written:
+                self.journaled -= written
+                self._compact_journal()
+
+        if DEBUG:
+            print(f"[WRITER] Flushed {len(batch)} row(s)")
+
+    def _on_failure(self, batch: list[dict], error: Exception) -> None:
+        self.failures += 1
+        self.stats["failed_batches"] += 1
+        delay = min(WRITE_RETRY_MAX_DELAY, self.flush_interval * (2 ** (self.failures - 1)))
+        self.retry_at = time.monotonic() + delay
+
+        self._requeue(batch)
+        # 실패 배치뿐 아니라 아직 쓰지 못한 대기 행도 저널에 남겨 재시작에 대비
+        # 이미 저널에 있는 키도 그 뒤 병합된 최신 값으로 다시 씀 (옛 값이 재시작 시 복원되지 않도록)
+        with self._cond:
+            rows = list(self.pending.values())
+        self._write_journal(rows)
+        print(f"[WRITER] Batch of {len(batch)} failed ({error}); retry in {delay:.0f}s")
+
+    # ------------------------------------------------------------------
+    # 저널
+    # ------------------------------------------------------------------
+    def _write_journal(self, rows: list[dict]) -> None:
+        """저널을 주어진 행(키마다 현재 대기 값)으로 다시 씀 (임시 파일 후 교체)"""
+        try:
+            if not rows:
+                self.journal_path.unlink(missing_ok=True)
+                self.journaled.clear()
+                return
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.journal_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.journal_path)
+            self.journaled = {row_key(row) for row in rows}
+        except OSError as e:
+            print(f"[WRITER] Failed to write journal {self.journal_path}: {e}")
+
+    def _compact_journal(self) -> None:
+        """
+        이미 반영된 키를 저널에서 제거
+
+        반영된 키의 옛 값이 재시작 시 복원되어 최신 상태를 덮어쓰지 않도록
+        남은 키의 현재 대기 값만으로 저널을 다시 씁니다.
+        """
+        with self._cond:
+            rows = [self.pending[key] for key in self.journaled if key in self.pending]
+        self._write_journal(rows)
+
+    def _replay_journal(self) -> None:
+        """이전 실행에서 쓰지 못한 행을 대기열로 복원 (뒤쪽 줄이 최신)"""
+        if not self.journal_path.exists():
+            return
+
+        restored = 0
+        with open(self.journal_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue  # 기록 중 중단된 마지막 줄
+                key = row_key(row)
+                self.pending.pop(key, None)
+                self.pending[key] = row
+                self.journaled.add(key)
+                restored += 1
+
+        if restored:
+            print(f"[WRITER] Restored {len(self.pending)} pending row(s) from journal")
+
+    # ------------------------------------------------------------------
+    # 백그라운드 스레드
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            backoff = self.retry_at - time.monotonic()
+            if backoff > 0:
+                self._stop.wait(backoff)
+                continue
+
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._stop.is_set() or len(self.pending) >= self.batch_size,
+                    timeout=self.flush_interval,
+                )
+            if self._stop.is_set():
+                break
+            self.flush()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """스레드 종료 후 남은 행 쓰기 (실패 시 저널에 남음)"""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        self.flush()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self.pending)
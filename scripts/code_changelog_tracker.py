@@ -1,20 +1,215 @@
 """
 Code Changelog Tracker for RG Family Project
 Auto-generates markdown documentation for code changes
+
+Builds are incremental: reviews/manifest.json records each entry's metadata
+and content hash plus the inputs each generated artifact was built from.
+Saving a new entry only inserts its navigation line into SUMMARY.md (between
+marker comments); an artifact is fully regenerated only when its inputs
+changed in some other way.
+
+The viewer (index.html) needs no client-side Markdown library:
+- html/<id>.html      entry pre-rendered at save time
+- nav/index.json      page count / latest entry
+- nav/page-NNNN.json  nav pages, oldest first, so only the last page changes
+- search-index.json   inverted index over file paths, reasons, titles, dates
+
+Usage:
+    python scripts/code_changelog_tracker.py --rebuild   # full regeneration
 """
 
-import os
+import argparse
+import hashlib
+import json
+import re
 from datetime import datetime
+from html import escape as html_escape, unescape as html_unescape
 from pathlib import Path
 
+MANIFEST_VERSION = 1
+# Bump when the generated SUMMARY.md / index.html layout changes
+TEMPLATE_VERSION = 2
+# Bump when render_markdown output changes
+RENDERER_VERSION = 2
+SEARCH_INDEX_VERSION = 1
+NAV_PAGE_SIZE = 50
+
+NAV_START = "<!-- changelog:nav:start -->"
+NAV_END = "<!-- changelog:nav:end -->"
+NON_ENTRY_FILES = {"README.md", "SUMMARY.md"}
+COMPACT_JSON = {"ensure_ascii": False, "separators": (",", ":")}
+
+
+def content_hash(data) -> str:
+    if not isinstance(data, (bytes, str)):
+        data = json.dumps(data, ensure_ascii=False, sort_keys=True)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def parse_changelog(filename: str, text: str) -> dict:
+    """Extract manifest metadata from a generated changelog markdown file"""
+    title = re.search(r"^# (.+)$", text, re.M)
+    date = re.search(r"^\*\*Date:\*\* (.+)$", text, re.M)
+    request = re.search(r"^\*\*User Request:\*\* ?(.*)$", text, re.M)
+
+    changes = []
+    for change_type, filepath, reason in re.findall(
+        r"^\| (CREATION|MODIFICATION|DELETION) \| `(.+?)` \| (.*) \|$", text, re.M
+    ):
+        changes.append({"type": change_type.lower(), "filepath": filepath, "reason": reason})
+
+    return {
+        "file": filename,
+        "id": Path(filename).stem,
+        "title": title.group(1).strip() if title else Path(filename).stem,
+        "date": date.group(1).strip() if date else "",
+        "request": request.group(1).strip() if request else "",
+        "changes": changes,
+        "hash": content_hash(text),
+    }
+
+
+SAFE_LINK_SCHEMES = ("http", "https")
+
+
+def safe_href(url: str):
+    """
+    Return the URL if it is safe to put in an href, else None
+
+    Allows http(s), relative paths and #fragments. Anything with another
+    scheme (javascript:, data:, vbscript:, ...) is rejected. Browsers ignore
+    tabs/newlines and leading control characters in URLs, so those are
+    stripped before the scheme is read.
+    """
+    cleaned = re.sub(r"[\x00-\x20\x7f]", "", url)
+    scheme = re.match(r"([A-Za-z][A-Za-z0-9+.-]*):", cleaned)
+    if scheme is None:
+        return url  # relative, absolute path or #fragment
+    if scheme.group(1).lower() in SAFE_LINK_SCHEMES:
+        return url
+    return None
+
+
+def _link(match: "re.Match") -> str:
+    label, url = match.group(1), html_unescape(match.group(2))
+    href = safe_href(url)
+    if href is None:
+        return label
+    return f'<a href="{html_escape(href, quote=True)}">{label}</a>'
+
+
+def _inline(text: str) -> str:
+    """Inline markdown: `code`, **bold**, [text](url) (http(s)/relative links only)"""
+    parts = re.split(r"(`[^`]+`)", text)
+    out = []
+    for part in parts:
+        if len(part) > 1 and part.startswith("`") and part.endswith("`"):
+            out.append(f"<code>{html_escape(part[1:-1])}</code>")
+            continue
+        part = html_escape(part)
+        part = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", part)
+        part = re.sub(r"\[([^\]]+)\]\(([^)\s]+)\)", _link, part)
+        out.append(part)
+    return "".join(out)
+
+
+def _table_cells(line: str) -> list:
+    return [cell.strip() for cell in line.strip().strip("|").split("|")]
+
+
+def render_markdown(text: str) -> str:
+    """
+    Minimal Markdown -> HTML for the changelog format
+
+    Supports headings, paragraphs, fenced code, tables, horizontal rules,
+    bullet lists and inline code/bold/links.
+    """
+    lines = text.splitlines()
+    html = []
+    paragraph = []
+    i = 0
+
+    def flush_paragraph():
+        if paragraph:
+            html.append("<p>" + "<br>\n".join(_inline(line) for line in paragraph) + "</p>")
+            paragraph.clear()
+
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+
+        if stripped.startswith("```"):
+            flush_paragraph()
+            code = []
+            i += 1
+            while i < len(lines) and not lines[i].strip().startswith("```"):
+                code.append(lines[i])
+                i += 1
+            html.append("<pre><code>" + html_escape("\n".join(code)) + "</code></pre>")
+        elif not stripped:
+            flush_paragraph()
+        elif re.match(r"^#{1,6} ", stripped):
+            flush_paragraph()
+            level = len(stripped) - len(stripped.lstrip("#"))
+            html.append(f"<h{level}>{_inline(stripped[level + 1:])}</h{level}>")
+        elif re.match(r"^(-{3,}|\*{3,})$", stripped):
+            flush_paragraph()
+            html.append("<hr>")
+        elif stripped.startswith("|") and i + 1 < len(lines) and re.match(r"^\|[\s|:-]+\|$", lines[i + 1].strip()):
+            flush_paragraph()
+            header = _table_cells(stripped)
+            rows = []
+            i += 2
+            while i < len(lines) and lines[i].strip().startswith("|"):
+                rows.append(_table_cells(lines[i]))
+                i += 1
+            html.append("<table><thead><tr>" + "".join(f"<th>{_inline(c)}</th>" for c in header) + "</tr></thead><tbody>")
+            for row in rows:
+                html.append("<tr>" + "".join(f"<td>{_inline(c)}</td>" for c in row) + "</tr>")
+            html.append("</tbody></table>")
+            continue
+        elif re.match(r"^[*-] ", stripped):
+            flush_paragraph()
+            items = []
+            while i < len(lines) and re.match(r"^[*-] ", lines[i].strip()):
+                items.append(f"<li>{_inline(lines[i].strip()[2:])}</li>")
+                i += 1
+            html.append("<ul>" + "".join(items) + "</ul>")
+            continue
+        else:
+            paragraph.append(stripped)
+        i += 1
+
+    flush_paragraph()
+    return "\n".join(html) + "\n"
+
+
+def search_terms(entry: dict) -> set:
+    """Index terms for one entry: file paths (whole and split), reasons, title, dates"""
+    terms = set()
+    for change in entry["changes"]:
+        path = change["filepath"].lower()
+        terms.add(path)
+        terms.update(p for p in re.split(r"[/._\-\[\]]+", path) if len(p) >= 2)
+        terms.update(w.lower() for w in re.findall(r"\w+", change["reason"]) if len(w) >= 2)
+    terms.update(w.lower() for w in re.findall(r"\w+", entry["title"] + " " + entry["request"]) if len(w) >= 2)
+
+    date = entry["date"][:10] or f"{entry['id'][:4]}-{entry['id'][4:6]}-{entry['id'][6:8]}"
+    terms.update({date, date[:7], date[:4]})
+    return terms
+
+
 class CodeChangeLogger:
-    def __init__(self, project_name: str, user_request: str = ""):
+    def __init__(self, project_name: str, user_request: str = "", reviews_dir: str = "reviews"):
         self.project_name = project_name
         self.user_request = user_request
         self.changes = []
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.reviews_dir = Path("reviews")
+        self.reviews_dir = Path(reviews_dir)
         self.reviews_dir.mkdir(exist_ok=True)
+        self.manifest_path = self.reviews_dir / "manifest.json"
 
     def log_file_creation(self, filepath: str, code_snippet: str, reason: str):
         self.changes.append({
@@ -73,37 +268,181 @@ class CodeChangeLogger:
 
         return md
 
-    def _update_summary(self):
+    # ------------------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------------------
+    def _load_manifest(self) -> dict:
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            if manifest.get("version") == MANIFEST_VERSION:
+                return manifest
+        except (OSError, ValueError):
+            pass
+        return {"version": MANIFEST_VERSION, "entries": [], "artifacts": {}}
+
+    def _save_manifest(self, manifest: dict):
+        self.manifest_path.write_text(
+            json.dumps(manifest, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
+        )
+
+    @staticmethod
+    def _sorted_entries(manifest: dict) -> list:
+        """Newest first (entry ids are timestamps)"""
+        return sorted(manifest["entries"], key=lambda e: e["id"], reverse=True)
+
+    def _artifact_inputs(self, name: str, entries: list) -> str:
+        """Hash of everything an artifact is generated from"""
+        return content_hash({"template": TEMPLATE_VERSION, "artifact": name, "ids": [e["id"] for e in entries]})
+
+    def _write_if_changed(self, manifest: dict, name: str, inputs: str, render, force=False) -> bool:
+        """Write reviews/<name> only when its recorded inputs differ"""
+        path = self.reviews_dir / name
+        if not force and manifest["artifacts"].get(name) == inputs and path.exists():
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(render(), encoding="utf-8")
+        manifest["artifacts"][name] = inputs
+        return True
+
+    def _build_artifact(self, manifest: dict, name: str, render, nav_line=None, new_entry=None, force=False) -> str:
+        """
+        Bring one artifact up to date
+
+        - inputs unchanged: skip
+        - exactly one new entry on top of an up-to-date artifact: insert its nav line
+        - otherwise: full regeneration
+
+        Returns: "skipped" | "appended" | "rebuilt"
+        """
+        path = self.reviews_dir / name
+        entries = self._sorted_entries(manifest)
+        inputs = self._artifact_inputs(name, entries)
+        recorded = manifest["artifacts"].get(name)
+
+        if not force and recorded == inputs and path.exists():
+            return "skipped"
+
+        if (not force and nav_line is not None and new_entry is not None
+                and path.exists() and entries[0]["id"] == new_entry["id"]):
+            previous = self._artifact_inputs(name, entries[1:])
+            text = path.read_text(encoding="utf-8")
+            if recorded == previous and NAV_START in text:
+                text = text.replace(NAV_START, NAV_START + "\n" + nav_line(new_entry), 1)
+                path.write_text(text, encoding="utf-8")
+                manifest["artifacts"][name] = inputs
+                return "appended"
+
+        path.write_text(render(entries), encoding="utf-8")
+        manifest["artifacts"][name] = inputs
+        return "rebuilt"
+
+    # ------------------------------------------------------------------
+    # SUMMARY.md
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _summary_line(entry: dict) -> str:
+        return f"* [{entry['id']}]({entry['file']})"
+
+    def _render_summary(self, entries: list) -> str:
+        lines = [self._summary_line(e) for e in entries]
+        return (
+            "# Summary\n\n* [Home](README.md)\n\n## Changelogs\n\n"
+            f"{NAV_START}\n" + "".join(line + "\n" for line in lines) + f"{NAV_END}\n"
+        )
+
+    def _update_summary(self, manifest: dict, new_entry=None, force=False) -> str:
         """Update SUMMARY.md with all changelog files"""
-        files = sorted(self.reviews_dir.glob("*.md"), reverse=True)
-        files = [f for f in files if f.name not in ["README.md", "SUMMARY.md"]]
+        return self._build_artifact(
+            manifest, "SUMMARY.md", self._render_summary, self._summary_line, new_entry, force
+        )
+
+    # ------------------------------------------------------------------
+    # Pre-rendered entries, nav pages, search index
+    # ------------------------------------------------------------------
+    def _update_entry_html(self, manifest: dict, entry: dict, force=False) -> bool:
+        """Render html/<id>.html when the entry's markdown changed"""
+        inputs = content_hash({"renderer": RENDERER_VERSION, "hash": entry["hash"]})
+        return self._write_if_changed(
+            manifest,
+            f"html/{entry['id']}.html",
+            inputs,
+            lambda: render_markdown((self.reviews_dir / entry["file"]).read_text(encoding="utf-8")),
+            force,
+        )
+
+    def _update_nav(self, manifest: dict, force=False) -> int:
+        """
+        Write nav pages whose entries changed
+
+        Pages are filled oldest first, so appending an entry rewrites only
+        the last page and nav/index.json.
+
+        Returns: number of pages written
+        """
+        entries = sorted(manifest["entries"], key=lambda e: e["id"])
+        pages = [entries[i:i + NAV_PAGE_SIZE] for i in range(0, len(entries), NAV_PAGE_SIZE)] or [[]]
 
-        summary = "# Summary\n\n* [Home](README.md)\n\n## Changelogs\n\n"
-        for f in files:
-            name = f.stem
-            summary += f"* [{name}]({f.name})\n"
+        written = 0
+        for number, page in enumerate(pages, 1):
+            items = [[e["id"], e["title"], e["date"]] for e in page]
+            written += self._write_if_changed(
+                manifest,
+                f"nav/page-{number:04d}.json",
+                content_hash(items),
+                lambda: json.dumps({"page": number, "entries": items}, **COMPACT_JSON),
+                force,
+            )
 
-        (self.reviews_dir / "SUMMARY.md").write_text(summary)
+        # Drop pages left over from a larger manifest
+        for stale in sorted((self.reviews_dir / "nav").glob("page-*.json"))[len(pages):]:
+            stale.unlink()
+            manifest["artifacts"].pop(f"nav/{stale.name}", None)
 
-    def _update_index_html(self):
-        """Update index.html with file list"""
-        files = sorted(self.reviews_dir.glob("*.md"), reverse=True)
-        files = [f for f in files if f.name not in ["README.md", "SUMMARY.md"]]
+        meta = {
+            "page_size": NAV_PAGE_SIZE,
+            "pages": len(pages),
+            "total": len(entries),
+            "latest": entries[-1]["id"] if entries else None,
+        }
+        self._write_if_changed(
+            manifest, "nav/index.json", content_hash(meta), lambda: json.dumps(meta, **COMPACT_JSON), force
+        )
+        return written
 
-        file_links = "\n".join([
-            f'        <a href="#" onclick="loadFile(\'{f.name}\')" class="nav-link">{f.stem}</a>'
-            for f in files
-        ])
+    def _update_search_index(self, manifest: dict, force=False) -> bool:
+        """Inverted index: term -> positions in docs ([id, title, date], oldest first)"""
+        entries = sorted(manifest["entries"], key=lambda e: e["id"])
+        inputs = content_hash({"version": SEARCH_INDEX_VERSION, "docs": [[e["id"], e["hash"]] for e in entries]})
 
-        default_file = files[0].name if files else "README.md"
+        def render():
+            terms = {}
+            for position, entry in enumerate(entries):
+                for term in search_terms(entry):
+                    terms.setdefault(term, []).append(position)
+            return json.dumps({
+                "version": SEARCH_INDEX_VERSION,
+                "docs": [[e["id"], e["title"], e["date"]] for e in entries],
+                "terms": dict(sorted(terms.items())),
+            }, **COMPACT_JSON)
 
+        return self._write_if_changed(manifest, "search-index.json", inputs, render, force)
+
+    # ------------------------------------------------------------------
+    # index.html (static viewer - depends only on TEMPLATE_VERSION)
+    # ------------------------------------------------------------------
+    def _update_index_html(self, manifest: dict, force=False) -> str:
+        """Write the viewer page when the template changed"""
+        inputs = content_hash({"template": TEMPLATE_VERSION, "artifact": "index.html"})
+        written = self._write_if_changed(manifest, "index.html", inputs, self._render_index_html, force)
+        return "rebuilt" if written else "skipped"
+
+    def _render_index_html(self) -> str:
         html = f'''<!DOCTYPE html>
 <html lang="ko">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Code Changelog - RG Family</title>
-    <script src="https://cdn.jsdelivr.net/npm/marked/marked.min.js"></script>
     <style>
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
         body {{
@@ -179,34 +518,146 @@ class CodeChangeLogger:
         }}
         .markdown-body th {{ background: #161b22; }}
         .markdown-body a {{ color: #58a6ff; }}
+        .search {{
+            width: 100%;
+            padding: 0.5rem 0.75rem;
+            margin-bottom: 0.75rem;
+            background: #0d1117;
+            border: 1px solid #30363d;
+            border-radius: 6px;
+            color: #c9d1d9;
+        }}
+        .nav-link small {{ display: block; color: #6e7681; font-size: 0.75rem; }}
+        .pager {{
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+            margin-top: 0.75rem;
+            font-size: 0.8rem;
+            color: #8b949e;
+        }}
+        .pager button {{
+            background: #21262d;
+            color: #c9d1d9;
+            border: 1px solid #30363d;
+            border-radius: 6px;
+            padding: 0.25rem 0.6rem;
+            cursor: pointer;
+        }}
+        .pager button:disabled {{ opacity: 0.4; cursor: default; }}
     </style>
 </head>
 <body>
     <nav class="sidebar">
         <h2>Changelogs</h2>
-{file_links}
+        <input id="search" class="search" type="search" placeholder="파일, 사유, 날짜 검색">
+        <div id="nav-list"></div>
+        <div class="pager">
+            <button id="newer" type="button">&larr; 최신</button>
+            <span id="page-label"></span>
+            <button id="older" type="button">이전 &rarr;</button>
+        </div>
     </nav>
     <main class="content">
         <div id="markdown-content" class="markdown-body"></div>
     </main>
     <script>
-        async function loadFile(filename) {{
+        const state = {{ meta: null, page: 1, active: null, index: null, terms: null }};
+        const $ = (id) => document.getElementById(id);
+
+        async function getJSON(path) {{
+            const response = await fetch(path);
+            if (!response.ok) throw new Error(path);
+            return response.json();
+        }}
+
+        function renderList(items) {{
+            const list = $('nav-list');
+            list.replaceChildren(...items.map(([id, title, date]) => {{
+                const link = document.createElement('a');
+                link.href = '#' + id;
+                link.className = 'nav-link' + (id === state.active ? ' active' : '');
+                link.dataset.id = id;
+                link.textContent = title || id;
+                const meta = document.createElement('small');
+                meta.textContent = date || id;
+                link.appendChild(meta);
+                return link;
+            }}));
+        }}
+
+        async function showPage(page) {{
+            state.page = page;
+            const data = await getJSON(`nav/page-${{String(page).padStart(4, '0')}}.json`);
+            renderList(data.entries.slice().reverse());
+            $('page-label').textContent = `${{page}} / ${{state.meta.pages}}`;
+            $('newer').disabled = page >= state.meta.pages;
+            $('older').disabled = page <= 1;
+        }}
+
+        async function loadEntry(id) {{
             try {{
-                const response = await fetch(filename);
-                const text = await response.text();
-                document.getElementById('markdown-content').innerHTML = marked.parse(text);
+                const response = await fetch(`html/${{id}}.html`);
+                if (!response.ok) throw new Error(id);
+                $('markdown-content').innerHTML = await response.text();
+                state.active = id;
                 document.querySelectorAll('.nav-link').forEach(link => {{
-                    link.classList.toggle('active', link.textContent === filename.replace('.md', ''));
+                    link.classList.toggle('active', link.dataset.id === id);
                 }});
             }} catch (e) {{
-                document.getElementById('markdown-content').innerHTML = '<p>Error loading file</p>';
+                $('markdown-content').innerHTML = '<p>Error loading file</p>';
+            }}
+        }}
+
+        async function search(query) {{
+            const words = query.toLowerCase().split(/\\s+/).filter(Boolean);
+            if (!words.length) return showPage(state.page);
+            if (!state.index) {{
+                state.index = await getJSON('search-index.json');
+                state.terms = Object.keys(state.index.terms);
+            }}
+            // Each word matches terms by prefix; results must match every word
+            let hits = null;
+            for (const word of words) {{
+                const docs = new Set();
+                for (const term of state.terms) {{
+                    if (term.startsWith(word)) state.index.terms[term].forEach(d => docs.add(d));
+                }}
+                hits = hits ? new Set([...hits].filter(d => docs.has(d))) : docs;
             }}
+            const results = [...hits].sort((a, b) => b - a).slice(0, 100);
+            renderList(results.map(d => state.index.docs[d]));
+            $('page-label').textContent = `${{hits.size}}건`;
+            $('newer').disabled = $('older').disabled = true;
         }}
-        loadFile('{default_file}');
+
+        $('nav-list').addEventListener('click', (event) => {{
+            const link = event.target.closest('.nav-link');
+            if (!link) return;
+            event.preventDefault();
+            loadEntry(link.dataset.id);
+        }});
+        $('newer').addEventListener('click', () => showPage(state.page + 1));
+        $('older').addEventListener('click', () => showPage(state.page - 1));
+        let timer;
+        $('search').addEventListener('input', (event) => {{
+            clearTimeout(timer);
+            timer = setTimeout(() => search(event.target.value), 150);
+        }});
+
+        (async () => {{
+            state.meta = await getJSON('nav/index.json');
+            if (!state.meta.total) {{
+                $('markdown-content').textContent = 'No changelogs yet';
+                return;
+            }}
+            await showPage(state.meta.pages);
+            loadEntry(location.hash.slice(1) || state.meta.latest);
+        }})();
     </script>
 </body>
 </html>'''
-        (self.reviews_dir / "index.html").write_text(html)
+        return html
 
     def _create_readme(self):
         """Create README.md if not exists"""
@@ -228,27 +679,77 @@ python3 -m http.server 4000
             readme_path.write_text(readme)
 
     def save_and_build(self):
-        """Save changelog and update all navigation files"""
+        """Save changelog and incrementally update navigation files"""
         # Save changelog
         filename = f"{self.timestamp}.md"
         filepath = self.reviews_dir / filename
-        filepath.write_text(self._generate_markdown())
+        markdown = self._generate_markdown()
+        filepath.write_text(markdown)
 
-        # Update navigation
+        # Record in manifest (replace if this timestamp was saved before)
+        manifest = self._load_manifest()
+        entry = parse_changelog(filename, markdown)
+        manifest["entries"] = [e for e in manifest["entries"] if e["file"] != filename] + [entry]
+
+        # Update navigation (only artifacts whose inputs changed)
         self._create_readme()
-        self._update_summary()
-        self._update_index_html()
+        self._update_entry_html(manifest, entry)
+        summary = self._update_summary(manifest, new_entry=entry)
+        pages = self._update_nav(manifest)
+        self._update_search_index(manifest)
+        self._update_index_html(manifest)
+        self._save_manifest(manifest)
 
-        print(f"Changelog saved: {filepath}")
+        print(f"Changelog saved: {filepath} (SUMMARY.md {summary}, {pages} nav page(s) written)")
         print(f"View at: http://localhost:4000")
         return str(filepath)
 
+    def rebuild(self):
+        """Rescan reviews/*.md, rewrite the manifest and regenerate every artifact"""
+        previous = {e["file"]: e for e in self._load_manifest()["entries"]}
+        manifest = {"version": MANIFEST_VERSION, "entries": [], "artifacts": {}}
+
+        reparsed = 0
+        for path in sorted(self.reviews_dir.glob("*.md")):
+            if path.name in NON_ENTRY_FILES:
+                continue
+            text = path.read_text()
+            entry = previous.get(path.name)
+            if entry is None or entry.get("hash") != content_hash(text):
+                entry = parse_changelog(path.name, text)
+                reparsed += 1
+            manifest["entries"].append(entry)
+
+        self._create_readme()
+        ids = {entry["id"] for entry in manifest["entries"]}
+        for stale in (self.reviews_dir / "html").glob("*.html"):
+            if stale.stem not in ids:
+                stale.unlink()
+        for entry in manifest["entries"]:
+            self._update_entry_html(manifest, entry, force=True)
+        self._update_summary(manifest, force=True)
+        self._update_nav(manifest, force=True)
+        self._update_search_index(manifest, force=True)
+        self._update_index_html(manifest, force=True)
+        self._save_manifest(manifest)
+
+        print(f"Rebuilt {len(manifest['entries'])} entries ({reparsed} re-parsed) in {self.reviews_dir}")
+
 
 if __name__ == "__main__":
-    # Example usage
-    logger = CodeChangeLogger(
-        "RG Family - UI Enhancement",
-        user_request="Implement 3 core features"
-    )
-    logger.log_file_creation("example.ts", "const x = 1;", "Example file")
-    logger.save_and_build()
+    parser = argparse.ArgumentParser(description="Code changelog tracker")
+    parser.add_argument("--rebuild", action="store_true", help="Force a full regeneration of reviews/")
+    parser.add_argument("--reviews-dir", default="reviews", help="Changelog directory (default: reviews)")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        CodeChangeLogger("", reviews_dir=args.reviews_dir).rebuild()
+    else:
+        # Example usage
+        logger = CodeChangeLogger(
+            "RG Family - UI Enhancement",
+            user_request="Implement 3 core features",
+            reviews_dir=args.reviews_dir,
+        )
+        logger.log_file_creation("example.ts", "const x = 1;", "Example file")
+        logger.save_and_build()
@@ -17,11 +17,20 @@ PandaTV 라이브 상태 크롤러
 """
 
 import os
+import re
+import sys
+import gzip
 import time
 import json
+import uuid
+import random
 import logging
+import threading
+from dataclasses import dataclass, field
 from datetime import datetime
+from pathlib import Path
 from typing import Set, Dict, List, Optional
+from urllib.parse import urlsplit
 
 import requests
 from dotenv import load_dotenv
@@ -34,12 +43,23 @@ try:
     from selenium.webdriver.common.by import By
     from selenium.webdriver.support.ui import WebDriverWait
     from selenium.webdriver.support import expected_conditions as EC
-    from selenium.common.exceptions import TimeoutException, NoSuchElementException
+    from selenium.common.exceptions import TimeoutException
     from webdriver_manager.chrome import ChromeDriverManager
     SELENIUM_AVAILABLE = True
 except ImportError:
     SELENIUM_AVAILABLE = False
 
+# PandaTV 요청 속도 제한 - python-live-scraper 워커와 같은 토큰 버킷(파일 잠금)을 공유
+# 워커 코드가 없는 배포에서는 고정 간격(1초)으로 대체
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "python-live-scraper"))
+try:
+    from ratelimit import limiter, THROTTLE_STATUS_CODES, retry_after_seconds
+    RATELIMIT_AVAILABLE = True
+except ImportError:
+    RATELIMIT_AVAILABLE = False
+finally:
+    sys.path.pop(0)
+
 # 로깅 설정
 logging.basicConfig(
     level=logging.INFO,
@@ -66,10 +86,26 @@ class Config:
     ELEMENT_WAIT_TIMEOUT = 10
     REQUEST_TIMEOUT = 30
     RETRY_COUNT = 3
-    RETRY_DELAY = 5
+    RETRY_DELAY = 5  # 백오프 기본 지연 (초)
+    RETRY_MAX_DELAY = 60
+    # delta 전송 중에도 N틱마다 전체 상태를 보내 서버 상태 드리프트 보정
+    FULL_SYNC_EVERY_TICKS = int(os.getenv("FULL_SYNC_EVERY_TICKS", "30"))
+
+    # 멤버 매핑 캐시 (API에서 로드, 실패 시 디스크의 마지막 정상 사본 사용)
+    MAPPING_REFRESH_SECONDS = int(os.getenv("MAPPING_REFRESH_SECONDS", "600"))
+    MAPPING_FETCH_TIMEOUT = 10
+    MAPPING_CACHE_PATH = Path(os.getenv(
+        "MAPPING_CACHE_PATH",
+        str(Path(__file__).resolve().parent / ".member_mapping.json"),
+    ))
+
+    # HTTP 1차 체크 설정 (브라우저 없이 HTML/임베디드 상태 파싱)
+    HTTP_PROBE_ENABLED = os.getenv("HTTP_PROBE_ENABLED", "true").lower() == "true"
+    HTTP_PROBE_TIMEOUT = 5
+    HTTP_PROBE_MAX_BYTES = 512 * 1024  # 이 이상 읽어도 판정 못 하면 브라우저로 폴백
 
 # BJ 이름 -> member_id 매핑 (organization 테이블 기준)
-# 실제 배포 시 Supabase에서 동적으로 가져오는 것을 권장
+# API와 디스크 캐시 모두 사용할 수 없을 때의 기본값 (MemberMappingCache 참고)
 BJ_MAPPING: Dict[str, int] = {
     "린아": 1,
     "가애": 2,
@@ -87,7 +123,7 @@ BJ_MAPPING: Dict[str, int] = {
     "사라": 14,
 }
 
-# BJ PandaTV URL 매핑 (개별 채널 체크용)
+# BJ PandaTV URL 매핑 (개별 채널 체크용, 기본값)
 BJ_CHANNEL_URLS: Dict[str, str] = {
     "린아": f"{Config.PANDATV_BASE_URL}/channel/rina",
     "가애": f"{Config.PANDATV_BASE_URL}/channel/gaea",
@@ -99,7 +135,7 @@ BJ_CHANNEL_URLS: Dict[str, str] = {
 # ============================================
 # 유틸리티 함수
 # ============================================
-def create_driver() -> Optional[webdriver.Chrome]:
+def create_driver() -> Optional["webdriver.Chrome"]:
     """Headless Chrome 드라이버 생성"""
     if not SELENIUM_AVAILABLE:
         logger.error("Selenium이 설치되지 않았습니다: pip install selenium webdriver-manager")
@@ -129,34 +165,349 @@ def create_driver() -> Optional[webdriver.Chrome]:
         return None
 
 
-def fetch_member_mapping_from_api() -> Dict[str, int]:
+# ============================================
+# 멤버 매핑 캐시
+# ============================================
+@dataclass(frozen=True)
+class MemberMapping:
+    """멤버 매핑 스냅샷 (불변 - 갱신 시 통째로 교체)"""
+    version: str
+    mapping: Dict[str, int] = field(default_factory=dict)
+    channel_urls: Dict[str, str] = field(default_factory=dict)
+    source: str = "default"
+
+    @classmethod
+    def from_members(cls, version: str, members: List[Dict], source: str) -> "MemberMapping":
+        mapping: Dict[str, int] = {}
+        channel_urls: Dict[str, str] = {}
+        for member in members:
+            mapping[member["name"]] = member["id"]
+            pandatv_id = (member.get("social_links") or {}).get("pandatv")
+            if pandatv_id:
+                channel_urls[member["name"]] = f"{Config.PANDATV_BASE_URL}/play/{pandatv_id}"
+        return cls(version=version, mapping=mapping, channel_urls=channel_urls, source=source)
+
+
+DEFAULT_MAPPING = MemberMapping(
+    version="builtin",
+    mapping=BJ_MAPPING,
+    channel_urls=BJ_CHANNEL_URLS,
+)
+
+
+def fetch_member_mapping_from_api(etag: Optional[str] = None) -> Optional[Dict]:
     """
-    API에서 멤버 매핑 정보 가져오기 (선택적)
+    API에서 멤버 매핑 정보 가져오기
+
+    Args:
+        etag: 이전에 받은 버전 - 변경이 없으면 서버가 304 응답
+
+    Returns:
+        {"version": ..., "members": [...]} / 변경 없음 또는 실패 시 None
     """
+    headers = {"If-None-Match": f'"{etag}"'} if etag else {}
     try:
         response = requests.get(
-            Config.API_URL.replace("/update", ""),  # GET endpoint
-            timeout=Config.REQUEST_TIMEOUT
+            Config.API_URL,  # GET endpoint
+            params={"view": "mapping"},
+            headers=headers,
+            timeout=Config.MAPPING_FETCH_TIMEOUT,
         )
+        if response.status_code == 304:
+            return None
         if response.status_code == 200:
             data = response.json()
-            # API 응답 형식에 맞게 파싱
-            return {m["name"]: m["id"] for m in data.get("members", [])}
+            if data.get("members"):
+                return data
+        logger.warning(f"멤버 매핑 API 응답 오류 ({response.status_code})")
     except Exception as e:
-        logger.warning(f"멤버 매핑 API 호출 실패, 기본값 사용: {e}")
-    
-    return BJ_MAPPING
+        logger.warning(f"멤버 매핑 API 호출 실패: {e}")
+
+    return None
+
+
+class MemberMappingCache:
+    """
+    버전 관리되는 멤버 매핑 캐시
+
+    - 시작 시 API -> 디스크의 마지막 정상 사본 -> 내장 기본값 순으로 로드
+    - 백그라운드 스레드가 ETag로 주기적으로 갱신 (변경 없으면 304)
+    - 갱신은 스냅샷 참조 교체로 이뤄지므로, 진행 중인 틱은 기존 매핑으로 끝까지 실행
+    """
+
+    def __init__(self, cache_path: Path = Config.MAPPING_CACHE_PATH):
+        self.cache_path = cache_path
+        self._snapshot = DEFAULT_MAPPING
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def current(self) -> MemberMapping:
+        with self._lock:
+            return self._snapshot
+
+    def _swap(self, snapshot: MemberMapping) -> None:
+        with self._lock:
+            previous = self._snapshot
+            self._snapshot = snapshot
+        if previous.version != snapshot.version:
+            logger.info(
+                f"멤버 매핑 갱신: {previous.version} -> {snapshot.version} "
+                f"({len(snapshot.mapping)}명, 출처: {snapshot.source})"
+            )
+
+    def load(self) -> MemberMapping:
+        """시작 시 1회 로드"""
+        if not self.refresh():
+            disk = self._load_from_disk()
+            if disk:
+                self._swap(disk)
+            else:
+                logger.warning("멤버 매핑 API/디스크 캐시 없음 - 내장 기본값 사용")
+        return self.current()
+
+    def refresh(self) -> bool:
+        """API에서 갱신 (변경 없음도 성공으로 간주)"""
+        snapshot = self.current()
+        etag = snapshot.version if snapshot.source != "default" else None
+        data = fetch_member_mapping_from_api(etag)
+        if data is None:
+            # 304 (변경 없음)와 실패를 구분하지 않고 현재 스냅샷 유지
+            return snapshot.source == "api"
+
+        fresh = MemberMapping.from_members(data["version"], data["members"], source="api")
+        self._swap(fresh)
+        self._save_to_disk(data)
+        return True
+
+    def _load_from_disk(self) -> Optional[MemberMapping]:
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+            return MemberMapping.from_members(data["version"], data["members"], source="disk")
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError) as e:
+            logger.warning(f"멤버 매핑 디스크 캐시 손상 - 무시: {e}")
+            return None
+
+    def _save_to_disk(self, data: Dict) -> None:
+        """임시 파일에 쓴 후 교체 (중간에 죽어도 이전 사본 유지)"""
+        try:
+            tmp_path = self.cache_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"멤버 매핑 디스크 저장 실패: {e}")
+
+    def start_background_refresh(self, interval_seconds: int = Config.MAPPING_REFRESH_SECONDS) -> None:
+        if self._thread is not None:
+            return
+
+        def loop():
+            while not self._stop.wait(interval_seconds):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.warning(f"멤버 매핑 백그라운드 갱신 실패: {e}")
+
+        self._thread = threading.Thread(target=loop, name="mapping-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+# ============================================
+# 요청 속도 제한
+# ============================================
+def wait_for_channel_budget() -> None:
+    """채널 페이지 요청 전 대기 (워커와 공유하는 pandatv_channel 예산)"""
+    if RATELIMIT_AVAILABLE:
+        limiter("pandatv_channel").acquire()
+    else:
+        time.sleep(1)
+
+
+def report_channel_response(status_code: int, headers=None) -> None:
+    """429/503이면 공유 백오프 기록 (다른 프로세스도 함께 대기)"""
+    if not RATELIMIT_AVAILABLE:
+        return
+    if status_code in THROTTLE_STATUS_CODES:
+        limiter("pandatv_channel").throttled(retry_after_seconds(headers))
+    else:
+        limiter("pandatv_channel").succeeded()
+
+
+# ============================================
+# HTTP 1차 체크 (브라우저 없이)
+# ============================================
+# 임베디드 상태(JSON) 또는 마크업에서 라이브 여부를 나타내는 패턴
+LIVE_STATE_PATTERN = re.compile(
+    r'"(?:isLive|is_live|onAir|isOnAir)"\s*:\s*(true|false)'
+    r'|data-live=["\'](true|false)["\']'
+    r'|class="[^"]*\b(live-badge|is-live|player-live-indicator)\b'
+)
+# 마커 앞뒤로 채널 ID를 찾는 범위 - 추천/관련 방송 카드의 마커를 채널 자신의 상태로 오인하지 않도록
+# 채널 ID가 이 범위 안에 있는 마커만 판정에 사용
+PROBE_CONTEXT = 400
+# 청크 경계에 걸친 패턴/채널 ID를 놓치지 않기 위해 남겨둘 버퍼 길이
+PROBE_OVERLAP = 2 * PROBE_CONTEXT
+
+
+def channel_id_from_url(channel_url: str) -> str:
+    """.../play/<id>, .../channel/<id> -> <id>"""
+    return urlsplit(channel_url).path.rstrip("/").rsplit("/", 1)[-1]
+
+
+def parse_live_marker(match: "re.Match") -> bool:
+    """LIVE_STATE_PATTERN 매치 결과를 라이브 여부로 변환"""
+    json_flag, attr_flag, live_class = match.groups()
+    if live_class:
+        return True
+    return (json_flag or attr_flag) == "true"
+
+
+def find_channel_marker(text: str, channel_id: str, final: bool) -> Optional[bool]:
+    """
+    채널 ID 근처에 있는 첫 라이브 마커로 판정
+
+    Args:
+        final: 더 읽을 내용이 없으면 True (아니면 끝부분 마커는 다음 청크까지 보류)
+
+    Returns:
+        True/False: 판정 완료, None: 해당 채널의 마커 없음
+    """
+    owner = re.compile(r'["\'/=]' + re.escape(channel_id) + r'["\'/?&]')
+    for match in LIVE_STATE_PATTERN.finditer(text):
+        if not final and match.end() + PROBE_CONTEXT > len(text):
+            break
+        window = text[max(0, match.start() - PROBE_CONTEXT):match.end() + PROBE_CONTEXT]
+        if owner.search(window):
+            return parse_live_marker(match)
+    return None
+
+
+def probe_channel_http(session: requests.Session, channel_url: str) -> Optional[bool]:
+    """
+    일반 HTTP 요청으로 채널 라이브 상태 확인
+
+    응답을 스트리밍으로 읽으면서 채널 ID 근처의 임베디드 상태/마크업 패턴을 찾고,
+    판정이 나는 즉시 연결을 끊습니다.
+
+    Returns:
+        True/False: 판정 완료, None: 판정 불가 (브라우저 폴백 필요)
+    """
+    channel_id = channel_id_from_url(channel_url)
+    try:
+        wait_for_channel_budget()
+        with session.get(
+            channel_url,
+            timeout=Config.HTTP_PROBE_TIMEOUT,
+            stream=True,
+        ) as response:
+            report_channel_response(response.status_code, response.headers)
+            if response.status_code != 200:
+                return None
+
+            buffer = ""
+            read_bytes = 0
+            for chunk in response.iter_content(chunk_size=16 * 1024, decode_unicode=True):
+                if not chunk:
+                    continue
+                if isinstance(chunk, bytes):
+                    chunk = chunk.decode("utf-8", errors="ignore")
+                read_bytes += len(chunk)
+                buffer += chunk
+
+                result = find_channel_marker(buffer, channel_id, final=False)
+                if result is not None:
+                    return result
+
+                if read_bytes >= Config.HTTP_PROBE_MAX_BYTES:
+                    break
+                buffer = buffer[-PROBE_OVERLAP:]
+
+            # 마지막 청크 끝부분에 보류했던 마커
+            return find_channel_marker(buffer, channel_id, final=True)
+
+    except requests.RequestException as e:
+        logger.debug(f"HTTP 체크 실패 ({channel_url}): {e}")
+
+    return None
+
+
+class CheckStats:
+    """티어별 체크 통계 (폴백 비율, 지연 시간)"""
+
+    TIERS = ("http", "browser")
+
+    def __init__(self):
+        self.total = 0
+        self.fallbacks = 0
+        self.latencies: Dict[str, List[float]] = {tier: [] for tier in self.TIERS}
+
+    def record(self, tier: str, elapsed: float) -> None:
+        self.latencies[tier].append(elapsed)
+
+    @property
+    def fallback_rate(self) -> float:
+        return self.fallbacks / self.total if self.total else 0.0
+
+    def summary(self) -> Dict[str, object]:
+        result: Dict[str, object] = {
+            "total": self.total,
+            "fallbacks": self.fallbacks,
+            "fallback_rate": round(self.fallback_rate, 3),
+        }
+        for tier, values in self.latencies.items():
+            if values:
+                ordered = sorted(values)
+                result[f"{tier}_avg_ms"] = round(sum(values) / len(values) * 1000, 1)
+                p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+                result[f"{tier}_p95_ms"] = round(p95 * 1000, 1)
+        return result
 
 
 # ============================================
 # PandaTV 크롤러
 # ============================================
 class PandaTVCrawler:
-    """PandaTV 라이브 상태 크롤러"""
+    """
+    PandaTV 라이브 상태 크롤러
+
+    채널 체크는 HTTP 1차 체크 -> Selenium 폴백 순서로 진행하며,
+    브라우저는 폴백이 처음 필요해지는 시점에 생성합니다.
+    """
     
-    def __init__(self, driver: webdriver.Chrome):
+    def __init__(self, driver: Optional["webdriver.Chrome"] = None):
         self.driver = driver
         self.logged_in = False
+        self.session = requests.Session()
+        self.session.headers.update({
+            "User-Agent": (
+                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+            ),
+            "Accept": "text/html,application/json",
+        })
+        self.stats = CheckStats()
+        # 마지막 수집에서 판정하지 못한 BJ (오프라인으로 보내지 않음)
+        self.unknown_bjs: Set[str] = set()
+
+    def ensure_driver(self) -> bool:
+        """브라우저가 필요할 때만 드라이버 생성"""
+        if self.driver is None:
+            logger.info("브라우저 초기화...")
+            self.driver = create_driver()
+        return self.driver is not None
+
+    def close(self) -> None:
+        """HTTP 세션 및 브라우저 종료"""
+        self.session.close()
+        if self.driver:
+            self.driver.quit()
+            self.driver = None
+            logger.info("브라우저 종료")
     
     def login(self, username: str, password: str) -> bool:
         """
@@ -168,6 +519,9 @@ class PandaTVCrawler:
             logger.info("로그인 정보 없음 - 비로그인 모드로 진행")
             return False
         
+        if not self.ensure_driver():
+            return False
+
         try:
             login_url = f"{Config.PANDATV_BASE_URL}/login"
             self.driver.get(login_url)
@@ -189,17 +543,48 @@ class PandaTVCrawler:
             logger.error(f"로그인 실패: {e}")
             return False
     
-    def check_channel_live(self, channel_url: str) -> bool:
+    def check_channel_live(self, channel_url: str) -> Optional[bool]:
         """
         개별 채널의 라이브 상태 확인
+
+        HTTP 1차 체크로 판정되면 브라우저를 사용하지 않고,
+        판정 불가일 때만 Selenium으로 폴백합니다.
         
         Args:
             channel_url: PandaTV 채널 URL
             
         Returns:
-            bool: 라이브 중이면 True
+            True/False: 라이브 여부, None: 판정 불가 (브라우저도 사용할 수 없거나 실패)
+        """
+        self.stats.total += 1
+
+        if Config.HTTP_PROBE_ENABLED:
+            started = time.perf_counter()
+            result = probe_channel_http(self.session, channel_url)
+            self.stats.record("http", time.perf_counter() - started)
+            if result is not None:
+                return result
+
+        self.stats.fallbacks += 1
+        started = time.perf_counter()
+        try:
+            return self.check_channel_live_browser(channel_url)
+        finally:
+            self.stats.record("browser", time.perf_counter() - started)
+
+    def check_channel_live_browser(self, channel_url: str) -> Optional[bool]:
+        """
+        Selenium으로 채널 페이지를 렌더링하여 라이브 상태 확인
+
+        Returns:
+            True/False: 라이브 여부, None: 판정 불가 (오프라인으로 보내지 않고 이전 상태 유지)
         """
+        if not self.ensure_driver():
+            logger.warning(f"브라우저 사용 불가 - 판정 보류: {channel_url}")
+            return None
+
         try:
+            wait_for_channel_budget()
             self.driver.get(channel_url)
             
             # 페이지 로드 대기
@@ -214,43 +599,48 @@ class PandaTVCrawler:
             # - 특정 클래스명
             
             # 예시 셀렉터들 (실제 사이트에 맞게 수정 필요):
-            live_selectors = [
+            # 셀렉터별 find_element 왕복 대신 한 번의 쿼리로 확인
+            live_selector = ", ".join([
                 ".live-badge",
                 ".is-live",
                 "[data-live='true']",
                 ".player-live-indicator",
                 ".live-status.on",
-            ]
+            ])
             
-            for selector in live_selectors:
-                try:
-                    element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    if element.is_displayed():
-                        return True
-                except NoSuchElementException:
-                    continue
+            for element in self.driver.find_elements(By.CSS_SELECTOR, live_selector):
+                if element.is_displayed():
+                    return True
             
             return False
             
         except TimeoutException:
-            logger.warning(f"페이지 로드 타임아웃: {channel_url}")
-            return False
+            logger.warning(f"페이지 로드 타임아웃 - 판정 보류: {channel_url}")
+            return None
         except Exception as e:
-            logger.error(f"채널 체크 실패 ({channel_url}): {e}")
-            return False
+            logger.error(f"채널 체크 실패 - 판정 보류 ({channel_url}): {e}")
+            return None
     
-    def get_all_live_members(self) -> Set[str]:
+    def get_all_live_members(self, channel_urls: Optional[Dict[str, str]] = None) -> Set[str]:
         """
         즐겨찾기/팔로우 페이지에서 라이브 중인 멤버 수집
+
+        판정하지 못한 BJ는 self.unknown_bjs에 기록합니다 (전송에서 제외).
+
+        Args:
+            channel_urls: BJ 이름 -> 채널 URL (기본값: BJ_CHANNEL_URLS)
         
         Returns:
             Set[str]: 라이브 중인 BJ 이름 집합
         """
         live_bjs: Set[str] = set()
+        self.unknown_bjs = set()
+        if channel_urls is None:
+            channel_urls = BJ_CHANNEL_URLS
         
         try:
             # 방법 1: 즐겨찾기 페이지에서 일괄 확인 (로그인 필요)
-            if self.logged_in:
+            if self.logged_in and self.ensure_driver():
                 favorite_url = f"{Config.PANDATV_BASE_URL}/favorite"
                 self.driver.get(favorite_url)
                 
@@ -269,11 +659,19 @@ class PandaTVCrawler:
             
             # 방법 2: 개별 채널 순회 확인 (로그인 불필요)
             else:
-                for bj_name, channel_url in BJ_CHANNEL_URLS.items():
-                    if self.check_channel_live(channel_url):
+                for bj_name, channel_url in channel_urls.items():
+                    # 요청 간격은 check_channel_live 안의 공유 속도 제한이 조절
+                    result = self.check_channel_live(channel_url)
+                    if result is None:
+                        self.unknown_bjs.add(bj_name)
+                    elif result:
                         live_bjs.add(bj_name)
                         logger.info(f"라이브 감지: {bj_name}")
-                    time.sleep(1)  # Rate limiting
+
+                if self.unknown_bjs:
+                    logger.warning(f"판정 불가 (전송 제외): {self.unknown_bjs}")
+
+                logger.info(f"체크 통계: {self.stats.summary()}")
                     
         except Exception as e:
             logger.error(f"라이브 멤버 수집 실패: {e}")
@@ -284,85 +682,198 @@ class PandaTVCrawler:
 # ============================================
 # API 업데이트
 # ============================================
-def update_live_status_api(live_bj_names: Set[str], mapping: Dict[str, int]) -> bool:
+class LiveStatusPublisher:
+    """
+    RG Family API 라이브 상태 전송기
+
+    - 이전 전송 이후 상태가 바뀐 멤버만 전송 (delta)
+    - gzip 압축 요청 본문
+    - 틱마다 시퀀스 번호 + Idempotency-Key (재시도 시 동일 키 사용)
+    - keep-alive 세션 재사용, 지수 백오프 + 지터 재시도
+    """
+
+    def __init__(self):
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "Content-Encoding": "gzip",
+            "Connection": "keep-alive",
+        })
+        if Config.API_SECRET:
+            self.session.headers["x-api-key"] = Config.API_SECRET
+
+        # 프로세스마다 고유한 run id + 단조 증가 시퀀스
+        self.run_id = uuid.uuid4().hex[:12]
+        self.sequence = 0
+        self.ticks_since_full_sync = 0
+        # 서버에 반영이 확인된 마지막 상태 (member_id -> is_live)
+        self.last_sent: Dict[int, bool] = {}
+
+    def build_updates(
+        self,
+        live_bj_names: Set[str],
+        mapping: Dict[str, int],
+        full: bool,
+        unknown: Set[str] = frozenset(),
+    ) -> List[Dict]:
+        updates: List[Dict] = []
+        for bj_name, member_id in mapping.items():
+            if bj_name in unknown:
+                continue  # 판정 불가 - 서버의 마지막 상태 유지
+            is_live = bj_name in live_bj_names
+            if full or self.last_sent.get(member_id) != is_live:
+                updates.append({
+                    "member_id": member_id,
+                    "is_live": is_live,
+                })
+        return updates
+
+    def backoff_delay(self, attempt: int) -> float:
+        """지수 백오프 + full jitter"""
+        ceiling = min(Config.RETRY_MAX_DELAY, Config.RETRY_DELAY * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def publish(
+        self,
+        live_bj_names: Set[str],
+        mapping: Dict[str, int],
+        force_full: bool = False,
+        unknown: Set[str] = frozenset(),
+    ) -> bool:
+        full = (
+            force_full
+            or not self.last_sent
+            or self.ticks_since_full_sync >= Config.FULL_SYNC_EVERY_TICKS
+        )
+        updates = self.build_updates(live_bj_names, mapping, full, unknown)
+
+        if not updates:
+            self.ticks_since_full_sync += 1
+            logger.info("변경된 상태 없음 - 전송 생략")
+            return True
+
+        self.sequence += 1
+        idempotency_key = f"{self.run_id}-{self.sequence}"
+        payload = {
+            "updates": updates,
+            "run_id": self.run_id,
+            "sequence": self.sequence,
+            "full": full,
+        }
+        body = gzip.compress(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+        headers = {"Idempotency-Key": idempotency_key}
+
+        for attempt in range(Config.RETRY_COUNT):
+            retryable = True
+            try:
+                response = self.session.post(
+                    Config.API_URL,
+                    data=body,
+                    headers=headers,
+                    timeout=Config.REQUEST_TIMEOUT,
+                )
+
+                if response.status_code == 200:
+                    result = response.json()
+                    # 서버에서 실패한 멤버는 기록하지 않아 다음 틱에 다시 전송
+                    failed = {r.get("member_id") for r in result.get("results", []) if not r.get("success")}
+                    for update in updates:
+                        if update["member_id"] not in failed:
+                            self.last_sent[update["member_id"]] = update["is_live"]
+                    self.ticks_since_full_sync = 0 if full else self.ticks_since_full_sync + 1
+                    live_count = len(live_bj_names)
+                    logger.info(
+                        f"✅ 업데이트 완료: {result.get('updated', 0)}건 "
+                        f"(전송: {len(updates)}건{' 전체' if full else ''}, 라이브: {live_count}명, seq={self.sequence})"
+                    )
+                    return True
+
+                logger.error(f"API 오류 ({response.status_code}): {response.text}")
+                # 4xx는 재시도해도 결과가 같음 - 429와 같은 키가 처리 중인 409(Retry-After)만 재시도
+                # (Retry-After 없는 409는 이미 더 새로운 시퀀스가 적용된 경우)
+                retryable = (
+                    response.status_code == 429
+                    or response.status_code >= 500
+                    or (response.status_code == 409 and "Retry-After" in response.headers)
+                )
+
+            except requests.RequestException as e:
+                logger.error(f"요청 실패 (시도 {attempt + 1}/{Config.RETRY_COUNT}): {e}")
+
+            if not retryable:
+                break
+            if attempt < Config.RETRY_COUNT - 1:
+                time.sleep(self.backoff_delay(attempt))
+
+        return False
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_publisher: Optional[LiveStatusPublisher] = None
+
+
+def get_publisher() -> LiveStatusPublisher:
+    """프로세스 전역 전송기 (지속 실행 모드에서 세션/이전 상태 유지)"""
+    global _publisher
+    if _publisher is None:
+        _publisher = LiveStatusPublisher()
+    return _publisher
+
+
+def update_live_status_api(
+    live_bj_names: Set[str],
+    mapping: Dict[str, int],
+    force_full: bool = False,
+    unknown: Set[str] = frozenset(),
+) -> bool:
     """
     RG Family API로 라이브 상태 업데이트
     
     Args:
         live_bj_names: 라이브 중인 BJ 이름 집합
         mapping: BJ 이름 -> member_id 매핑
+        force_full: True면 변경 여부와 관계없이 전체 상태 전송
+        unknown: 판정하지 못한 BJ 이름 (전체 전송에서도 제외)
         
     Returns:
         bool: 성공 여부
     """
-    updates: List[Dict] = []
-    
-    for bj_name, member_id in mapping.items():
-        is_live = bj_name in live_bj_names
-        updates.append({
-            "member_id": member_id,
-            "is_live": is_live,
-        })
-    
-    if not updates:
+    if not mapping:
         logger.info("업데이트할 데이터 없음")
         return True
-    
-    headers = {
-        "Content-Type": "application/json",
-    }
-    if Config.API_SECRET:
-        headers["x-api-key"] = Config.API_SECRET
-    
-    for attempt in range(Config.RETRY_COUNT):
-        try:
-            response = requests.post(
-                Config.API_URL,
-                headers=headers,
-                json={"updates": updates},
-                timeout=Config.REQUEST_TIMEOUT,
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                live_count = len(live_bj_names)
-                logger.info(f"✅ 업데이트 완료: {result.get('updated', 0)}건 (라이브: {live_count}명)")
-                return True
-            else:
-                logger.error(f"API 오류 ({response.status_code}): {response.text}")
-                
-        except requests.RequestException as e:
-            logger.error(f"요청 실패 (시도 {attempt + 1}/{Config.RETRY_COUNT}): {e}")
-            if attempt < Config.RETRY_COUNT - 1:
-                time.sleep(Config.RETRY_DELAY)
-    
-    return False
+
+    return get_publisher().publish(live_bj_names, mapping, force_full=force_full, unknown=unknown)
 
 
 # ============================================
 # 메인 실행
 # ============================================
-def run_once() -> bool:
-    """1회 크롤링 실행"""
+def run_once(mapping_cache: Optional[MemberMappingCache] = None) -> bool:
+    """
+    1회 크롤링 실행
+
+    Args:
+        mapping_cache: 지속 실행 모드에서 공유하는 매핑 캐시 (없으면 1회 로드)
+    """
     logger.info("=" * 50)
     logger.info("  PandaTV 라이브 상태 크롤러")
     logger.info(f"  {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     logger.info("=" * 50)
     
     if not SELENIUM_AVAILABLE:
-        logger.error("Selenium 미설치 - pip install selenium webdriver-manager")
-        return False
+        logger.warning("Selenium 미설치 - HTTP 체크만 사용 (pip install selenium webdriver-manager)")
     
-    driver = None
+    if mapping_cache is None:
+        mapping_cache = MemberMappingCache()
+        mapping_cache.load()
+    # 틱 동안 사용할 매핑 고정 (백그라운드 갱신과 무관)
+    members = mapping_cache.current()
+    logger.info(f"멤버 매핑: {len(members.mapping)}명 (버전: {members.version}, 출처: {members.source})")
+
+    crawler = PandaTVCrawler()
     try:
-        # 드라이버 초기화
-        logger.info("브라우저 초기화...")
-        driver = create_driver()
-        if not driver:
-            return False
-        
-        crawler = PandaTVCrawler(driver)
-        
         # 로그인 (선택적)
         if Config.PANDATV_USERNAME and Config.PANDATV_PASSWORD:
             logger.info("PandaTV 로그인 시도...")
@@ -370,12 +881,12 @@ def run_once() -> bool:
         
         # 라이브 멤버 수집
         logger.info("라이브 상태 수집 중...")
-        live_bjs = crawler.get_all_live_members()
+        live_bjs = crawler.get_all_live_members(members.channel_urls)
         logger.info(f"라이브 BJ: {live_bjs if live_bjs else '없음'}")
         
         # API 업데이트
         logger.info("API 업데이트 중...")
-        success = update_live_status_api(live_bjs, BJ_MAPPING)
+        success = update_live_status_api(live_bjs, members.mapping, unknown=crawler.unknown_bjs)
         
         return success
         
@@ -384,9 +895,7 @@ def run_once() -> bool:
         return False
         
     finally:
-        if driver:
-            driver.quit()
-            logger.info("브라우저 종료")
+        crawler.close()
 
 
 def run_continuously(interval_seconds: int = 120):
@@ -397,14 +906,19 @@ def run_continuously(interval_seconds: int = 120):
         interval_seconds: 실행 간격 (초), 기본 2분
     """
     logger.info(f"지속 실행 모드 시작 (간격: {interval_seconds}초)")
+
+    mapping_cache = MemberMappingCache()
+    mapping_cache.load()
+    mapping_cache.start_background_refresh()
     
     while True:
         try:
-            run_once()
+            run_once(mapping_cache)
             logger.info(f"다음 실행까지 {interval_seconds}초 대기...")
             time.sleep(interval_seconds)
         except KeyboardInterrupt:
             logger.info("사용자에 의해 중단됨")
+            mapping_cache.stop()
             break
 
 
@@ -421,7 +935,7 @@ def run_test():
     logger.info(f"API URL: {Config.API_URL}")
     logger.info(f"API Secret: {'설정됨' if Config.API_SECRET else '미설정'}")
     
-    success = update_live_status_api(test_live, BJ_MAPPING)
+    success = update_live_status_api(test_live, BJ_MAPPING, force_full=True)
     
     if success:
         logger.info("✅ 테스트 성공!")
@@ -5,17 +5,29 @@
  *
  * 사용법:
  * POST /api/live-status/update
- * Headers: { "x-api-key": "your-secret-key" }
+ * Headers: {
+ *   "x-api-key": "your-secret-key",
+ *   "Content-Encoding": "gzip",        // 선택 - gzip 압축 본문 지원
+ *   "Idempotency-Key": "run-id-seq"     // 선택 - 동일 키 재전송 시 이전 결과 반환
+ * }
  * Body: {
  *   "updates": [
  *     { "member_id": 1, "is_live": true },
  *     { "member_id": 2, "is_live": false }
- *   ]
+ *   ],
+ *   "run_id": "3f9c2a1b7d4e",           // 선택 - 크롤러 실행 ID (sequence 범위)
+ *   "sequence": 42                      // 선택 - 크롤러 틱 시퀀스
  * }
+ *
+ * 중복/순서 보장 (live_status_requests / live_status_runs 테이블):
+ * - Idempotency-Key는 처리 시작 시 DB에 선점 - 처리 중 도착한 재시도는 409, 완료 후 재시도는 이전 응답
+ * - run_id별로 마지막으로 적용한 sequence 이하 요청은 409 (늦게 도착한 이전 틱)
  */
 
+import { createHash } from 'crypto'
+import { gunzipSync } from 'zlib'
 import { NextResponse } from 'next/server'
-import { createClient } from '@supabase/supabase-js'
+import { createClient, type SupabaseClient } from '@supabase/supabase-js'
 import type { Database } from '@/types/database'
 
 const SUPABASE_URL = process.env.NEXT_PUBLIC_SUPABASE_URL
@@ -51,9 +63,15 @@ export async function POST(request: Request) {
     )
   }
 
-  let body: { updates: LiveStatusUpdate[] }
+  const idempotencyKey = request.headers.get('idempotency-key')
+
+  let body: { updates: LiveStatusUpdate[]; run_id?: string; sequence?: number }
   try {
-    body = await request.json()
+    let raw: Buffer = Buffer.from(await request.arrayBuffer())
+    if (request.headers.get('content-encoding')?.toLowerCase() === 'gzip') {
+      raw = gunzipSync(raw)
+    }
+    body = JSON.parse(raw.toString('utf-8'))
   } catch {
     return NextResponse.json({ error: 'Invalid JSON body' }, { status: 400 })
   }
@@ -65,8 +83,76 @@ export async function POST(request: Request) {
       { status: 400 }
     )
   }
+  const runId = typeof body.run_id === 'string' && body.run_id ? body.run_id : null
+  const sequence = Number.isSafeInteger(body.sequence) ? (body.sequence as number) : null
 
   const supabase = createClient<Database>(SUPABASE_URL, SERVICE_ROLE_KEY)
+
+  // 처리 전에 키/시퀀스 선점 (인스턴스와 무관하게 한 요청만 적용)
+  // previousSequence: 선점 전 마지막 적용 sequence (실패 시 정확히 이 값으로 되돌림)
+  let previousSequence: number | null = null
+  if (idempotencyKey || (runId && sequence !== null)) {
+    const { data: claims, error: claimError } = await supabase.rpc('claim_live_status_request', {
+      p_key: idempotencyKey,
+      p_run_id: runId,
+      p_sequence: sequence,
+    })
+    if (claimError) {
+      return NextResponse.json({ error: claimError.message }, { status: 500 })
+    }
+
+    const claim = claims?.[0]
+    if (claim?.outcome === 'replay') {
+      return NextResponse.json(claim.response, { headers: { 'Idempotent-Replayed': 'true' } })
+    }
+    if (claim?.outcome === 'in_progress') {
+      return NextResponse.json(
+        { error: 'Request with this Idempotency-Key is in progress' },
+        { status: 409, headers: { 'Retry-After': '1' } }
+      )
+    }
+    if (claim?.outcome === 'stale') {
+      return NextResponse.json(
+        { error: 'Stale sequence', sequence, last_sequence: claim.last_sequence },
+        { status: 409 }
+      )
+    }
+    previousSequence = claim?.last_sequence ?? null
+  }
+
+  try {
+    const responseBody = await applyUpdates(supabase, updates, sequence)
+
+    if (idempotencyKey) {
+      const { error: storeError } = await supabase
+        .from('live_status_requests')
+        .update({ status: 'done', response: responseBody })
+        .eq('idempotency_key', idempotencyKey)
+      if (storeError) {
+        // 적용은 끝났으므로 응답은 그대로 반환 (재시도는 선점이 만료될 때까지 409)
+        console.error('Idempotency response store error:', storeError.message)
+      }
+    }
+
+    return NextResponse.json(responseBody)
+  } catch (error) {
+    // 적용하지 못한 요청은 선점을 풀어 같은 키/시퀀스로 재시도할 수 있게 함
+    await supabase.rpc('release_live_status_request', {
+      p_key: idempotencyKey,
+      p_run_id: runId,
+      p_sequence: sequence,
+      p_previous_sequence: previousSequence,
+    })
+    const message = error instanceof Error ? error.message : 'Unknown error'
+    return NextResponse.json({ error: message }, { status: 500 })
+  }
+}
+
+async function applyUpdates(
+  supabase: SupabaseClient<Database>,
+  updates: LiveStatusUpdate[],
+  sequence: number | null
+) {
   const results: { member_id: number; success: boolean; error?: string }[] = []
 
   // 각 멤버의 라이브 상태 업데이트
@@ -94,16 +180,19 @@ export async function POST(request: Request) {
   const successCount = results.filter(r => r.success).length
   const failCount = results.filter(r => !r.success).length
 
-  return NextResponse.json({
+  // 일부 실패도 응답으로 저장 - 크롤러는 실패한 멤버만 다음 틱(새 시퀀스)에 다시 보냄
+  return {
     success: true,
     updated: successCount,
     failed: failCount,
+    sequence,
     results,
     timestamp: new Date().toISOString(),
-  })
+  }
 }
 
 // GET: 현재 라이브 상태 조회
+// ?view=mapping: 크롤러용 멤버 매핑 (id, name, social_links) + ETag 버전
 export async function GET(request: Request) {
   if (!SUPABASE_URL || !SERVICE_ROLE_KEY) {
     return NextResponse.json(
@@ -114,6 +203,10 @@ export async function GET(request: Request) {
 
   const supabase = createClient<Database>(SUPABASE_URL, SERVICE_ROLE_KEY)
 
+  if (new URL(request.url).searchParams.get('view') === 'mapping') {
+    return getMemberMapping(request, supabase)
+  }
+
   const { data, error } = await supabase
     .from('organization')
     .select('id, name, unit, role, social_links, is_live')
@@ -135,3 +228,29 @@ export async function GET(request: Request) {
     timestamp: new Date().toISOString(),
   })
 }
+
+async function getMemberMapping(
+  request: Request,
+  supabase: SupabaseClient<Database>
+) {
+  const { data, error } = await supabase
+    .from('organization')
+    .select('id, name, social_links')
+    .eq('is_active', true)
+    .order('id')
+
+  if (error) {
+    return NextResponse.json({ error: error.message }, { status: 500 })
+  }
+
+  const members = data || []
+  // 매핑 내용이 같으면 같은 버전 - is_live 변경과 무관
+  const version = createHash('sha1').update(JSON.stringify(members)).digest('hex').slice(0, 16)
+  const etag = `"${version}"`
+
+  if (request.headers.get('if-none-match') === etag) {
+    return new NextResponse(null, { status: 304, headers: { ETag: etag } })
+  }
+
+  return NextResponse.json({ version, members }, { headers: { ETag: etag } })
+}
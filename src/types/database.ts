@@ -762,6 +762,51 @@ export type Database = {
           }
         ]
       }
+      live_status_requests: {
+        Row: {
+          idempotency_key: string
+          run_id: string | null
+          sequence: number | null
+          status: 'processing' | 'done'
+          response: Json | null
+          created_at: string
+        }
+        Insert: {
+          idempotency_key: string
+          run_id?: string | null
+          sequence?: number | null
+          status?: 'processing' | 'done'
+          response?: Json | null
+          created_at?: string
+        }
+        Update: {
+          idempotency_key?: string
+          run_id?: string | null
+          sequence?: number | null
+          status?: 'processing' | 'done'
+          response?: Json | null
+          created_at?: string
+        }
+        Relationships: []
+      }
+      live_status_runs: {
+        Row: {
+          run_id: string
+          last_sequence: number
+          updated_at: string
+        }
+        Insert: {
+          run_id: string
+          last_sequence: number
+          updated_at?: string
+        }
+        Update: {
+          run_id?: string
+          last_sequence?: number
+          updated_at?: string
+        }
+        Relationships: []
+      }
       banners: {
         Row: {
           id: number
@@ -1701,6 +1746,23 @@ export type Database = {
         Args: { user_id: string }
         Returns: number | null
       }
+      claim_live_status_request: {
+        Args: { p_key: string | null; p_run_id?: string | null; p_sequence?: number | null }
+        Returns: {
+          outcome: 'claimed' | 'replay' | 'in_progress' | 'stale'
+          response: Json | null
+          last_sequence: number | null
+        }[]
+      }
+      release_live_status_request: {
+        Args: {
+          p_key: string | null
+          p_run_id?: string | null
+          p_sequence?: number | null
+          p_previous_sequence?: number | null
+        }
+        Returns: void
+      }
     }
     Enums: {
       [_ in never]: never
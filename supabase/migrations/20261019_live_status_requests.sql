@@ -0,0 +1,162 @@
+-- 라이브 상태 업데이트 API(/api/live-status/update) 요청 중복 방지
+-- 서버리스 인스턴스마다 메모리가 따로라 Idempotency-Key와 시퀀스를 DB에서 관리
+--
+-- live_status_requests: Idempotency-Key별 처리 상태 + 완료 응답 (요청 시작 시 선점)
+-- live_status_runs:     크롤러 실행(run_id)별 마지막으로 적용한 sequence
+
+CREATE TABLE IF NOT EXISTS public.live_status_requests (
+  idempotency_key TEXT PRIMARY KEY,
+  run_id TEXT,
+  sequence BIGINT,
+  status TEXT NOT NULL DEFAULT 'processing' CHECK (status IN ('processing', 'done')),
+  response JSONB,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_live_status_requests_created_at
+  ON public.live_status_requests (created_at);
+
+CREATE TABLE IF NOT EXISTS public.live_status_runs (
+  run_id TEXT PRIMARY KEY,
+  last_sequence BIGINT NOT NULL,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_live_status_runs_updated_at
+  ON public.live_status_runs (updated_at);
+
+-- RLS 활성화 (정책 없음 - service role API만 접근)
+ALTER TABLE public.live_status_requests ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.live_status_runs ENABLE ROW LEVEL SECURITY;
+
+-- 요청 선점
+-- outcome:
+--   claimed      처리 진행 (키와 sequence를 이 요청이 차지함)
+--                last_sequence는 이 요청 전에 마지막으로 적용한 값 (첫 요청이면 null)
+--                → 실패 시 release_live_status_request에 그대로 넘겨 정확히 되돌림
+--   replay       같은 키가 이미 완료됨 - response를 그대로 반환
+--   in_progress  같은 키를 다른 요청이 처리 중
+--   stale        sequence가 이 run_id의 마지막 적용 값 이하 - last_sequence 반환
+create or replace function public.claim_live_status_request(
+  p_key text,
+  p_run_id text default null,
+  p_sequence bigint default null
+)
+returns table (outcome text, response jsonb, last_sequence bigint)
+language plpgsql
+set search_path = public
+as $$
+declare
+  v_status text;
+  v_response jsonb;
+  v_created_at timestamptz;
+  v_last bigint;
+  v_new_run boolean := false;
+begin
+  -- 오래된 키/실행 기록 정리 (인덱스 범위 삭제라 요청마다 실행해도 가벼움)
+  delete from public.live_status_requests where created_at < now() - interval '1 day';
+  delete from public.live_status_runs where updated_at < now() - interval '7 days';
+
+  if p_key is not null then
+    insert into public.live_status_requests (idempotency_key, run_id, sequence)
+    values (p_key, p_run_id, p_sequence)
+    on conflict (idempotency_key) do nothing;
+
+    if not found then
+      select r.status, r.response, r.created_at into v_status, v_response, v_created_at
+      from public.live_status_requests r
+      where r.idempotency_key = p_key
+      for update;
+
+      if v_status = 'done' then
+        return query select 'replay'::text, v_response, null::bigint;
+        return;
+      end if;
+      -- 처리 중에 인스턴스가 죽어 남은 선점은 5분 뒤 다시 차지할 수 있음
+      if v_created_at > now() - interval '5 minutes' then
+        return query select 'in_progress'::text, null::jsonb, null::bigint;
+        return;
+      end if;
+      update public.live_status_requests set created_at = now() where idempotency_key = p_key;
+    end if;
+  end if;
+
+  if p_run_id is not null and p_sequence is not null then
+    -- 이전 값을 알아야 실패 시 정확히 되돌릴 수 있으므로 행을 잠그고 읽은 뒤 갱신
+    loop
+      select runs.last_sequence into v_last
+      from public.live_status_runs runs
+      where runs.run_id = p_run_id
+      for update;
+      exit when found;
+
+      insert into public.live_status_runs (run_id, last_sequence)
+      values (p_run_id, p_sequence)
+      on conflict (run_id) do nothing;
+      if found then
+        v_new_run := true;
+        exit;
+      end if;
+      -- 동시에 같은 run_id의 첫 요청이 행을 만듦 → 다시 잠그고 읽음
+    end loop;
+
+    if not v_new_run then
+      if v_last >= p_sequence then
+        -- 적용하지 않은 요청이므로 키 선점도 되돌림
+        if p_key is not null then
+          delete from public.live_status_requests where idempotency_key = p_key;
+        end if;
+        return query select 'stale'::text, null::jsonb, v_last;
+        return;
+      end if;
+
+      update public.live_status_runs
+      set last_sequence = p_sequence, updated_at = now()
+      where run_id = p_run_id;
+    end if;
+  end if;
+
+  return query select 'claimed'::text, null::jsonb, v_last;
+end;
+$$;
+
+-- 처리 중 예외로 끝난 요청의 선점 해제 (같은 키/sequence로 재시도 가능하도록)
+-- p_previous_sequence: claim이 돌려준 last_sequence (null이면 첫 요청 → 실행 기록 삭제)
+-- sequence는 건너뛸 수 있으므로 p_sequence - 1이 아니라 이전 값으로 되돌려야
+-- 그 사이 번호의 늦은 요청이 다시 적용되지 않음
+create or replace function public.release_live_status_request(
+  p_key text,
+  p_run_id text default null,
+  p_sequence bigint default null,
+  p_previous_sequence bigint default null
+)
+returns void
+language plpgsql
+set search_path = public
+as $$
+begin
+  if p_key is not null then
+    delete from public.live_status_requests
+    where idempotency_key = p_key and status = 'processing';
+  end if;
+
+  -- 그 사이 더 큰 sequence가 선점했으면 (last_sequence <> p_sequence) 그대로 둠
+  if p_run_id is not null and p_sequence is not null then
+    if p_previous_sequence is null then
+      delete from public.live_status_runs
+      where run_id = p_run_id and last_sequence = p_sequence;
+    else
+      update public.live_status_runs
+      set last_sequence = p_previous_sequence, updated_at = now()
+      where run_id = p_run_id and last_sequence = p_sequence;
+    end if;
+  end if;
+end;
+$$;
+
+revoke execute on function public.claim_live_status_request(text, text, bigint) from public, anon, authenticated;
+revoke execute on function public.release_live_status_request(text, text, bigint, bigint) from public, anon, authenticated;
+
+-- 코멘트
+COMMENT ON TABLE public.live_status_requests IS '라이브 상태 업데이트 API Idempotency-Key (1일 보관)';
+COMMENT ON TABLE public.live_status_runs IS '크롤러 실행별 마지막으로 적용한 sequence (이하 값은 거부)';
@@ -0,0 +1,27 @@
+-- 라이브 현황 요약 (한 행) - python-live-scraper 워커가 틱마다 갱신
+-- 홈페이지의 "지금 N명 방송 중 / 총 시청자 / 최다 시청 멤버 / 엑셀·크루 현황"을
+-- live_status 행 집계 없이 한 번의 조회로 읽기 위함
+
+CREATE TABLE IF NOT EXISTS public.live_summary (
+  id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+  live_count INTEGER NOT NULL DEFAULT 0,
+  total_viewers INTEGER NOT NULL DEFAULT 0,
+  top_member_id BIGINT REFERENCES public.organization(id) ON DELETE SET NULL,
+  top_viewer_count INTEGER NOT NULL DEFAULT 0,
+  units JSONB NOT NULL DEFAULT '{}'::jsonb,
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- RLS 활성화
+ALTER TABLE public.live_summary ENABLE ROW LEVEL SECURITY;
+
+-- 공개 읽기 정책 (쓰기는 service role 워커만)
+CREATE POLICY "라이브요약 공개 읽기"
+  ON public.live_summary
+  FOR SELECT
+  TO public
+  USING (true);
+
+-- 코멘트
+COMMENT ON TABLE public.live_summary IS '라이브 현황 요약 (id = 1 한 행) - 워커가 변경 시 upsert';
+COMMENT ON COLUMN public.live_summary.units IS '유닛별 {"excel": {"live": 2, "viewers": 340}, "crew": {...}}';